@@ -1,64 +1,115 @@
-from fastapi import APIRouter, Query
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any, Optional, Sequence
 from datetime import datetime
+import asyncio
 import math
+import time
 
-from models.schemas import StandardResponse
+from models.schemas import StandardResponse, Account, AccountWithCampaigns
 from utils.data_loader import data_loader
+from utils.fields import parse_fields, stored_fields
+from utils.json_response import FragmentCache, json_response, ndjson_response
+from utils.bot_scoring import rescore_accounts
 
 router = APIRouter(prefix="/api/accounts", tags=["Accounts"])
 
 
+def _with_campaign_count(account: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """A copy of an account with the number of campaigns it is involved in added, if among fields"""
+    account_copy = account.copy()
+    if fields is None or "campaigns_involved" in fields:
+        account_copy["campaigns_involved"] = len(data_loader.get_campaign_ids_by_account(account["id"]))
+    return account_copy
+
+
+# Encoded list entries, reused until the next write
+account_fragments = FragmentCache(data_loader.data_version, _with_campaign_count)
+
+
 @router.get("")
 async def get_accounts(
     account_type: Optional[str] = Query("all", description="Filter by account type"),
     min_bot_probability: Optional[float] = Query(0, ge=0, le=100, description="Minimum bot score"),
     page: int = Query(1, ge=1),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (replaces page)"),
+    fields: Optional[str] = Query(None, description="Comma-separated account fields to return (default: all)"),
 ):
     """Get all accounts with filtering and pagination"""
     
-    # Filter accounts
-    accounts = data_loader.filter_accounts(
-        account_type=account_type if account_type != "all" else None,
-        min_bot_probability=min_bot_probability if min_bot_probability > 0 else None
-    )
+    # Fetch only the requested page and fields, highest bot_probability first
+    start_idx = (page - 1) * limit
+    try:
+        selected = parse_fields(fields, AccountWithCampaigns)
+        accounts, total_items, next_cursor = data_loader.page_accounts(
+            start_idx,
+            limit,
+            account_type=account_type if account_type != "all" else None,
+            min_bot_probability=min_bot_probability if min_bot_probability > 0 else None,
+            cursor=cursor,
+            fields=stored_fields(selected, ["id"])
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Add campaigns_involved count
-    enriched_accounts = []
-    for account in accounts:
-        account_copy = account.copy()
-        
-        # Count campaigns this account is involved in
-        all_posts = data_loader.get_all_posts()
-        account_posts = [p for p in all_posts if p["account_id"] == account["id"]]
-        campaign_ids = set([p["campaign_id"] for p in account_posts if p.get("campaign_id")])
-        account_copy["campaigns_involved"] = len(campaign_ids)
-        
-        enriched_accounts.append(account_copy)
-    
-    # Sort by bot_probability (highest first)
-    enriched_accounts.sort(key=lambda x: x.get("bot_probability", 0), reverse=True)
+    paginated_accounts = account_fragments.encode(accounts, selected)
     
     # Pagination
-    total_items = len(enriched_accounts)
     total_pages = math.ceil(total_items / limit) if total_items > 0 else 1
-    start_idx = (page - 1) * limit
-    end_idx = start_idx + limit
-    paginated_accounts = enriched_accounts[start_idx:end_idx]
+    
+    return json_response({
+        "accounts": paginated_accounts,
+        "pagination": {
+            "current_page": page,
+            "total_pages": total_pages,
+            "total_items": total_items,
+            "items_per_page": limit,
+            "has_next": next_cursor is not None,
+            "has_previous": page > 1 or cursor is not None,
+            "next_cursor": next_cursor
+        }
+    })
+
+
+@router.get("/export")
+async def export_accounts(
+    account_type: Optional[str] = Query("all", description="Filter by account type"),
+    min_bot_probability: Optional[float] = Query(0, ge=0, le=100, description="Minimum bot score"),
+    fields: Optional[str] = Query(None, description="Comma-separated account fields to return (default: all)"),
+):
+    """Stream every matching account as NDJSON, one account per line in stored order"""
+    
+    try:
+        selected = parse_fields(fields, Account)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return ndjson_response(
+        data_loader.iter_accounts(
+            account_type=account_type if account_type != "all" else None,
+            min_bot_probability=min_bot_probability if min_bot_probability > 0 else None,
+            fields=selected
+        ),
+        "accounts.ndjson"
+    )
+
+
+@router.post("/rescore")
+async def rescore_all_accounts():
+    """Recompute bot_probability and risk_score for every account from its activity"""
+    
+    started = time.perf_counter()
+    accounts_scored, changes = await asyncio.to_thread(rescore_accounts, data_loader)
+    # Write on the event loop, touching only accounts whose scores moved
+    accounts_updated = data_loader.update_accounts(changes)
     
     return StandardResponse(
         success=True,
         data={
-            "accounts": paginated_accounts,
-            "pagination": {
-                "current_page": page,
-                "total_pages": total_pages,
-                "total_items": total_items,
-                "items_per_page": limit,
-                "has_next": page < total_pages,
-                "has_previous": page > 1
-            }
+            "accounts_scored": accounts_scored,
+            "accounts_updated": accounts_updated,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
         },
         timestamp=datetime.utcnow().isoformat() + "Z"
     )
@@ -1,103 +1,75 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-from datetime import datetime, timedelta
-
-from models.schemas import StandardResponse
+from utils.aggregates import THREAT_LEVELS
 from utils.data_loader import data_loader
+from utils.json_response import json_response
+from utils.rollups import CAMPAIGNS, POSTS, ACCOUNTS, threat_metric
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
+# Rollup metrics summed into recent_activity as new_<metric>
+ACTIVITY_METRICS = [CAMPAIGNS, POSTS, ACCOUNTS]
+
 
 @router.get("/overview")
-async def get_analytics_overview():
+async def get_analytics_overview(
+    recompute: bool = Query(False, description="Rebuild the aggregates from all records first (for consistency checks)")
+):
     """Get high-level statistics for the dashboard homepage"""
     
-    campaigns = data_loader.get_all_campaigns()
-    accounts = data_loader.get_all_accounts()
-    posts = data_loader.get_all_posts()
-    
-    # Calculate stats
-    total_campaigns = len(campaigns)
-    active_threats = len([c for c in campaigns if c["status"] == "active"])
-    high_risk_campaigns = len([c for c in campaigns if c["threat_level"] in ["high", "critical"]])
-    total_accounts_monitored = len(accounts)
-    total_posts_analyzed = len(posts)
-    bot_accounts_detected = len([a for a in accounts if a["account_type"] == "bot"])
+    # Counts are materialized by the storage backend and kept current on every write
+    overview = data_loader.get_overview_stats()
+    consistency = None
+    if recompute:
+        recomputed = data_loader.get_overview_stats(recompute=True)
+        consistency = {"recomputed": True, "consistent": recomputed == overview}
+        overview = recomputed
     
-    # Threat distribution
-    threat_distribution = {
-        "critical": len([c for c in campaigns if c["threat_level"] == "critical"]),
-        "high": len([c for c in campaigns if c["threat_level"] == "high"]),
-        "medium": len([c for c in campaigns if c["threat_level"] == "medium"]),
-        "low": len([c for c in campaigns if c["threat_level"] == "low"])
-    }
+    threat_distribution = overview["threat_distribution"]
+    total_campaigns = overview["total_campaigns"]
     
-    # Platform breakdown
-    platform_counts = {}
-    for campaign in campaigns:
-        # Get posts for this campaign
-        campaign_posts = data_loader.get_posts_by_campaign(campaign["id"])
-        for post in campaign_posts:
-            platform = post.get("platform", "other")
-            if platform not in platform_counts:
-                platform_counts[platform] = set()
-            platform_counts[platform].add(campaign["id"])
-    
-    platform_breakdown = []
-    for platform, campaign_ids in platform_counts.items():
-        count = len(campaign_ids)
-        platform_breakdown.append({
+    # Platform breakdown: campaigns with posts on each platform
+    platform_breakdown = [
+        {
             "platform": platform,
             "campaign_count": count,
             "percentage": round((count / total_campaigns * 100), 1) if total_campaigns > 0 else 0
-        })
+        }
+        for platform, count in overview["campaigns_by_platform"].items()
+    ]
     
     # Sort by count
-    platform_breakdown.sort(key=lambda x: x["campaign_count"], reverse=True)
+    platform_breakdown.sort(key=lambda x: (-x["campaign_count"], x["platform"]))
     
-    # Recent activity (mock data for demo)
-    recent_activity = {
-        "last_24h": {
-            "new_campaigns": 3,
-            "new_posts": 1247,
-            "new_accounts": 89
-        },
-        "last_7d": {
-            "new_campaigns": 15,
-            "new_posts": 8934,
-            "new_accounts": 421
+    # New campaigns, posts and accounts, summed from the hourly and daily rollups
+    recent_activity = {}
+    for label, period in (("last_24h", "24h"), ("last_7d", "7d")):
+        series = data_loader.get_time_series(ACTIVITY_METRICS, period)
+        recent_activity[label] = {
+            f"new_{metric}": sum(row[metric] for row in series) for metric in ACTIVITY_METRICS
         }
-    }
     
     # Trend data (last 7 days)
-    trend_data = [
-        {"date": "2026-01-29", "campaigns": 2, "posts": 450},
-        {"date": "2026-01-30", "campaigns": 3, "posts": 678},
-        {"date": "2026-01-31", "campaigns": 1, "posts": 234},
-        {"date": "2026-02-01", "campaigns": 4, "posts": 892},
-        {"date": "2026-02-02", "campaigns": 2, "posts": 567},
-        {"date": "2026-02-03", "campaigns": 5, "posts": 1123},
-        {"date": "2026-02-04", "campaigns": 3, "posts": 1247}
-    ]
+    trend_data = data_loader.get_time_series([CAMPAIGNS, POSTS], "7d")
     
-    return StandardResponse(
-        success=True,
-        data={
-            "stats": {
-                "total_campaigns": total_campaigns,
-                "active_threats": active_threats,
-                "high_risk_campaigns": high_risk_campaigns,
-                "total_accounts_monitored": total_accounts_monitored,
-                "total_posts_analyzed": total_posts_analyzed,
-                "bot_accounts_detected": bot_accounts_detected
-            },
-            "threat_distribution": threat_distribution,
-            "platform_breakdown": platform_breakdown,
-            "recent_activity": recent_activity,
-            "trend_data": trend_data
+    data = {
+        "stats": {
+            "total_campaigns": total_campaigns,
+            "active_threats": overview["active_campaigns"],
+            "high_risk_campaigns": threat_distribution["high"] + threat_distribution["critical"],
+            "total_accounts_monitored": overview["total_accounts"],
+            "total_posts_analyzed": overview["total_posts"],
+            "bot_accounts_detected": overview["accounts_by_type"].get("bot", 0)
         },
-        timestamp=datetime.utcnow().isoformat() + "Z"
-    )
+        "threat_distribution": threat_distribution,
+        "platform_breakdown": platform_breakdown,
+        "recent_activity": recent_activity,
+        "trend_data": trend_data
+    }
+    if consistency:
+        data["aggregates"] = consistency
+    
+    return json_response(data)
 
 
 @router.get("/threats")
@@ -108,23 +80,15 @@ async def get_threat_analytics(
     
     campaigns = data_loader.get_all_campaigns()
     
-    # Threat trends (mock data based on period)
-    if period == "7d":
-        threat_trends = [
-            {"date": "2026-01-29", "critical": 0, "high": 1, "medium": 3, "low": 2},
-            {"date": "2026-01-30", "critical": 1, "high": 2, "medium": 4, "low": 3},
-            {"date": "2026-01-31", "critical": 0, "high": 1, "medium": 2, "low": 1},
-            {"date": "2026-02-01", "critical": 0, "high": 2, "medium": 5, "low": 4},
-            {"date": "2026-02-02", "critical": 1, "high": 1, "medium": 3, "low": 2},
-            {"date": "2026-02-03", "critical": 0, "high": 3, "medium": 6, "low": 5},
-            {"date": "2026-02-04", "critical": 2, "high": 2, "medium": 4, "low": 3}
-        ]
-    else:
-        # Default to 7d for demo
-        threat_trends = [
-            {"date": "2026-01-29", "critical": 0, "high": 1, "medium": 3, "low": 2},
-            {"date": "2026-01-30", "critical": 1, "high": 2, "medium": 4, "low": 3}
-        ]
+    # Campaigns detected per threat level, bucketed by hour (24h) or day
+    try:
+        series = data_loader.get_time_series([threat_metric(level) for level in THREAT_LEVELS], period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    threat_trends = [
+        {"date": row["date"], **{level: row[threat_metric(level)] for level in THREAT_LEVELS}}
+        for row in series
+    ]
     
     # Campaign type distribution
     type_counts = {}
@@ -151,12 +115,8 @@ async def get_threat_analytics(
         {"indicator": "Suspicious accounts", "frequency": 19}
     ]
     
-    return StandardResponse(
-        success=True,
-        data={
-            "threat_trends": threat_trends,
-            "campaign_type_distribution": campaign_type_distribution,
-            "top_threat_indicators": top_threat_indicators
-        },
-        timestamp=datetime.utcnow().isoformat() + "Z"
-    )
+    return json_response({
+        "threat_trends": threat_trends,
+        "campaign_type_distribution": campaign_type_distribution,
+        "top_threat_indicators": top_threat_indicators
+    })
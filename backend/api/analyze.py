@@ -1,97 +1,468 @@
-from fastapi import APIRouter
-from datetime import datetime
-import time
-import random
-import string
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Callable, Optional, Tuple
+import asyncio
+import json
+import re
+
+import numpy as np
 
 from models.schemas import AnalyzeRequest, AnalyzeResponse
+from utils.analysis import (
+    PostRow,
+    POST_ROW_FIELDS,
+    ID,
+    ACCOUNT_ID,
+    CAMPAIGN_ID,
+    POSTED_AT,
+    CONTENT,
+    chunked,
+    prepare_chunk,
+    near_duplicate_clusters,
+    content_similarity_by_campaign,
+    timing_by_campaign,
+    burst_summaries
+)
+from utils.minhash import NUM_PERM, near_duplicate_labels
+from utils.timing import partition, detect_bursts, merge_episodes
+from utils.network import CO_ACTIVITY_FIELDS, co_activity_graph
+from utils.bot_scoring import rescore_accounts
 from utils.data_loader import data_loader
+from utils.jobs import Job, JobManager, QueueFullError, COMPLETED
 
 router = APIRouter(prefix="/api", tags=["Analysis"])
 
+# Posts per unit of work handed to the process pool
+ANALYSIS_CHUNK_SIZE = 5000
 
-def generate_id(prefix: str) -> str:
-    """Generate a random ID"""
-    random_suffix = ''.join(random.choices(string.digits, k=3))
-    return f"{prefix}_{random_suffix}"
+# Seconds between keep-alive comments on an idle progress stream
+STREAM_KEEPALIVE_SECONDS = 15
 
+_TIME_RANGE = re.compile(r"^(\d+)([hd])$")
 
-@router.post("/analyze")
-async def trigger_analysis(request: AnalyzeRequest = None):
+
+def parse_time_range(time_range: Optional[str]) -> Optional[timedelta]:
+    """Parse "24h" / "7d" style ranges; "all" or empty means no limit
+
+    Raises ValueError for anything else.
     """
-    Simulate running the AI detection engine (for demo purposes)
-    
-    This endpoint simulates processing time and returns mock detected campaigns
+    if not time_range or time_range == "all":
+        return None
+    match = _TIME_RANGE.match(time_range)
+    if not match:
+        raise ValueError(f"Invalid time_range '{time_range}' (expected e.g. 24h, 7d or all)")
+    amount, unit = int(match.group(1)), match.group(2)
+    return timedelta(hours=amount) if unit == "h" else timedelta(days=amount)
+
+
+def _post_row(post: Dict[str, Any]) -> PostRow:
+    return (
+        post["id"],
+        post["account_id"],
+        post.get("campaign_id") or "",
+        post.get("platform", ""),
+        post.get("posted_at", ""),
+        post.get("content_hash", ""),
+        post.get("content", "")
+    )
+
+
+def _collect_posts(params: Dict[str, Any]) -> List[PostRow]:
+    """Select the posts an analysis covers as compact rows
+
+    The time range ends at the newest matching post, so replayed or mock data
+    still falls inside the window.
     """
-    
-    # Use default values if no request body provided
-    if request is None:
-        request = AnalyzeRequest()
-    
-    # Simulate processing time (3-5 seconds)
-    processing_time = random.uniform(3, 5)
-    start_time = datetime.utcnow()
-    
-    # In a real implementation, you would:
-    # 1. Fetch data from social media APIs
-    # 2. Run detection algorithms
-    # 3. Store results in database
-    # For demo, we just wait a bit
-    time.sleep(processing_time)
-    
-    end_time = datetime.utcnow()
-    
-    # Generate mock results
-    analysis_id = generate_id("analysis")
-    
-    # Create 1-2 new mock campaigns
-    num_new_campaigns = random.randint(1, 2)
+    source = params.get("source")
+    platform = None if not source or source == "all" else source
+    keywords = [k for k in params.get("keywords") or [] if k.strip()]
+    if keywords:
+        posts = data_loader.search_posts(" OR ".join(keywords), platform)
+    else:
+        posts = data_loader.filter_posts(platform)
+
+    window = parse_time_range(params.get("time_range"))
+    if window is not None and posts:
+        newest = max(p.get("posted_at", "") for p in posts)
+        try:
+            end = datetime.strptime(newest, "%Y-%m-%dT%H:%M:%SZ")
+            cutoff = (end - window).strftime("%Y-%m-%dT%H:%M:%SZ")
+            posts = [p for p in posts if p.get("posted_at", "") >= cutoff]
+        except ValueError:
+            pass
+
+    return [_post_row(p) for p in posts]
+
+
+def _summarize(rows: List[PostRow], clusters: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Turn coordinated clusters into analysis results"""
+    flagged_accounts = set()
+    bot_accounts = set()
     new_campaigns = []
-    
-    for i in range(num_new_campaigns):
-        campaign_id = generate_id("camp")
-        
-        threat_levels = ["low", "medium", "high"]
-        threat_level = random.choice(threat_levels)
-        
-        campaign_types = ["political", "commercial", "malware"]
-        campaign_type = random.choice(campaign_types)
-        
-        titles = [
-            "New Coordinated Campaign Detected",
-            "Suspicious Hashtag Spread",
-            "Bot Network Activity",
-            "Misinformation Campaign"
-        ]
-        
-        new_campaign = {
-            "id": campaign_id,
-            "title": random.choice(titles),
+    for cluster in clusters:
+        bot_probabilities = []
+        for account_id in cluster["account_ids"]:
+            flagged_accounts.add(account_id)
+            account = data_loader.get_account_by_id(account_id)
+            if account:
+                bot_probabilities.append(account.get("bot_probability", 0))
+                if account.get("account_type") == "bot":
+                    bot_accounts.add(account_id)
+
+        total_accounts = len(cluster["account_ids"])
+        if total_accounts >= 10:
+            threat_level = "high"
+        elif total_accounts >= 3:
+            threat_level = "medium"
+        else:
+            threat_level = "low"
+
+        new_campaigns.append({
+            "id": f"cluster_{cluster['content_hash'][:12]}",
+            "title": "Coordinated Near-Duplicate Content",
             "threat_level": threat_level,
-            "total_posts": random.randint(30, 100),
-            "total_accounts": random.randint(10, 50),
-            "confidence_score": round(random.uniform(60, 95), 1)
-        }
-        new_campaigns.append(new_campaign)
-    
-    # Mock analysis results
-    results = {
-        "posts_analyzed": random.randint(500, 2000),
-        "campaigns_detected": num_new_campaigns,
+            "total_posts": len(cluster["post_ids"]),
+            "total_accounts": total_accounts,
+            "confidence_score": round(sum(bot_probabilities) / len(bot_probabilities), 1) if bot_probabilities else 0,
+            "content_hash": cluster["content_hash"],
+            "content_variants": cluster["content_hashes"],
+            "existing_campaign_ids": cluster["campaign_ids"],
+            "platforms": cluster["platforms"],
+            "first_post_at": cluster["first_post_at"],
+            "last_post_at": cluster["last_post_at"],
+            "sample_post_ids": cluster["post_ids"][:10]
+        })
+
+    return {
+        "posts_analyzed": len(rows),
+        "campaigns_detected": len(new_campaigns),
         "new_campaigns": new_campaigns,
-        "accounts_flagged": random.randint(10, 30),
-        "bot_accounts_detected": random.randint(5, 15)
+        "accounts_flagged": len(flagged_accounts),
+        "bot_accounts_detected": len(bot_accounts)
     }
-    
+
+
+# Threat score fields computed by analyses, each with the analysis_metadata
+# entry recorded beside it
+_SCORE_FIELDS = {
+    "content_similarity_score": "unique_content_hashes",
+    "timing_pattern_score": "burst_posts",
+    "network_density_score": "network_edges"
+}
+
+# analysis_metadata.score_scope of scores computed over every post of the campaign
+CAMPAIGN_SCOPE = "campaign"
+
+
+async def _hash_rows(
+    rows: List[PostRow],
+    jobs: JobManager,
+    on_progress: Optional[Callable[[float], None]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """MinHash signatures and epoch timestamps of rows, computed chunk by chunk in the process pool"""
+    chunks = [
+        (index, [row[CONTENT] for row in chunk], [row[POSTED_AT] for row in chunk])
+        for index, chunk in enumerate(chunked(rows, ANALYSIS_CHUNK_SIZE))
+    ]
+    signatures: List[Optional[np.ndarray]] = [None] * len(chunks)
+    epochs: List[Optional[np.ndarray]] = [None] * len(chunks)
+    done = 0
+
+    def on_chunk(result):
+        nonlocal done
+        index, signatures[index], epochs[index] = result
+        done += 1
+        if on_progress is not None:
+            on_progress(done / len(chunks))
+
+    await jobs.map(prepare_chunk, chunks, on_chunk)
+    matrix = np.concatenate(signatures) if signatures else np.empty((0, NUM_PERM), dtype=np.uint32)
+    times = np.concatenate(epochs) if epochs else np.empty(0, dtype=np.int64)
+    return matrix, times
+
+
+async def _detect_bursts(
+    rows: List[PostRow],
+    labels: np.ndarray,
+    times: np.ndarray,
+    jobs: JobManager
+) -> Tuple[np.ndarray, List[Tuple[np.ndarray, Dict[str, np.ndarray]]]]:
+    """Which rows fall inside a coordinated burst, and the bursts found per partition"""
+    account_codes: Dict[str, int] = {}
+    accounts = np.fromiter(
+        (account_codes.setdefault(row[ACCOUNT_ID], len(account_codes)) for row in rows), dtype=np.int64, count=len(rows)
+    )
+    parts = partition(labels)
+    covered = np.zeros(len(rows), dtype=bool)
+    found = []
+
+    def on_partition(result):
+        index, part_covered, part_episodes = result
+        covered[parts[index]] = part_covered
+        found.append((parts[index], part_episodes))
+
+    await jobs.map(
+        detect_bursts,
+        ((i, times[part], labels[part], accounts[part]) for i, part in enumerate(parts)),
+        on_partition
+    )
+    return covered, found
+
+
+# Post fields read to score a campaign: its rows plus the co-activity features
+_CAMPAIGN_POST_FIELDS = list(dict.fromkeys([*POST_ROW_FIELDS, *CO_ACTIVITY_FIELDS]))
+
+
+def _sample_episodes(episodes: Dict[str, np.ndarray], sample: int) -> Dict[str, np.ndarray]:
+    """Burst episodes starting at one of the first sample rows, i.e. at an analyzed post"""
+    keep = episodes["first"] < sample
+    return {name: values[keep] for name, values in episodes.items()}
+
+
+def _network(columns: Dict[str, List[Any]]) -> Dict[str, Any]:
+    """Co-activity network density of the accounts behind posts given as columns"""
+    metrics = co_activity_graph(columns).metrics()
+    return {"network_density_score": metrics["network_density_score"], "network_edges": metrics["edges"]}
+
+
+def _campaign_columns(campaign_ids: List[str]) -> Dict[str, Dict[str, List[Any]]]:
+    """Row and co-activity fields of every post of each campaign"""
+    return {
+        campaign_id: data_loader.get_campaign_post_columns(campaign_id, _CAMPAIGN_POST_FIELDS)
+        for campaign_id in campaign_ids
+    }
+
+
+def _campaign_extras(rows: List[PostRow], campaign_columns: Dict[str, Dict[str, List[Any]]]) -> List[PostRow]:
+    """Compact rows of the campaigns' posts that an analysis's filters left out"""
+    sampled = {row[ID] for row in rows}
+    extras = []
+    for columns in campaign_columns.values():
+        for i, post_id in enumerate(columns["id"]):
+            if post_id not in sampled:
+                extras.append(tuple(columns[field][i] or "" for field in POST_ROW_FIELDS))
+    return extras
+
+
+async def _network_by_campaign(
+    campaign_columns: Dict[str, Dict[str, List[Any]]],
+    on_progress: Callable[[float], None]
+) -> Dict[str, Dict[str, Any]]:
+    """Network density of each campaign over every post it has"""
+    network = {}
+    for done, (campaign_id, columns) in enumerate(campaign_columns.items(), 1):
+        network[campaign_id] = await asyncio.to_thread(_network, columns)
+        on_progress(done / len(campaign_columns))
+    return network
+
+
+def _update_threat_scores(*stats: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Write computed per-campaign scores into existing campaign threat scores"""
+    analyzed_at = datetime.utcnow().isoformat() + "Z"
+    by_campaign: Dict[str, Dict[str, Any]] = {}
+    for campaign_stats in stats:
+        for campaign_id, values in campaign_stats.items():
+            by_campaign.setdefault(campaign_id, {}).update(values)
+
+    updated = []
+    for campaign_id in sorted(by_campaign):
+        score = data_loader.get_threat_score_by_campaign(campaign_id)
+        if score is None:
+            continue
+        score = dict(score)
+        metadata = dict(score.get("analysis_metadata") or {})
+        values = by_campaign[campaign_id]
+        for field, metadata_field in _SCORE_FIELDS.items():
+            if field in values:
+                score[field] = values[field]
+                metadata[metadata_field] = values[metadata_field]
+        if "posts_analyzed" in values:
+            metadata["posts_analyzed"] = values["posts_analyzed"]
+            metadata["score_scope"] = CAMPAIGN_SCOPE
+        score["analysis_metadata"] = metadata
+        score["analyzed_at"] = analyzed_at
+        data_loader.upsert_threat_score(score)
+        updated.append(campaign_id)
+    return updated
+
+
+async def run_analysis(job: Job, jobs: JobManager) -> Dict[str, Any]:
+    """Analysis pipeline: collect posts, then MinHash, cluster and time them in the process pool, then score
+
+    Account bot scores are recomputed, and per-campaign content similarity,
+    timing and network density scores are written back into the threat
+    scores of the campaigns the analyzed posts belong to.
+    """
+    job.report(0.02, "collecting posts")
+    rows = await asyncio.to_thread(_collect_posts, job.params)
+    # Filters choose which campaigns are re-scored, not which of their posts
+    # count: campaign posts outside the sample are analyzed alongside it, and
+    # sample posts are hashed once for both
+    campaign_ids = sorted({row[CAMPAIGN_ID] for row in rows if row[CAMPAIGN_ID]})
+    campaign_columns = await asyncio.to_thread(_campaign_columns, campaign_ids)
+    combined = rows + await asyncio.to_thread(_campaign_extras, rows, campaign_columns)
+    sample = len(rows)
+
+    job.report(0.1, "hashing content")
+    matrix, times = await _hash_rows(combined, jobs, lambda share: job.report(0.1 + 0.5 * share))
+
+    job.report(0.6, "clustering near-duplicates")
+    labels = await jobs.run(near_duplicate_labels, matrix)
+
+    job.report(0.75, "detecting timing bursts")
+    covered, found = await _detect_bursts(combined, labels, times, jobs)
+
+    job.report(0.8, "scoring accounts")
+    _, account_changes = await asyncio.to_thread(rescore_accounts, data_loader)
+    accounts_rescored = data_loader.update_accounts(account_changes)
+
+    job.report(0.85, "scoring clusters")
+    clusters = await asyncio.to_thread(near_duplicate_clusters, rows, labels[:sample].tolist())
+
+    job.report(0.9, "scoring campaigns")
+    similarity = await asyncio.to_thread(content_similarity_by_campaign, combined, labels.tolist())
+    timing = await asyncio.to_thread(timing_by_campaign, combined, covered.tolist())
+    network = await _network_by_campaign(campaign_columns, lambda share: job.report(0.9 + 0.08 * share))
+    results = await asyncio.to_thread(_summarize, rows, clusters)
+    episodes = _sample_episodes(merge_episodes(found), sample) if found else {}
+    results["coordinated_bursts"] = burst_summaries(rows, episodes)
+    results["content_similarity"] = similarity
+    results["timing_patterns"] = timing
+    results["network_density"] = network
+    results["accounts_rescored"] = accounts_rescored
+    # Writes stay on the event loop so readers never see a half-applied update
+    results["threat_scores_updated"] = _update_threat_scores(similarity, timing, network)
+    return results
+
+
+analysis_jobs = JobManager(run_analysis, prefix="analysis")
+
+
+def _get_job(analysis_id: str) -> Job:
+    job = analysis_jobs.get(analysis_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Analysis with ID '{analysis_id}' not found"
+        )
+    return job
+
+
+def _job_data(job: Job, include_result: bool = True) -> Dict[str, Any]:
+    data = job.to_dict(include_result)
+    data["analysis_id"] = data.pop("id")
+    return data
+
+
+def _links(analysis_id: str) -> Dict[str, str]:
+    base = f"/api/analyze/{analysis_id}"
+    return {
+        "status": base,
+        "results": f"{base}/results",
+        "events": f"{base}/events",
+        "cancel": f"{base}/cancel"
+    }
+
+
+@router.post("/analyze", status_code=202)
+async def trigger_analysis(request: AnalyzeRequest = None):
+    """
+    Queue a run of the detection engine
+
+    Returns immediately with an analysis_id; poll the status endpoint or
+    subscribe to the events stream for progress and results.
+    """
+
+    # Use default values if no request body provided
+    if request is None:
+        request = AnalyzeRequest()
+
+    try:
+        parse_time_range(request.time_range)
+        job = analysis_jobs.submit(request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+    return AnalyzeResponse(
+        success=True,
+        data={
+            "analysis_id": job.id,
+            "status": job.status,
+            "created_at": job.created_at,
+            "links": _links(job.id)
+        },
+        timestamp=datetime.utcnow().isoformat() + "Z"
+    )
+
+
+@router.get("/analyze/{analysis_id}")
+async def get_analysis_status(analysis_id: str):
+    """Get the status and progress of an analysis, with results once completed"""
+    job = _get_job(analysis_id)
+    return AnalyzeResponse(
+        success=True,
+        data={**_job_data(job), "links": _links(job.id)},
+        timestamp=datetime.utcnow().isoformat() + "Z"
+    )
+
+
+@router.get("/analyze/{analysis_id}/results")
+async def get_analysis_results(analysis_id: str):
+    """Get the results of a completed analysis"""
+    job = _get_job(analysis_id)
+    if job.status != COMPLETED:
+        detail = f"Analysis '{analysis_id}' is {job.status}"
+        if job.error:
+            detail += f": {job.error}"
+        raise HTTPException(status_code=409, detail=detail)
     return AnalyzeResponse(
         success=True,
         data={
-            "analysis_id": analysis_id,
-            "status": "completed",
-            "started_at": start_time.isoformat() + "Z",
-            "completed_at": end_time.isoformat() + "Z",
-            "duration_seconds": round(processing_time, 2),
-            "results": results
+            "analysis_id": job.id,
+            "status": job.status,
+            "started_at": job.started_at,
+            "completed_at": job.completed_at,
+            "results": job.result
         },
         timestamp=datetime.utcnow().isoformat() + "Z"
     )
+
+
+@router.post("/analyze/{analysis_id}/cancel")
+async def cancel_analysis(analysis_id: str):
+    """Cancel a queued or running analysis"""
+    job = _get_job(analysis_id)
+    if not job.finished:
+        analysis_jobs.cancel(analysis_id)
+        # Let the job observe the cancellation before reporting its state
+        while not job.finished and await job.wait_for_change(job.version, timeout=1.0):
+            pass
+    return AnalyzeResponse(
+        success=True,
+        data=_job_data(job, include_result=False),
+        timestamp=datetime.utcnow().isoformat() + "Z"
+    )
+
+
+@router.get("/analyze/{analysis_id}/events")
+async def stream_analysis_events(analysis_id: str):
+    """Stream analysis progress as server-sent events until it finishes"""
+    job = _get_job(analysis_id)
+
+    async def events():
+        while True:
+            version, finished = job.version, job.finished
+            yield f"event: progress\ndata: {json.dumps(_job_data(job, include_result=False))}\n\n"
+            if finished:
+                break
+            while not await job.wait_for_change(version, timeout=STREAM_KEEPALIVE_SECONDS):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,14 +1,32 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-from datetime import datetime
+from typing import Dict, Any, Optional, Sequence
 import math
 
-from models.schemas import StandardResponse, ErrorResponse
+from models.schemas import Campaign, Post, PostWithDetails, AccountWithCampaigns
 from utils.data_loader import data_loader
+from utils.fields import parse_fields, project, stored_fields
+from utils.json_response import FragmentCache, json_response, ndjson_response
+from utils.metrics import span
+from utils.network import CO_ACTIVITY_FIELDS, co_activity_graph
+from utils.rollups import POSTS
 
 router = APIRouter(prefix="/api/campaigns", tags=["Campaigns"])
 
 
+def _with_account_username(post: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """A copy of a post with its account's username added, if among fields"""
+    post_copy = post.copy()
+    if fields is None or "account_username" in fields:
+        account = data_loader.get_account_by_id(post["account_id"])
+        post_copy["account_username"] = account["username"] if account else "Unknown"
+    return post_copy
+
+
+# Encoded list entries, reused until the next write
+campaign_fragments = FragmentCache(data_loader.data_version)
+campaign_post_fragments = FragmentCache(data_loader.data_version, _with_account_username)
+
+
 @router.get("")
 async def get_campaigns(
     status: Optional[str] = Query("all", description="Filter by status"),
@@ -17,52 +35,60 @@ async def get_campaigns(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
     sort_by: str = Query("detected_at", description="Sort field"),
-    order: str = Query("desc", description="Sort order (asc/desc)")
+    order: str = Query("desc", description="Sort order (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (replaces page)"),
+    fields: Optional[str] = Query(None, description="Comma-separated campaign fields to return (default: all)")
 ):
     """Get list of campaigns with filtering and pagination"""
     
-    # Filter campaigns
-    campaigns = data_loader.filter_campaigns(
-        status=status,
-        threat_level=threat_level,
-        campaign_type=campaign_type
-    )
-    
-    # Sort campaigns
-    reverse = (order == "desc")
-    if sort_by in ["detected_at", "last_activity", "created_at", "updated_at"]:
-        campaigns.sort(key=lambda x: x.get(sort_by, ""), reverse=reverse)
-    elif sort_by in ["total_posts", "total_accounts", "confidence_score"]:
-        campaigns.sort(key=lambda x: x.get(sort_by, 0), reverse=reverse)
+    # Filter, sort and paginate campaigns from the indexes
+    start_idx = (page - 1) * limit
+    try:
+        selected = parse_fields(fields, Campaign)
+        paginated_campaigns, total_items, next_cursor = data_loader.page_campaigns(
+            start_idx,
+            limit,
+            status=status,
+            threat_level=threat_level,
+            campaign_type=campaign_type,
+            sort_by=sort_by,
+            order=order,
+            cursor=cursor,
+            fields=stored_fields(selected, ["id"])
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Pagination
-    total_items = len(campaigns)
     total_pages = math.ceil(total_items / limit) if total_items > 0 else 1
-    start_idx = (page - 1) * limit
-    end_idx = start_idx + limit
-    paginated_campaigns = campaigns[start_idx:end_idx]
-    
-    return StandardResponse(
-        success=True,
-        data={
-            "campaigns": paginated_campaigns,
-            "pagination": {
-                "current_page": page,
-                "total_pages": total_pages,
-                "total_items": total_items,
-                "items_per_page": limit,
-                "has_next": page < total_pages,
-                "has_previous": page > 1
-            }
-        },
-        timestamp=datetime.utcnow().isoformat() + "Z"
-    )
+    
+    return json_response({
+        "campaigns": campaign_fragments.encode(paginated_campaigns, selected),
+        "pagination": {
+            "current_page": page,
+            "total_pages": total_pages,
+            "total_items": total_items,
+            "items_per_page": limit,
+            "has_next": next_cursor is not None,
+            "has_previous": page > 1 or cursor is not None,
+            "next_cursor": next_cursor
+        }
+    })
 
 
 @router.get("/{campaign_id}")
-async def get_campaign_detail(campaign_id: str):
+async def get_campaign_detail(
+    campaign_id: str,
+    period: str = Query("all", description="Timeline period: 24h, 7d, 30d, all"),
+    fields: Optional[str] = Query(None, description="Comma-separated campaign fields to return (default: all)")
+):
     """Get detailed information about a specific campaign"""
     
+    try:
+        selected = parse_fields(fields, Campaign)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     # Get campaign
     campaign = data_loader.get_campaign_by_id(campaign_id)
     if not campaign:
@@ -74,59 +100,43 @@ async def get_campaign_detail(campaign_id: str):
     # Get threat analysis
     threat_analysis = data_loader.get_threat_score_by_campaign(campaign_id)
     
-    # Get posts for this campaign
-    posts = data_loader.get_posts_by_campaign(campaign_id)
-    
-    # Calculate top hashtags
-    hashtag_counts = {}
-    for post in posts:
-        for tag in post.get("hashtags", []):
-            hashtag_counts[tag] = hashtag_counts.get(tag, 0) + 1
-    
-    top_hashtags = [
-        {"tag": tag, "count": count}
-        for tag, count in sorted(hashtag_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-    ]
-    
-    # Calculate platform breakdown
-    platform_counts = {}
-    for post in posts:
-        platform = post.get("platform", "other")
-        platform_counts[platform] = platform_counts.get(platform, 0) + 1
+    # Hashtag, platform, account and post time counts, maintained as posts are written
+    stats = data_loader.get_campaign_stats(campaign_id)
     
-    total_posts = len(posts)
+    total_posts = stats["total_posts"]
     platform_breakdown = [
         {
             "platform": platform,
             "post_count": count,
             "percentage": round((count / total_posts * 100), 1) if total_posts > 0 else 0
         }
-        for platform, count in platform_counts.items()
+        for platform, count in stats["platforms"].items()
     ]
     
-    # Generate mock timeline (simplified)
-    timeline = [
-        {"date": "2026-02-04T10:00:00Z", "post_count": 15},
-        {"date": "2026-02-04T11:00:00Z", "post_count": 89},
-        {"date": "2026-02-04T12:00:00Z", "post_count": 67},
-        {"date": "2026-02-04T13:00:00Z", "post_count": 43},
-        {"date": "2026-02-04T14:00:00Z", "post_count": 33}
-    ]
+    # Post timeline from the campaign's own hourly and daily rollups
+    try:
+        with span("timeline"):
+            series = data_loader.get_time_series([POSTS], period, scope=campaign_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    timeline = [{"date": row["date"], "post_count": row[POSTS]} for row in series]
     
     # Build response
-    campaign_detail = campaign.copy()
-    
-    return StandardResponse(
-        success=True,
-        data={
-            "campaign": campaign_detail,
-            "threat_analysis": threat_analysis,
-            "top_hashtags": top_hashtags,
-            "platform_breakdown": platform_breakdown,
-            "timeline": timeline
+    campaign_detail = project(campaign, selected).copy()
+    
+    return json_response({
+        "campaign": campaign_detail,
+        "threat_analysis": threat_analysis,
+        "activity": {
+            "total_posts": total_posts,
+            "unique_accounts": stats["unique_accounts"],
+            "first_post_at": stats["first_post_at"],
+            "last_post_at": stats["last_post_at"]
         },
-        timestamp=datetime.utcnow().isoformat() + "Z"
-    )
+        "top_hashtags": stats["top_hashtags"],
+        "platform_breakdown": platform_breakdown,
+        "timeline": timeline
+    })
 
 
 @router.get("/{campaign_id}/posts")
@@ -134,7 +144,9 @@ async def get_campaign_posts(
     campaign_id: str,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    sort_by: str = Query("posted_at", description="Sort field")
+    sort_by: str = Query("posted_at", description="Sort field"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (replaces page)"),
+    fields: Optional[str] = Query(None, description="Comma-separated post fields to return (default: all)")
 ):
     """Get all posts for a specific campaign"""
     
@@ -146,53 +158,83 @@ async def get_campaign_posts(
             detail=f"Campaign with ID '{campaign_id}' not found"
         )
     
-    # Get posts
-    posts = data_loader.get_posts_by_campaign(campaign_id)
-    
-    # Sort posts
-    if sort_by == "posted_at":
-        posts.sort(key=lambda x: x.get("posted_at", ""), reverse=True)
-    elif sort_by == "engagement_count":
-        posts.sort(key=lambda x: x.get("engagement_count", 0), reverse=True)
+    # Fetch only the requested page and fields of the campaign's posts
+    start_idx = (page - 1) * limit
+    try:
+        selected = parse_fields(fields, PostWithDetails)
+        posts, total_items, next_cursor = data_loader.page_posts(
+            start_idx,
+            limit,
+            campaign_id=campaign_id,
+            sort_by=sort_by,
+            cursor=cursor,
+            fields=stored_fields(selected, ["id", "account_id"])
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Add account usernames to posts
-    enriched_posts = []
-    for post in posts:
-        account = data_loader.get_account_by_id(post["account_id"])
-        post_copy = post.copy()
-        post_copy["account_username"] = account["username"] if account else "Unknown"
-        enriched_posts.append(post_copy)
+    paginated_posts = campaign_post_fragments.encode(posts, selected)
     
     # Pagination
-    total_items = len(enriched_posts)
     total_pages = math.ceil(total_items / limit) if total_items > 0 else 1
-    start_idx = (page - 1) * limit
-    end_idx = start_idx + limit
-    paginated_posts = enriched_posts[start_idx:end_idx]
-    
-    return StandardResponse(
-        success=True,
-        data={
-            "campaign_id": campaign_id,
-            "campaign_title": campaign["title"],
-            "posts": paginated_posts,
-            "pagination": {
-                "current_page": page,
-                "total_pages": total_pages,
-                "total_items": total_items,
-                "items_per_page": limit,
-                "has_next": page < total_pages,
-                "has_previous": page > 1
-            }
-        },
-        timestamp=datetime.utcnow().isoformat() + "Z"
+    
+    return json_response({
+        "campaign_id": campaign_id,
+        "campaign_title": campaign["title"],
+        "posts": paginated_posts,
+        "pagination": {
+            "current_page": page,
+            "total_pages": total_pages,
+            "total_items": total_items,
+            "items_per_page": limit,
+            "has_next": next_cursor is not None,
+            "has_previous": page > 1 or cursor is not None,
+            "next_cursor": next_cursor
+        }
+    })
+
+
+@router.get("/{campaign_id}/posts/export")
+async def export_campaign_posts(
+    campaign_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated post fields to return (default: all)")
+):
+    """Stream every post of a campaign as NDJSON, one post per line in stored order"""
+    
+    # Verify campaign exists
+    campaign = data_loader.get_campaign_by_id(campaign_id)
+    if not campaign:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Campaign with ID '{campaign_id}' not found"
+        )
+    
+    try:
+        selected = parse_fields(fields, Post)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return ndjson_response(
+        data_loader.iter_posts(campaign_id=campaign_id, fields=selected),
+        f"{campaign_id}-posts.ndjson"
     )
 
 
 @router.get("/{campaign_id}/accounts")
-async def get_campaign_accounts(campaign_id: str):
+async def get_campaign_accounts(
+    campaign_id: str,
+    top_n: int = Query(20, ge=1, le=200, description="Accounts to include in the network graph"),
+    max_edges: int = Query(200, ge=0, le=2000, description="Heaviest edges to include in the network graph"),
+    fields: Optional[str] = Query(None, description="Comma-separated account fields to return (default: all)")
+):
     """Get all accounts involved in a specific campaign"""
     
+    try:
+        selected = parse_fields(fields, AccountWithCampaigns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     # Verify campaign exists
     campaign = data_loader.get_campaign_by_id(campaign_id)
     if not campaign:
@@ -202,44 +244,54 @@ async def get_campaign_accounts(campaign_id: str):
         )
     
     # Get accounts
-    accounts = data_loader.get_accounts_by_campaign(campaign_id)
+    with span("accounts") as s:
+        accounts = data_loader.get_accounts_by_campaign(
+            campaign_id, fields=stored_fields(selected, ["id", "username", "account_type"])
+        )
+        s.rows = len(accounts)
     
     # Calculate bot percentage
     bot_count = sum(1 for acc in accounts if acc["account_type"] == "bot")
     bot_percentage = round((bot_count / len(accounts) * 100), 1) if accounts else 0
     
-    # Generate network graph (simplified)
-    nodes = [
-        {
+    # Link accounts that share content, hashtags, mentions or posting windows
+    with span("network") as s:
+        columns = data_loader.get_campaign_post_columns(campaign_id, CO_ACTIVITY_FIELDS)
+        s.rows = len(columns["account_id"])
+        graph = co_activity_graph(columns)
+    accounts_by_id = {acc["id"]: acc for acc in accounts}
+    
+    # Keep the most connected accounts and the heaviest edges between them
+    top = graph.top_nodes(top_n)
+    nodes = []
+    for i in top:
+        acc = accounts_by_id.get(graph.account_ids[i])
+        if acc is None:
+            continue
+        nodes.append({
             "id": acc["id"],
             "label": acc["username"],
             "type": acc["account_type"],
-            "size": acc.get("post_count_in_campaign", 1)
-        }
-        for acc in accounts[:20]  # Limit to first 20 for performance
-    ]
-    
-    # Create some mock edges (connections between accounts)
-    edges = []
-    for i in range(min(len(nodes) - 1, 10)):
-        edges.append({
-            "source": nodes[i]["id"],
-            "target": nodes[i + 1]["id"],
-            "weight": 5
+            "size": acc.get("post_count_in_campaign", 1),
+            "degree": int(graph.degree[i]),
+            "weighted_degree": int(graph.weighted_degree[i])
         })
     
-    return StandardResponse(
-        success=True,
-        data={
-            "campaign_id": campaign_id,
-            "campaign_title": campaign["title"],
-            "total_accounts": len(accounts),
-            "bot_percentage": bot_percentage,
-            "accounts": accounts,
-            "network_graph": {
-                "nodes": nodes,
-                "edges": edges
-            }
-        },
-        timestamp=datetime.utcnow().isoformat() + "Z"
-    )
+    edges = [
+        {"source": source, "target": target, "weight": weight}
+        for source, target, weight in graph.subgraph_edges(top, max_edges)
+        if source in accounts_by_id and target in accounts_by_id
+    ]
+    
+    return json_response({
+        "campaign_id": campaign_id,
+        "campaign_title": campaign["title"],
+        "total_accounts": len(accounts),
+        "bot_percentage": bot_percentage,
+        "accounts": [project(account, selected) for account in accounts],
+        "network_graph": {
+            "nodes": nodes,
+            "edges": edges,
+            "metrics": graph.metrics()
+        }
+    })
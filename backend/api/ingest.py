@@ -0,0 +1,81 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Dict, Any, Callable, Iterable
+from datetime import datetime
+import time
+
+from models.schemas import Post, Account, StandardResponse
+from utils.data_loader import data_loader
+from utils.ingest import (
+    BatchValidator,
+    LineTooLong,
+    ndjson_batches,
+    DEFAULT_BATCH_SIZE,
+    MAX_BATCH_SIZE,
+    MAX_REPORTED_ERRORS
+)
+
+router = APIRouter(prefix="/api/ingest", tags=["Ingest"])
+
+post_validator = BatchValidator(Post)
+account_validator = BatchValidator(Account)
+
+
+async def _ingest(
+    request: Request,
+    validator: BatchValidator,
+    upsert: Callable[[Iterable[Dict[str, Any]]], int],
+    batch_size: int
+) -> Dict[str, Any]:
+    """Validate and store an NDJSON request body batch by batch"""
+    start = time.perf_counter()
+    received = inserted = stored = rejected = 0
+    errors = []
+    try:
+        async for batch in ndjson_batches(request.stream(), batch_size):
+            records, batch_errors = validator.validate(batch)
+            inserted += upsert(records)
+            received += len(batch)
+            stored += len(records)
+            rejected += len(batch_errors)
+            errors.extend(batch_errors[:MAX_REPORTED_ERRORS - len(errors)])
+    except LineTooLong as e:
+        raise HTTPException(status_code=413, detail=f"{e}; {stored} records were stored before it")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "received": received,
+        "inserted": inserted,
+        "updated": stored - inserted,
+        "rejected": rejected,
+        "errors": errors,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "records_per_second": round(received / elapsed) if elapsed > 0 else 0
+    }
+
+
+@router.post("/posts")
+async def ingest_posts(
+    request: Request,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE, description="Records validated and stored at a time")
+):
+    """Insert or replace posts from an NDJSON body, one Post per line"""
+    result = await _ingest(request, post_validator, data_loader.upsert_posts, batch_size)
+    return StandardResponse(
+        success=True,
+        data=result,
+        timestamp=datetime.utcnow().isoformat() + "Z"
+    )
+
+
+@router.post("/accounts")
+async def ingest_accounts(
+    request: Request,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE, description="Records validated and stored at a time")
+):
+    """Insert or replace accounts from an NDJSON body, one Account per line"""
+    result = await _ingest(request, account_validator, data_loader.upsert_accounts, batch_size)
+    return StandardResponse(
+        success=True,
+        data=result,
+        timestamp=datetime.utcnow().isoformat() + "Z"
+    )
@@ -1,78 +1,109 @@
-from fastapi import APIRouter, Query
-from typing import Optional
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any, Optional, Sequence
 import math
 
-from models.schemas import StandardResponse
+from models.schemas import Post, PostWithDetails
 from utils.data_loader import data_loader
+from utils.fields import parse_fields, stored_fields
+from utils.json_response import FragmentCache, json_response, ndjson_response
 
 router = APIRouter(prefix="/api/posts", tags=["Posts"])
 
 
-@router.get("")
-async def get_posts(
-    platform: Optional[str] = Query("all", description="Filter by platform"),
-    is_flagged: Optional[bool] = Query(None, description="Filter flagged posts"),
-    search: Optional[str] = Query(None, description="Search in content"),
-    page: int = Query(1, ge=1),
-    limit: int = Query(20, ge=1, le=100)
-):
-    """Get all posts with filtering and pagination"""
-    
-    # Filter posts
-    posts = data_loader.filter_posts(
-        platform=platform if platform != "all" else None,
-        is_flagged=is_flagged
-    )
-    
-    # Search filter
-    if search:
-        search_lower = search.lower()
-        posts = [
-            p for p in posts
-            if search_lower in p.get("content", "").lower()
-        ]
+def _with_details(post: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """A copy of a post with its campaign title and account username added, if among fields"""
+    post_copy = post.copy()
     
-    # Enrich posts with campaign and account info
-    enriched_posts = []
-    for post in posts:
-        post_copy = post.copy()
-        
-        # Add campaign title
+    # Add campaign title
+    if fields is None or "campaign_title" in fields:
         if post.get("campaign_id"):
             campaign = data_loader.get_campaign_by_id(post["campaign_id"])
             post_copy["campaign_title"] = campaign["title"] if campaign else "Unknown"
         else:
             post_copy["campaign_title"] = None
-        
-        # Add account username
+    
+    # Add account username
+    if fields is None or "account_username" in fields:
         account = data_loader.get_account_by_id(post["account_id"])
         post_copy["account_username"] = account["username"] if account else "Unknown"
-        
-        enriched_posts.append(post_copy)
+    return post_copy
+
+
+# Encoded list entries, reused until the next write
+post_fragments = FragmentCache(data_loader.data_version, _with_details)
+
+
+@router.get("")
+async def get_posts(
+    platform: Optional[str] = Query("all", description="Filter by platform"),
+    is_flagged: Optional[bool] = Query(None, description="Filter flagged posts"),
+    search: Optional[str] = Query(
+        None,
+        description="Search content, hashtags and mentions (terms AND-ed, 'OR' between groups, 'term*' for prefix)"
+    ),
+    sort_by: str = Query("posted_at", description="Sort field (posted_at/relevance)"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (replaces page)"),
+    fields: Optional[str] = Query(None, description="Comma-separated post fields to return (default: all)"),
+):
+    """Get all posts with filtering and pagination"""
+    
+    # Fetch only the requested page and fields, using the full-text index when searching
+    start_idx = (page - 1) * limit
+    try:
+        selected = parse_fields(fields, PostWithDetails)
+        posts, total_items, next_cursor = data_loader.page_posts(
+            start_idx,
+            limit,
+            platform=platform if platform != "all" else None,
+            is_flagged=is_flagged,
+            search=search,
+            sort_by=sort_by if (search and sort_by == "relevance") else "posted_at",
+            cursor=cursor,
+            fields=stored_fields(selected, ["id", "campaign_id", "account_id"])
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Sort by posted_at (most recent first)
-    enriched_posts.sort(key=lambda x: x.get("posted_at", ""), reverse=True)
+    # Enrich the page with campaign and account info
+    paginated_posts = post_fragments.encode(posts, selected)
     
     # Pagination
-    total_items = len(enriched_posts)
     total_pages = math.ceil(total_items / limit) if total_items > 0 else 1
-    start_idx = (page - 1) * limit
-    end_idx = start_idx + limit
-    paginated_posts = enriched_posts[start_idx:end_idx]
     
-    return StandardResponse(
-        success=True,
-        data={
-            "posts": paginated_posts,
-            "pagination": {
-                "current_page": page,
-                "total_pages": total_pages,
-                "total_items": total_items,
-                "items_per_page": limit,
-                "has_next": page < total_pages,
-                "has_previous": page > 1
-            }
-        },
-        timestamp=datetime.utcnow().isoformat() + "Z"
+    return json_response({
+        "posts": paginated_posts,
+        "pagination": {
+            "current_page": page,
+            "total_pages": total_pages,
+            "total_items": total_items,
+            "items_per_page": limit,
+            "has_next": next_cursor is not None,
+            "has_previous": page > 1 or cursor is not None,
+            "next_cursor": next_cursor
+        }
+    })
+
+
+@router.get("/export")
+async def export_posts(
+    platform: Optional[str] = Query("all", description="Filter by platform"),
+    is_flagged: Optional[bool] = Query(None, description="Filter flagged posts"),
+    fields: Optional[str] = Query(None, description="Comma-separated post fields to return (default: all)"),
+):
+    """Stream every matching post as NDJSON, one post per line in stored order"""
+    
+    try:
+        selected = parse_fields(fields, Post)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return ndjson_response(
+        data_loader.iter_posts(
+            platform=platform if platform != "all" else None,
+            is_flagged=is_flagged,
+            fields=selected
+        ),
+        "posts.ndjson"
     )
@@ -1,76 +1,92 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-from datetime import datetime
+from typing import Dict, Any, Optional, Sequence
 import math
 
-from models.schemas import StandardResponse
+from models.schemas import ReportDetail
 from utils.data_loader import data_loader
+from utils.fields import parse_fields, project, stored_fields
+from utils.json_response import FragmentCache, json_response
 
 router = APIRouter(prefix="/api/reports", tags=["Reports"])
 
 
+def _with_campaign_title(report: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """A copy of a report with its campaign's title added, if among fields"""
+    report_copy = report.copy()
+    if fields is not None and "campaign_title" not in fields:
+        return report_copy
+    if report.get("campaign_id"):
+        campaign = data_loader.get_campaign_by_id(report["campaign_id"])
+        report_copy["campaign_title"] = campaign["title"] if campaign else "Unknown"
+    else:
+        report_copy["campaign_title"] = None
+    return report_copy
+
+
+# Encoded list entries, reused until the next write
+report_fragments = FragmentCache(data_loader.data_version, _with_campaign_title)
+
+
 @router.get("")
 async def get_reports(
     status: Optional[str] = Query("published", description="Filter by status"),
     severity: Optional[str] = Query("all", description="Filter by severity"),
     report_type: Optional[str] = Query("all", description="Filter by report type"),
     page: int = Query(1, ge=1),
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (replaces page)"),
+    fields: Optional[str] = Query(None, description="Comma-separated report fields to return (default: all)"),
 ):
     """Get list of intelligence reports with filtering and pagination"""
     
-    # Filter reports
-    reports = data_loader.filter_reports(
-        status=status if status != "all" else None,
-        severity=severity if severity != "all" else None,
-        report_type=report_type if report_type != "all" else None
-    )
+    # Fetch only the requested page and fields, most recent first
+    start_idx = (page - 1) * limit
+    try:
+        selected = parse_fields(fields, ReportDetail)
+        reports, total_items, next_cursor = data_loader.page_reports(
+            start_idx,
+            limit,
+            status=status if status != "all" else None,
+            severity=severity if severity != "all" else None,
+            report_type=report_type if report_type != "all" else None,
+            cursor=cursor,
+            fields=stored_fields(selected, ["id", "campaign_id"])
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Enrich reports with campaign title
-    enriched_reports = []
-    for report in reports:
-        report_copy = report.copy()
-        
-        # Add campaign title if campaign_id exists
-        if report.get("campaign_id"):
-            campaign = data_loader.get_campaign_by_id(report["campaign_id"])
-            report_copy["campaign_title"] = campaign["title"] if campaign else "Unknown"
-        else:
-            report_copy["campaign_title"] = None
-        
-        enriched_reports.append(report_copy)
-    
-    # Sort by generated_at (most recent first)
-    enriched_reports.sort(key=lambda x: x.get("generated_at", ""), reverse=True)
+    paginated_reports = report_fragments.encode(reports, selected)
     
     # Pagination
-    total_items = len(enriched_reports)
     total_pages = math.ceil(total_items / limit) if total_items > 0 else 1
-    start_idx = (page - 1) * limit
-    end_idx = start_idx + limit
-    paginated_reports = enriched_reports[start_idx:end_idx]
     
-    return StandardResponse(
-        success=True,
-        data={
-            "reports": paginated_reports,
-            "pagination": {
-                "current_page": page,
-                "total_pages": total_pages,
-                "total_items": total_items,
-                "items_per_page": limit,
-                "has_next": page < total_pages,
-                "has_previous": page > 1
-            }
-        },
-        timestamp=datetime.utcnow().isoformat() + "Z"
-    )
+    return json_response({
+        "reports": paginated_reports,
+        "pagination": {
+            "current_page": page,
+            "total_pages": total_pages,
+            "total_items": total_items,
+            "items_per_page": limit,
+            "has_next": next_cursor is not None,
+            "has_previous": page > 1 or cursor is not None,
+            "next_cursor": next_cursor
+        }
+    })
 
 
 @router.get("/{report_id}")
-async def get_report_detail(report_id: str):
+async def get_report_detail(
+    report_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated report fields to return (default: all)")
+):
     """Get full details of a specific intelligence report"""
     
+    try:
+        selected = parse_fields(fields, ReportDetail)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     # Get report
     report = data_loader.get_report_by_id(report_id)
     if not report:
@@ -80,17 +96,6 @@ async def get_report_detail(report_id: str):
         )
     
     # Enrich with campaign title
-    report_copy = report.copy()
-    if report.get("campaign_id"):
-        campaign = data_loader.get_campaign_by_id(report["campaign_id"])
-        report_copy["campaign_title"] = campaign["title"] if campaign else "Unknown"
-    else:
-        report_copy["campaign_title"] = None
-    
-    return StandardResponse(
-        success=True,
-        data={
-            "report": report_copy
-        },
-        timestamp=datetime.utcnow().isoformat() + "Z"
-    )
+    return json_response({
+        "report": project(_with_campaign_title(report, selected), selected)
+    })
@@ -0,0 +1,219 @@
+"""Generate a synthetic data set shaped like mock_data/, at any scale
+
+Run from backend/:
+
+    python -m benchmarks.datagen --posts 1000000 --out /tmp/deeptrace-1m
+
+Writes campaigns, posts, accounts, threat_scores and reports as NDJSON, one
+record at a time, so 10^7 posts need no more memory than 10^4. Point the API
+at the result with DEEPTRACE_DATA_DIR. Other collections scale with posts:
+one campaign per 1,000 posts, one account per 10 and a threat score and
+half a report per campaign.
+"""
+import argparse
+import hashlib
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+POSTS_PER_CAMPAIGN = 1_000
+POSTS_PER_ACCOUNT = 10
+START = datetime(2026, 1, 1)
+DAYS = 60
+
+PLATFORMS = ["twitter", "facebook", "reddit", "telegram"]
+THREAT_LEVELS = ["low", "medium", "high", "critical"]
+CAMPAIGN_STATUSES = ["active", "monitoring", "resolved", "archived"]
+CAMPAIGN_TYPES = ["political", "commercial", "malware", "health"]
+ACCOUNT_TYPES = ["human", "bot", "suspicious", "unknown"]
+REPORT_TYPES = ["campaign_analysis", "threat_summary", "trend_report", "custom"]
+SEVERITIES = ["info", "low", "medium", "high", "critical"]
+HASHTAGS = [f"#{word}" for word in (
+    "Election2024 VoteNow Democracy Breaking Truth WakeUp Crypto Giveaway HealthAlert Vaccine "
+    "Climate Economy Scandal Leaked Exposed Patriots Freedom News Update Viral"
+).split()]
+WORDS = (
+    "everyone must see this before it gets deleted share now the truth about election results "
+    "officials hiding evidence huge giveaway click link free crypto doctors warn new study shows "
+    "breaking news media will not report this act fast limited time they lied again"
+).split()
+
+
+def _timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _campaign_count(posts: int) -> int:
+    return max(5, posts // POSTS_PER_CAMPAIGN)
+
+
+def _account_count(posts: int) -> int:
+    return max(10, posts // POSTS_PER_ACCOUNT)
+
+
+def campaigns(posts: int, rng: random.Random) -> Iterator[Dict[str, Any]]:
+    for i in range(_campaign_count(posts)):
+        detected = START + timedelta(minutes=rng.randrange(DAYS * 24 * 60))
+        last = detected + timedelta(minutes=rng.randrange(60, 10 * 24 * 60))
+        yield {
+            "id": f"camp_{i + 1:06d}",
+            "title": f"Coordinated {rng.choice(CAMPAIGN_TYPES).title()} Campaign {i + 1}",
+            "description": " ".join(rng.choices(WORDS, k=24)).capitalize() + ".",
+            "threat_level": rng.choice(THREAT_LEVELS),
+            "status": rng.choice(CAMPAIGN_STATUSES),
+            "campaign_type": rng.choice(CAMPAIGN_TYPES),
+            "detected_at": _timestamp(detected),
+            "last_activity": _timestamp(last),
+            "total_posts": rng.randrange(10, 5_000),
+            "total_accounts": rng.randrange(5, 500),
+            "reach_estimate": rng.randrange(1_000, 5_000_000),
+            "confidence_score": round(rng.uniform(40, 99), 1),
+            "created_at": _timestamp(detected + timedelta(seconds=15)),
+            "updated_at": _timestamp(last + timedelta(seconds=30))
+        }
+
+
+def posts(count: int, rng: random.Random) -> Iterator[Dict[str, Any]]:
+    campaign_count = _campaign_count(count)
+    account_count = _account_count(count)
+    # A pool of messages reused across accounts, as coordinated posting does
+    messages = [
+        " ".join(rng.choices(WORDS, k=rng.randrange(8, 20))).capitalize() + "!"
+        for _ in range(max(50, count // 20))
+    ]
+    for i in range(count):
+        # Skewed towards low campaign numbers, with a tenth of posts unattributed
+        campaign = None if rng.random() < 0.1 else int(campaign_count * rng.random() ** 2) + 1
+        hashtags = rng.sample(HASHTAGS, rng.randrange(0, 4))
+        content = " ".join([rng.choice(messages), *hashtags])
+        posted = START + timedelta(seconds=rng.randrange(DAYS * 24 * 3600))
+        yield {
+            "id": f"post_{i + 1:08d}",
+            "campaign_id": None if campaign is None else f"camp_{campaign:06d}",
+            "account_id": f"acc_{rng.randrange(account_count) + 1:07d}",
+            "platform": rng.choice(PLATFORMS),
+            "platform_post_id": f"p_{rng.getrandbits(40)}",
+            "content": content,
+            "content_hash": hashlib.md5(content.encode("utf-8")).hexdigest(),
+            "media_urls": [f"https://example.com/media/{i + 1}.jpg"] if rng.random() < 0.2 else [],
+            "hashtags": hashtags,
+            "mentions": [f"@user_{rng.randrange(1_000)}"] if rng.random() < 0.3 else [],
+            "posted_at": _timestamp(posted),
+            "engagement_count": int(rng.paretovariate(1.2) * 10),
+            "sentiment_score": round(rng.uniform(-1, 1), 2),
+            "is_flagged": rng.random() < 0.3,
+            "created_at": _timestamp(posted + timedelta(seconds=rng.randrange(1, 600)))
+        }
+
+
+def accounts(posts: int, rng: random.Random) -> Iterator[Dict[str, Any]]:
+    for i in range(_account_count(posts)):
+        account_type = rng.choice(ACCOUNT_TYPES)
+        bot_probability = rng.uniform(60, 99) if account_type == "bot" else rng.uniform(0, 70)
+        created = START - timedelta(days=rng.randrange(1, 3_000))
+        first_seen = START + timedelta(minutes=rng.randrange(DAYS * 24 * 60))
+        platform = rng.choice(PLATFORMS)
+        yield {
+            "id": f"acc_{i + 1:07d}",
+            "platform": platform,
+            "platform_user_id": f"{platform[:2]}_user_{i + 1}",
+            "username": f"@user_{i + 1}",
+            "account_created_at": _timestamp(created),
+            "follower_count": int(rng.paretovariate(1.1) * 50),
+            "following_count": rng.randrange(0, 5_000),
+            "post_count": rng.randrange(1, 20_000),
+            "verified": rng.random() < 0.05,
+            "bot_probability": round(bot_probability, 1),
+            "account_type": account_type,
+            "risk_score": round(rng.uniform(0, 100), 1),
+            "first_seen": _timestamp(first_seen),
+            "last_active": _timestamp(first_seen + timedelta(minutes=rng.randrange(1, 30 * 24 * 60))),
+            "metadata": {"profile_image": "default.jpg", "bio": "", "location": "Unknown"}
+        }
+
+
+def threat_scores(posts: int, rng: random.Random) -> Iterator[Dict[str, Any]]:
+    for i in range(_campaign_count(posts)):
+        scores = [round(rng.uniform(20, 99), 1) for _ in range(5)]
+        yield {
+            "id": f"threat_{i + 1:06d}",
+            "campaign_id": f"camp_{i + 1:06d}",
+            "coordination_score": scores[0],
+            "bot_involvement_score": scores[1],
+            "content_similarity_score": scores[2],
+            "timing_pattern_score": scores[3],
+            "network_density_score": scores[4],
+            "overall_threat_score": round(sum(scores) / 5, 1),
+            "detection_method": "rule_based_v1",
+            "analyzed_at": _timestamp(START + timedelta(minutes=rng.randrange(DAYS * 24 * 60))),
+            "analysis_metadata": {"posts_analyzed": rng.randrange(10, 5_000), "platform_count": rng.randrange(1, 5)}
+        }
+
+
+def reports(posts: int, rng: random.Random) -> Iterator[Dict[str, Any]]:
+    campaign_count = _campaign_count(posts)
+    for i in range(max(2, campaign_count // 2)):
+        generated = START + timedelta(minutes=rng.randrange(DAYS * 24 * 60))
+        status = rng.choice(["draft", "published", "published", "archived"])
+        yield {
+            "id": f"report_{i + 1:06d}",
+            "campaign_id": f"camp_{rng.randrange(campaign_count) + 1:06d}",
+            "report_type": rng.choice(REPORT_TYPES),
+            "title": f"Intelligence Report {i + 1}",
+            "summary": " ".join(rng.choices(WORDS, k=30)).capitalize() + ".",
+            "full_content": "## Executive Summary\n\n" + " ".join(rng.choices(WORDS, k=300)),
+            "severity": rng.choice(SEVERITIES),
+            "status": status,
+            "tags": rng.sample(["election2024", "political", "bots", "coordination", "crypto", "health"], 3),
+            "generated_by": "AI",
+            "generated_at": _timestamp(generated),
+            "published_at": _timestamp(generated + timedelta(minutes=5)) if status == "published" else None,
+            "views_count": rng.randrange(0, 1_000),
+            "metadata": {"references": [f"Campaign ID: camp_{i + 1:06d}"]}
+        }
+
+
+GENERATORS = {
+    "campaigns": campaigns,
+    "posts": posts,
+    "accounts": accounts,
+    "threat_scores": threat_scores,
+    "reports": reports
+}
+
+
+def generate(directory: Path, post_count: int, seed: int = 0) -> Dict[str, int]:
+    """Write every collection to directory as NDJSON; returns record counts by collection"""
+    directory.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    for name, generator in GENERATORS.items():
+        rng = random.Random(f"{seed}:{name}")
+        written = 0
+        with open(directory / f"{name}.ndjson", "w", encoding="utf-8") as f:
+            for record in generator(post_count, rng):
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+                written += 1
+        counts[name] = written
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=10_000, help="Posts to generate (other collections scale with it)")
+    parser.add_argument("--out", type=Path, required=True, help="Directory to write the NDJSON files to")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; equal seeds give equal data")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(args.out, args.posts, args.seed)
+    elapsed = time.perf_counter() - start
+    print(", ".join(f"{count:,} {name.replace('_', ' ')}" for name, count in counts.items()))
+    print(f"Written to {args.out} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Compare response serialization paths for a page of posts
+
+Run from backend/:
+
+    python -m benchmarks.serialization [--posts 100] [--seconds 2]
+
+The baseline is what FastAPI does with a returned StandardResponse: validate
+the model, walk it through jsonable_encoder and encode it with the standard
+library. The fast path is utils.json_response with cold fragments (first
+request after a write), warm fragments, and with orjson switched off.
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from models.schemas import StandardResponse
+from utils import json_response as fast
+
+
+def _posts(count: int) -> List[Dict[str, Any]]:
+    """Posts shaped like /api/posts entries, with campaign title and account username"""
+    return [
+        {
+            "id": f"post_{i:06d}",
+            "campaign_id": f"camp_{i % 7:03d}",
+            "account_id": f"acc_{i % 50:04d}",
+            "platform": ["twitter", "facebook", "telegram"][i % 3],
+            "platform_post_id": f"{1_700_000_000_000 + i}",
+            "content": f"Breaking: coordinated story number {i} spreads fast. Share before it is removed! #Vote{i % 5}",
+            "content_hash": f"{i * 2654435761 % 2**32:08x}" * 4,
+            "media_urls": [f"https://cdn.example.com/media/{i}.jpg"] if i % 4 == 0 else [],
+            "hashtags": [f"#Vote{i % 5}", "#Election2024"],
+            "mentions": [f"@user{i % 13}"],
+            "posted_at": f"2026-02-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00Z",
+            "engagement_count": i * 37 % 5000,
+            "sentiment_score": round((i % 200) / 100 - 1, 2),
+            "is_flagged": i % 3 == 0,
+            "created_at": f"2026-02-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:05Z",
+            "campaign_title": f"Campaign {i % 7}",
+            "account_username": f"user_{i % 50}"
+        }
+        for i in range(count)
+    ]
+
+
+def _pagination(count: int) -> Dict[str, Any]:
+    return {
+        "current_page": 1,
+        "total_pages": 50,
+        "total_items": 50 * count,
+        "items_per_page": count,
+        "has_next": True,
+        "has_previous": False,
+        "next_cursor": "eyJrIjoiMjAyNi0wMi0yOFQyMzo1OTowMFoiLCJpIjoicG9zdF8wMDAwOTkifQ"
+    }
+
+
+def baseline(posts: List[Dict[str, Any]]) -> bytes:
+    response = StandardResponse(
+        success=True,
+        data={"posts": [post.copy() for post in posts], "pagination": _pagination(len(posts))},
+        timestamp="2026-02-28T23:59:59.000000Z"
+    )
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+def fast_path(posts: List[Dict[str, Any]], fragments: fast.FragmentCache) -> bytes:
+    data = {"posts": fragments.encode(posts), "pagination": _pagination(len(posts))}
+    return fast.json_response(data).body
+
+
+def measure(run: Callable[[], bytes], seconds: float) -> Dict[str, float]:
+    """Calls per second and mean latency of run, after a warm-up call"""
+    run()
+    calls = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        run()
+        calls += 1
+    return {"rps": calls / elapsed, "mean_us": elapsed / calls * 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100, help="Posts per page")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Time spent on each case")
+    args = parser.parse_args()
+
+    posts = _posts(args.posts)
+    version = [0]
+
+    def bump() -> int:
+        version[0] += 1
+        return version[0]
+
+    cold = fast.FragmentCache(bump)
+    warm = fast.FragmentCache(lambda: 0)
+    cases = {
+        "baseline (StandardResponse + jsonable_encoder)": lambda: baseline(posts),
+        "fast, cold fragments": lambda: fast_path(posts, cold),
+        "fast, warm fragments": lambda: fast_path(posts, warm)
+    }
+
+    results = {name: measure(run, args.seconds) for name, run in cases.items()}
+    if fast.orjson is not None:
+        orjson, fast.orjson = fast.orjson, None
+        try:
+            results["fast, cold fragments, no orjson"] = measure(lambda: fast_path(posts, cold), args.seconds)
+        finally:
+            fast.orjson = orjson
+
+    base = results["baseline (StandardResponse + jsonable_encoder)"]["rps"]
+    print(f"{args.posts} posts per page, orjson {'installed' if fast.orjson else 'not installed'}")
+    for name, result in results.items():
+        print(f"{name:<50} {result['rps']:>10,.0f} req/s {result['mean_us']:>9,.1f} us  x{result['rps'] / base:.1f}")
+
+
+if __name__ == "__main__":
+    main()
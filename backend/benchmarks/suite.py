@@ -0,0 +1,298 @@
+"""Benchmark the storage backend and the API endpoints on generated data
+
+Run from backend/:
+
+    python -m benchmarks.suite --posts 100000 --output before.json
+    python -m benchmarks.suite --posts 100000 --baseline before.json
+
+Generates a data set with benchmarks.datagen (or loads one given with
+--data), loads it into the selected storage backend, then times storage
+methods directly and endpoints in-process through Starlette's TestClient.
+Each case reports p50/p95/p99 latency, throughput and the peak memory one
+call allocates. With --baseline, cases whose p50 grew by more than
+--threshold are listed and the exit status is 1.
+
+Endpoint cases run with the response cache off unless --cache is given, so
+every request is rendered. Analysis jobs are left out: they run in the
+background and their POST only queues work. Write cases run last, since
+each write invalidates the caches the read cases warm up.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+from benchmarks.datagen import generate
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is then not reported
+    resource = None
+
+# (name, group, function) of one benchmark case
+Case = Tuple[str, str, Callable[[], Any]]
+
+PERCENTILES = {"p50_ms": 0.50, "p95_ms": 0.95, "p99_ms": 0.99}
+
+
+def _percentile(timings: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted timings"""
+    return timings[max(0, math.ceil(q * len(timings)) - 1)]
+
+
+def _peak_memory(run: Callable[[], Any]) -> int:
+    """Peak bytes allocated by one call, as traced by tracemalloc"""
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(run: Callable[[], Any], seconds: float, min_calls: int, max_calls: int) -> Dict[str, float]:
+    """Latency percentiles, throughput and peak memory of run, after a warm-up call"""
+    run()
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_calls and (len(timings) < min_calls or time.perf_counter() - start < seconds):
+        call_start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - call_start)
+    timings.sort()
+    result = {"calls": len(timings)}
+    for name, q in PERCENTILES.items():
+        result[name] = round(_percentile(timings, q) * 1000, 4)
+    result["mean_ms"] = round(sum(timings) / len(timings) * 1000, 4)
+    result["throughput_rps"] = round(len(timings) / sum(timings), 1)
+    result["peak_kb"] = round(_peak_memory(run) / 1024, 1)
+    return result
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def store_cases(store) -> List[Case]:
+    """Storage method cases, on the busiest campaign and the first records of each kind"""
+    from utils.network import CO_ACTIVITY_FIELDS
+    from utils.rollups import POSTS
+
+    campaign_id = "camp_000001"
+    post = store.get_post_by_id("post_00000001")
+    account_id = post["account_id"]
+    report_id = "report_000001"
+    _, _, cursor = store.page_posts(0, 20)
+    columns = ["id", "platform", "posted_at", "engagement_count"]
+    return [
+        ("get_campaign_by_id", "store", lambda: store.get_campaign_by_id(campaign_id)),
+        ("get_post_by_id", "store", lambda: store.get_post_by_id(post["id"])),
+        ("get_account_by_id", "store", lambda: store.get_account_by_id(account_id)),
+        ("get_report_by_id", "store", lambda: store.get_report_by_id(report_id)),
+        ("get_threat_score_by_campaign", "store", lambda: store.get_threat_score_by_campaign(campaign_id)),
+        ("page_campaigns", "store", lambda: store.page_campaigns(0, 20)),
+        ("page_campaigns total_posts", "store", lambda: store.page_campaigns(0, 20, sort_by="total_posts")),
+        ("count_campaigns status", "store", lambda: store.count_campaigns(status="active")),
+        ("page_posts", "store", lambda: store.page_posts(0, 20)),
+        ("page_posts cursor", "store", lambda: store.page_posts(0, 20, cursor=cursor)),
+        ("page_posts offset 1000", "store", lambda: store.page_posts(1000, 20)),
+        ("page_posts filtered", "store", lambda: store.page_posts(0, 20, platform="twitter", is_flagged=True)),
+        ("page_posts engagement", "store", lambda: store.page_posts(0, 20, sort_by="engagement_count")),
+        ("page_posts campaign", "store", lambda: store.page_posts(0, 20, campaign_id=campaign_id)),
+        ("page_posts fields", "store", lambda: store.page_posts(0, 20, fields=columns)),
+        ("page_posts search", "store", lambda: store.page_posts(0, 20, search="election")),
+        ("page_posts search relevance", "store", lambda: store.page_posts(0, 20, search="election", sort_by="relevance")),
+        ("search_posts", "store", lambda: store.search_posts("giveaway crypto", platform="reddit")),
+        ("count_posts filtered", "store", lambda: store.count_posts(platform="twitter", is_flagged=True)),
+        ("filter_posts", "store", lambda: store.filter_posts(platform="telegram", is_flagged=True)),
+        ("iter_posts fields", "store", lambda: sum(1 for _ in store.iter_posts(fields=["id"]))),
+        ("get_posts_by_campaign", "store", lambda: store.get_posts_by_campaign(campaign_id)),
+        ("get_posts_by_account", "store", lambda: store.get_posts_by_account(account_id)),
+        ("get_platform_counts_by_campaign", "store", lambda: store.get_platform_counts_by_campaign(campaign_id)),
+        ("get_post_columns", "store", lambda: store.get_post_columns(["account_id", "posted_at"])),
+        ("get_campaign_post_columns", "store", lambda: store.get_campaign_post_columns(campaign_id, CO_ACTIVITY_FIELDS)),
+        ("page_accounts", "store", lambda: store.page_accounts(0, 20)),
+        ("page_accounts min_bot_probability", "store", lambda: store.page_accounts(0, 20, min_bot_probability=80)),
+        ("count_accounts", "store", lambda: store.count_accounts(account_type="bot", min_bot_probability=80)),
+        ("filter_accounts", "store", lambda: store.filter_accounts(account_type="bot", min_bot_probability=90)),
+        ("get_accounts_by_campaign", "store", lambda: store.get_accounts_by_campaign(campaign_id)),
+        ("get_campaign_ids_by_account", "store", lambda: store.get_campaign_ids_by_account(account_id)),
+        ("get_account_columns", "store", lambda: store.get_account_columns(["bot_probability"])),
+        ("page_reports", "store", lambda: store.page_reports(0, 10)),
+        ("get_overview_stats", "store", store.get_overview_stats),
+        ("get_campaign_stats", "store", lambda: store.get_campaign_stats(campaign_id)),
+        ("get_time_series 30d", "store", lambda: store.get_time_series([POSTS], "30d")),
+        ("get_time_series campaign all", "store", lambda: store.get_time_series([POSTS], "all", scope=campaign_id)),
+        ("upsert_post", "store writes", lambda: store.upsert_post(dict(post))),
+        ("upsert_posts 100", "store writes", lambda: store.upsert_posts(store.page_posts(0, 100)[0]))
+    ]
+
+
+def api_cases(client) -> List[Case]:
+    """Endpoint cases: every GET route, ingestion and account re-scoring"""
+    campaign_id = "camp_000001"
+    posts = "".join(json.dumps(post) + "\n" for post in client.get("/api/posts?limit=100").json()["data"]["posts"])
+    accounts = "".join(json.dumps(acc) + "\n" for acc in client.get("/api/accounts?limit=100").json()["data"]["accounts"])
+
+    def get(url: str) -> Callable[[], Any]:
+        return lambda: _checked(client.get(url))
+
+    def post(url: str, body: str = "") -> Callable[[], Any]:
+        return lambda: _checked(client.post(url, content=body))
+
+    gets = [
+        "/health",
+        "/api/campaigns",
+        "/api/campaigns?status=active&sort_by=total_posts",
+        f"/api/campaigns/{campaign_id}",
+        f"/api/campaigns/{campaign_id}?period=7d",
+        f"/api/campaigns/{campaign_id}/posts",
+        f"/api/campaigns/{campaign_id}/accounts",
+        f"/api/campaigns/{campaign_id}/posts/export",
+        "/api/analytics/overview",
+        "/api/analytics/threats",
+        "/api/posts",
+        "/api/posts?platform=twitter&is_flagged=true",
+        "/api/posts?fields=id,platform,posted_at,engagement_count",
+        "/api/posts?search=election",
+        "/api/posts?search=election&sort_by=relevance",
+        "/api/posts/export?platform=telegram&is_flagged=true",
+        "/api/accounts",
+        "/api/accounts?min_bot_probability=80",
+        "/api/accounts/export?account_type=bot",
+        "/api/reports?status=all",
+        "/api/reports/report_000001"
+    ]
+    cases = [(f"GET {url}", "api", get(url)) for url in gets]
+    cases += [
+        ("POST /api/ingest/posts (100)", "api writes", post("/api/ingest/posts", posts)),
+        ("POST /api/ingest/accounts (100)", "api writes", post("/api/ingest/accounts", accounts)),
+        ("POST /api/accounts/rescore", "api writes", post("/api/accounts/rescore"))
+    ]
+    return cases
+
+
+def _checked(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.method} {response.request.url} returned {response.status_code}")
+    return response
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print p50 changes against a baseline run; returns the cases that slowed by more than threshold"""
+    for key in ("posts", "backend"):
+        if results["meta"].get(key) != baseline["meta"].get(key):
+            print(f"Warning: baseline {key} is {baseline['meta'].get(key)!r}, this run's is {results['meta'].get(key)!r}")
+    regressions = []
+    print(f"\n{'case':<62} {'base p50':>10} {'p50':>10} {'change':>8}")
+    for name, case in results["cases"].items():
+        old = baseline["cases"].get(name)
+        if old is None or not old["p50_ms"]:
+            continue
+        change = case["p50_ms"] / old["p50_ms"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<62} {old['p50_ms']:>8.3f}ms {case['p50_ms']:>8.3f}ms {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=10_000, help="Posts to generate (other collections scale with it)")
+    parser.add_argument("--data", type=Path, help="Load this generated data set instead of generating one")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for generated data")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json", help="Storage backend")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time spent on each case")
+    parser.add_argument("--min-calls", type=int, default=5, help="Calls per case however long they take")
+    parser.add_argument("--max-calls", type=int, default=10_000, help="Most calls per case")
+    parser.add_argument("--only", help="Run only cases whose name contains this text")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache on for endpoint cases")
+    parser.add_argument("--output", type=Path, help="Write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="Compare against results from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p50 slowdown reported as a regression")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="deeptrace-bench-"))
+    try:
+        data_dir = args.data
+        if data_dir is None:
+            data_dir = workdir / "data"
+            print(f"Generating {args.posts:,} posts...")
+            generate(data_dir, args.posts, args.seed)
+
+        # The global storage backend is created on import, so configure it first
+        os.environ["DEEPTRACE_DATA_DIR"] = str(data_dir)
+        os.environ["DEEPTRACE_STORAGE"] = args.backend
+        os.environ["DEEPTRACE_SQLITE_PATH"] = str(workdir / "bench.db")
+        os.environ.pop("DEEPTRACE_SNAPSHOT", None)
+        if not args.cache:
+            os.environ["DEEPTRACE_CACHE_ENTRIES"] = "0"
+
+        load_start = time.perf_counter()
+        from fastapi.testclient import TestClient
+        from main import app
+        from utils.data_loader import data_loader
+        load_seconds = time.perf_counter() - load_start
+
+        client = TestClient(app)
+        cases = store_cases(data_loader) + api_cases(client)
+        # Writes last, so they do not invalidate what read cases warmed up
+        cases.sort(key=lambda case: case[1].endswith("writes"))
+        if args.only:
+            cases = [case for case in cases if args.only in case[0]]
+
+        results: Dict[str, Any] = {
+            "meta": {
+                "posts": data_loader.count_posts(),
+                "accounts": data_loader.count_accounts(),
+                "backend": args.backend,
+                "response_cache": args.cache,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "started_at": datetime.utcnow().isoformat() + "Z",
+                "load_seconds": round(load_seconds, 2)
+            },
+            "cases": {}
+        }
+        print(f"Loaded {results['meta']['posts']:,} posts into {args.backend} in {load_seconds:.1f}s\n")
+        print(f"{'case':<62} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>10} {'peak':>10}")
+        for name, group, run in cases:
+            result = measure(run, args.seconds, args.min_calls, args.max_calls)
+            results["cases"][name] = {"group": group, **result}
+            print(
+                f"{name:<62} {result['p50_ms']:>7.3f}ms {result['p95_ms']:>7.3f}ms {result['p99_ms']:>7.3f}ms "
+                f"{result['throughput_rps']:>10,.0f} {result['peak_kb']:>8,.0f}KB"
+            )
+        results["meta"]["max_rss_mb"] = _max_rss_mb()
+        print(f"\nPeak RSS: {results['meta']['max_rss_mb']} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slowed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
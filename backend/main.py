@@ -1,9 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from datetime import datetime
 
 # Import routers
-from api import campaigns, analytics, posts, accounts, reports, analyze
+from api import campaigns, analytics, posts, accounts, reports, analyze, ingest
+from utils.data_loader import data_loader
+from utils.response_cache import ResponseCacheMiddleware, create_response_cache
+from utils.compression import CompressionMiddleware, compression_threshold
+from utils.metrics import TimingMiddleware, create_metrics
+
+# Routers whose GET responses are cached
+CACHED_PREFIXES = ["/api/campaigns", "/api/analytics", "/api/reports", "/api/accounts"]
 
 # Create FastAPI app
 app = FastAPI(
@@ -14,6 +22,16 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Serve repeated GETs of the read-mostly routers from a cache until the data
+# changes; added before CORS so cached responses never carry per-origin headers
+response_cache = create_response_cache()
+app.add_middleware(
+    ResponseCacheMiddleware,
+    cache=response_cache,
+    prefixes=CACHED_PREFIXES,
+    data_version=data_loader.data_version
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +41,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses for clients that accept it; outside the cache and CORS
+# layers, so it sees bodies exactly as they are sent
+app.add_middleware(CompressionMiddleware, minimum_size=compression_threshold())
+
+# Time requests and their instrumented stages when DEEPTRACE_METRICS is set;
+# outermost, so the totals include every other middleware
+metrics = create_metrics()
+if metrics.enabled:
+    metrics.add_reading(
+        "deeptrace_response_cache_hits_total", "counter", "Responses served from the response cache",
+        lambda: response_cache.hits
+    )
+    metrics.add_reading(
+        "deeptrace_response_cache_misses_total", "counter", "Cacheable requests the response cache could not serve",
+        lambda: response_cache.misses
+    )
+    metrics.add_reading(
+        "deeptrace_response_cache_entries", "gauge", "Responses held in the response cache",
+        lambda: len(response_cache)
+    )
+    metrics.add_reading(
+        "deeptrace_response_cache_bytes", "gauge", "Body bytes held in the response cache",
+        lambda: response_cache.stats()["bytes"]
+    )
+    metrics.add_reading(
+        "deeptrace_data_version", "gauge", "Storage data version, bumped by every write",
+        data_loader.data_version
+    )
+    app.add_middleware(TimingMiddleware, metrics=metrics, routes=app.routes)
+
 # Include routers
 app.include_router(campaigns.router)
 app.include_router(analytics.router)
@@ -30,6 +78,7 @@ app.include_router(posts.router)
 app.include_router(accounts.router)
 app.include_router(reports.router)
 app.include_router(analyze.router)
+app.include_router(ingest.router)
 
 
 # Root endpoint
@@ -48,7 +97,8 @@ async def root():
             "posts": "/api/posts",
             "accounts": "/api/accounts",
             "reports": "/api/reports",
-            "analyze": "/api/analyze"
+            "analyze": "/api/analyze",
+            "ingest": "/api/ingest"
         }
     }
 
@@ -63,6 +113,15 @@ async def health_check():
     }
 
 
+# Metrics endpoint
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def get_metrics():
+    """Request and stage timings per route, in Prometheus text format"""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled; set DEEPTRACE_METRICS=1 to enable them")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -80,6 +139,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
+    analyze.analysis_jobs.shutdown()
     print("=" * 60)
     print("🛑 DeepTrace Backend API Shutting Down...")
     print("=" * 60)
@@ -0,0 +1,20 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app)
+
+
+def test_gzip_revalidation_repeats_etag_and_vary():
+    gzip = {"Accept-Encoding": "gzip"}
+    response = client.get("/api/campaigns?limit=100", headers=gzip)
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "Accept-Encoding" in response.headers["vary"]
+
+    revalidated = client.get("/api/campaigns?limit=100", headers={**gzip, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.headers["vary"] == response.headers["vary"]
@@ -0,0 +1,184 @@
+import heapq
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+# Dashboard and campaign statistics as counters. Storage backends adjust them
+# on every insert and replace, so the analytics overview and campaign detail
+# pages read them directly instead of scanning campaigns, posts and accounts.
+
+# Threat levels reported in the overview, most severe first
+THREAT_LEVELS = ["critical", "high", "medium", "low"]
+# Hashtags reported per campaign
+TOP_HASHTAGS = 10
+
+
+def _adjust(counts: Dict[Any, int], key: Any, delta: int):
+    """Add delta to a keyed counter, dropping keys that reach zero"""
+    value = counts.get(key, 0) + delta
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+class OverviewAggregates:
+    """Materialized counts behind /api/analytics/overview
+
+    ``campaigns_by_platform`` counts the campaigns with at least one post on
+    each platform.
+    """
+
+    def __init__(self):
+        self.campaigns = 0
+        self.posts = 0
+        self.accounts = 0
+        self.campaigns_by_status: Dict[Any, int] = {}
+        self.campaigns_by_threat_level: Dict[Any, int] = {}
+        self.accounts_by_type: Dict[Any, int] = {}
+        self.campaigns_by_platform: Dict[Any, int] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, Any, int]]) -> "OverviewAggregates":
+        """Rebuild from (counter name, key, value) rows; totals have an empty key"""
+        aggregates = cls()
+        for name, key, value in rows:
+            counter = getattr(aggregates, name)
+            if isinstance(counter, dict):
+                counter[key] = value
+            else:
+                setattr(aggregates, name, value)
+        return aggregates
+
+    def count_campaign(self, status: Optional[str], threat_level: Optional[str], delta: int = 1):
+        self.campaigns += delta
+        _adjust(self.campaigns_by_status, status, delta)
+        _adjust(self.campaigns_by_threat_level, threat_level, delta)
+
+    def count_account(self, account_type: Optional[str], delta: int = 1):
+        self.accounts += delta
+        _adjust(self.accounts_by_type, account_type, delta)
+
+    def count_posts(self, delta: int = 1):
+        self.posts += delta
+
+    def count_campaign_platforms(self, platforms: Iterable[str], delta: int = 1):
+        """Count a campaign on each of platforms, or stop counting it with delta=-1"""
+        for platform in platforms:
+            _adjust(self.campaigns_by_platform, platform, delta)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "total_campaigns": self.campaigns,
+            "active_campaigns": self.campaigns_by_status.get("active", 0),
+            "threat_distribution": {level: self.campaigns_by_threat_level.get(level, 0) for level in THREAT_LEVELS},
+            "total_posts": self.posts,
+            "total_accounts": self.accounts,
+            "accounts_by_type": dict(self.accounts_by_type),
+            "campaigns_by_platform": dict(self.campaigns_by_platform)
+        }
+
+
+def _rank(entry: Tuple[str, int]) -> Tuple[int, str]:
+    """Sort key ordering counts largest first, then keys alphabetically"""
+    return -entry[1], entry[0]
+
+
+class TopK:
+    """Exact counts with the k largest kept ranked and ready to read
+
+    Increments re-rank at most k entries. A decrement of a ranked key marks
+    the ranking stale, and the next read ranks every key once.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.counts: Dict[str, int] = {}
+        # The k largest (key, count) pairs by _rank, or None when stale; while
+        # it holds fewer than k pairs it holds every key
+        self._top: Optional[List[Tuple[str, int]]] = []
+
+    def add(self, key: str, delta: int = 1):
+        _adjust(self.counts, key, delta)
+        top = self._top
+        if top is None:
+            return
+        ranked = any(entry[0] == key for entry in top)
+        if delta < 0:
+            if ranked:
+                self._top = None
+            return
+        entry = (key, self.counts[key])
+        if ranked or len(top) < self.k or _rank(entry) < _rank(top[-1]):
+            top = [e for e in top if e[0] != key]
+            top.append(entry)
+            top.sort(key=_rank)
+            self._top = top[:self.k]
+
+    def top(self) -> List[Tuple[str, int]]:
+        if self._top is None:
+            self._top = heapq.nsmallest(self.k, self.counts.items(), key=_rank)
+        return list(self._top)
+
+
+class CampaignAggregates:
+    """Post counts behind a campaign detail page: hashtags, accounts and first/last post times
+
+    Removing the post at either end of the time range marks the range
+    ``stale``; the owner then recomputes it with ``set_range``.
+    """
+
+    def __init__(self):
+        self.posts = 0
+        self.hashtags = TopK(TOP_HASHTAGS)
+        self.accounts: Dict[str, int] = {}
+        self.first_post_at: Optional[str] = None
+        self.last_post_at: Optional[str] = None
+        self.stale = False
+
+    def count_post(self, post: Dict[str, Any], delta: int = 1):
+        """Count a post, or stop counting it with delta=-1"""
+        self.posts += delta
+        for tag in post.get("hashtags") or ():
+            self.hashtags.add(tag, delta)
+        _adjust(self.accounts, post.get("account_id"), delta)
+        posted_at = post.get("posted_at")
+        if not posted_at:
+            return
+        if delta < 0:
+            if posted_at in (self.first_post_at, self.last_post_at):
+                self.stale = True
+        elif not self.stale:
+            if self.first_post_at is None or posted_at < self.first_post_at:
+                self.first_post_at = posted_at
+            if self.last_post_at is None or posted_at > self.last_post_at:
+                self.last_post_at = posted_at
+
+    def set_range(self, posted_at: Iterable[Optional[str]]):
+        """Recompute the first and last post times from every post's posted_at"""
+        times = [value for value in posted_at if value]
+        self.first_post_at = min(times, default=None)
+        self.last_post_at = max(times, default=None)
+        self.stale = False
+
+    def stats(self, platforms: Dict[str, int]) -> Dict[str, Any]:
+        return campaign_stats(
+            self.posts, len(self.accounts), self.first_post_at, self.last_post_at, self.hashtags.top(), platforms
+        )
+
+
+def campaign_stats(
+    posts: int,
+    unique_accounts: int,
+    first_post_at: Optional[str],
+    last_post_at: Optional[str],
+    hashtags: Iterable[Tuple[str, int]],
+    platforms: Dict[str, int]
+) -> Dict[str, Any]:
+    """A campaign's post statistics in the shape storage backends return them"""
+    return {
+        "total_posts": posts,
+        "unique_accounts": unique_accounts,
+        "first_post_at": first_post_at,
+        "last_post_at": last_post_at,
+        "top_hashtags": [{"tag": tag, "count": count} for tag, count in hashtags],
+        "platforms": dict(sorted(platforms.items(), key=_rank))
+    }
@@ -0,0 +1,132 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Iterator, Sequence, Tuple
+
+import numpy as np
+
+from utils.minhash import minhash_signatures
+from utils.timing import parse_epochs
+
+# Detection steps for analysis jobs. Functions passed to the process pool take
+# and return plain picklable data, and this module must not import the data loader.
+
+# Compact post rows: (id, account_id, campaign_id, platform, posted_at, content_hash, content)
+PostRow = Tuple[str, str, str, str, str, str, str]
+ID, ACCOUNT_ID, CAMPAIGN_ID, PLATFORM, POSTED_AT, CONTENT_HASH, CONTENT = range(7)
+POST_ROW_FIELDS = ["id", "account_id", "campaign_id", "platform", "posted_at", "content_hash", "content"]
+
+
+def chunked(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """Split a sequence into consecutive slices of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def prepare_chunk(chunk: Tuple[int, List[str], List[str]]) -> Tuple[int, np.ndarray, np.ndarray]:
+    """Process-pool entry point: MinHash signatures and epoch timestamps for one numbered chunk"""
+    index, texts, timestamps = chunk
+    return index, minhash_signatures(texts), parse_epochs(timestamps)
+
+
+def near_duplicate_clusters(
+    rows: Sequence[PostRow],
+    labels: Sequence[int],
+    min_accounts: int = 2
+) -> List[Dict[str, Any]]:
+    """Near-duplicate clusters posted by at least min_accounts distinct accounts, largest first"""
+    members: Dict[int, List[PostRow]] = {}
+    for row, label in zip(rows, labels):
+        members.setdefault(label, []).append(row)
+
+    clusters = []
+    for cluster_rows in members.values():
+        account_ids = sorted({row[ACCOUNT_ID] for row in cluster_rows})
+        if len(account_ids) < min_accounts:
+            continue
+        posted_at = [row[POSTED_AT] for row in cluster_rows if row[POSTED_AT]]
+        clusters.append({
+            "content_hash": cluster_rows[0][CONTENT_HASH],
+            "content_hashes": len({row[CONTENT_HASH] for row in cluster_rows}),
+            "post_ids": [row[ID] for row in cluster_rows],
+            "account_ids": account_ids,
+            "campaign_ids": sorted({row[CAMPAIGN_ID] for row in cluster_rows if row[CAMPAIGN_ID]}),
+            "platforms": sorted({row[PLATFORM] for row in cluster_rows if row[PLATFORM]}),
+            "first_post_at": min(posted_at) if posted_at else None,
+            "last_post_at": max(posted_at) if posted_at else None
+        })
+    clusters.sort(key=lambda c: (-len(c["account_ids"]), -len(c["post_ids"]), c["post_ids"][0]))
+    return clusters
+
+
+def content_similarity_by_campaign(rows: Sequence[PostRow], labels: Sequence[int]) -> Dict[str, Dict[str, Any]]:
+    """Per-campaign content similarity from near-duplicate cluster labels
+
+    content_similarity_score is the percentage of the campaign's posts that
+    have a near-duplicate within the campaign, and unique_content_hashes the
+    number of distinct pieces of content once near-duplicates are collapsed.
+    """
+    by_campaign: Dict[str, Counter] = {}
+    for row, label in zip(rows, labels):
+        if row[CAMPAIGN_ID]:
+            by_campaign.setdefault(row[CAMPAIGN_ID], Counter())[label] += 1
+
+    similarity = {}
+    for campaign_id, counts in by_campaign.items():
+        total = sum(counts.values())
+        duplicated = sum(count for count in counts.values() if count > 1)
+        similarity[campaign_id] = {
+            "posts_analyzed": total,
+            "content_similarity_score": round(100 * duplicated / total, 1),
+            "unique_content_hashes": len(counts)
+        }
+    return similarity
+
+
+def timing_by_campaign(rows: Sequence[PostRow], covered: Sequence[bool]) -> Dict[str, Dict[str, Any]]:
+    """Per-campaign timing coordination from burst coverage
+
+    timing_pattern_score is the percentage of the campaign's posts that fall
+    inside a coordinated burst.
+    """
+    totals: Counter = Counter()
+    in_bursts: Counter = Counter()
+    for row, hit in zip(rows, covered):
+        if row[CAMPAIGN_ID]:
+            totals[row[CAMPAIGN_ID]] += 1
+            in_bursts[row[CAMPAIGN_ID]] += bool(hit)
+    return {
+        campaign_id: {
+            "burst_posts": in_bursts[campaign_id],
+            "timing_pattern_score": round(100 * in_bursts[campaign_id] / total, 1)
+        }
+        for campaign_id, total in totals.items()
+    }
+
+
+def _isoformat(epoch: int) -> str:
+    return datetime.fromtimestamp(int(epoch), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def burst_summaries(
+    rows: Sequence[PostRow],
+    episodes: Dict[str, np.ndarray],
+    limit: int = 20
+) -> List[Dict[str, Any]]:
+    """The largest coordinated bursts, most distinct accounts first"""
+    if not len(episodes.get("posts", ())):
+        return []
+    order = np.lexsort((episodes["start"], -episodes["posts"], -episodes["accounts"]))[:limit]
+    bursts = []
+    for i in order:
+        first = rows[int(episodes["first"][i])]
+        bursts.append({
+            "content_hash": first[CONTENT_HASH],
+            "campaign_id": first[CAMPAIGN_ID] or None,
+            "first_post_id": first[ID],
+            "accounts": int(episodes["accounts"][i]),
+            "posts": int(episodes["posts"][i]),
+            "started_at": _isoformat(episodes["start"][i]),
+            "ended_at": _isoformat(episodes["end"][i]),
+            "duration_seconds": int(episodes["end"][i] - episodes["start"][i])
+        })
+    return bursts
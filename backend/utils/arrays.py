@@ -0,0 +1,16 @@
+import numpy as np
+
+# Small NumPy helpers shared by the vectorized detectors
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    """Distinct values in ascending order
+
+    Same result as np.unique, but always by sorting: recent NumPy releases
+    dedupe plain integer arrays through a hash table that is many times slower
+    on large inputs.
+    """
+    values = np.sort(values)
+    if len(values):
+        values = values[np.concatenate(([True], values[1:] != values[:-1]))]
+    return values
@@ -0,0 +1,526 @@
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from utils.snapshot import Snapshot, SnapshotWriter
+
+
+class _Absent:
+    """Overflow marker for a schema field the record does not have"""
+
+    def __reduce__(self):
+        # Unpickle as the module singleton so identity checks keep working
+        return "_ABSENT"
+
+
+_ABSENT = _Absent()
+_EMPTY: Tuple[str, ...] = ()
+
+
+class _PackedStrings:
+    """Read-only string sequence over UTF-8 bytes and an offsets array, e.g. from a snapshot"""
+
+    def __init__(self, offsets: Sequence[int], blob, nulls: Iterable[int] = ()):
+        self._offsets = offsets
+        self._blob = blob
+        self._nulls = frozenset(nulls)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position: int) -> Optional[str]:
+        if self._nulls and position in self._nulls:
+            return None
+        return str(self._blob[self._offsets[position]:self._offsets[position + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for position in range(len(self)):
+            yield self[position]
+
+
+def _pack_strings(writer: SnapshotWriter, name: str, values: Iterable[Optional[str]]):
+    """Write strings (or None) as an offsets section, a UTF-8 blob section and a null list"""
+    offsets = array("q", [0])
+    blob = bytearray()
+    nulls = []
+    for position, value in enumerate(values):
+        if value is None:
+            nulls.append(position)
+        else:
+            blob += value.encode("utf-8")
+        offsets.append(len(blob))
+    writer.add_array(f"{name}.offsets", offsets, "q")
+    writer.add_array(f"{name}.blob", blob, "B")
+    writer.add_object(f"{name}.nulls", nulls)
+
+
+def _unpack_strings(snapshot: Snapshot, name: str) -> _PackedStrings:
+    return _PackedStrings(
+        snapshot.array(f"{name}.offsets"),
+        snapshot.array(f"{name}.blob"),
+        snapshot.object(f"{name}.nulls")
+    )
+
+
+class _Column(ABC):
+    """Values of one field for every row
+
+    ``append`` and ``set`` return False when a value does not fit the column's
+    encoding; the table then stores a placeholder and keeps the value aside.
+    Columns restored from a snapshot read straight from the mapped file and
+    copy themselves into private memory on the first write.
+    """
+
+    @abstractmethod
+    def append(self, value: Any) -> bool:
+        """Add a value for a new row"""
+
+    @abstractmethod
+    def set(self, position: int, value: Any) -> bool:
+        """Overwrite the value of a row"""
+
+    @abstractmethod
+    def get(self, position: int) -> Any:
+        """The value of a row"""
+
+    @abstractmethod
+    def to_list(self) -> List[Any]:
+        """Every row's value, in row order"""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every value"""
+
+    @abstractmethod
+    def export(self, writer: SnapshotWriter, name: str):
+        """Write the column as snapshot sections prefixed with name"""
+
+    @abstractmethod
+    def restore(self, snapshot: Snapshot, name: str):
+        """Read the column from sections written by export, in place"""
+
+
+def _thaw_array(data: Union[array, memoryview], typecode: str) -> array:
+    """A writable array with the contents of a (possibly mapped) buffer"""
+    if isinstance(data, array):
+        return data
+    thawed = array(typecode)
+    thawed.frombytes(data.cast("B"))
+    return thawed
+
+
+class _TypedColumn(_Column):
+    """Machine-typed numbers in a contiguous array (8 bytes per row)"""
+
+    def __init__(self, typecode: str, kind: type):
+        self._typecode = typecode
+        self._kind = kind
+        self._data: Union[array, memoryview] = array(typecode)
+
+    def _fits(self, value: Any) -> bool:
+        # Exact type check: bools are ints, and ints in a float column would
+        # come back as floats
+        return type(value) is self._kind
+
+    def append(self, value: Any) -> bool:
+        self._data = _thaw_array(self._data, self._typecode)
+        if self._fits(value):
+            try:
+                self._data.append(value)
+                return True
+            except OverflowError:
+                pass
+        self._data.append(self._kind())
+        return False
+
+    def set(self, position: int, value: Any) -> bool:
+        self._data = _thaw_array(self._data, self._typecode)
+        if self._fits(value):
+            try:
+                self._data[position] = value
+                return True
+            except OverflowError:
+                pass
+        self._data[position] = self._kind()
+        return False
+
+    def get(self, position: int) -> Any:
+        return self._data[position]
+
+    def to_list(self) -> List[Any]:
+        return self._data.tolist()
+
+    def clear(self):
+        self._data = array(self._typecode)
+
+    def export(self, writer: SnapshotWriter, name: str):
+        writer.add_array(name, self._data, self._typecode)
+
+    def restore(self, snapshot: Snapshot, name: str):
+        self._data = snapshot.array(name)
+
+
+class _CategoryColumn(_Column):
+    """Dictionary-encoded values: a 4-byte code per row plus one copy of each distinct value"""
+
+    def __init__(self):
+        self._codes: Union[array, memoryview] = array("i")
+        self._values: List[Any] = []
+        self._lookup: Dict[Tuple[type, Any], int] = {}
+
+    def _encode(self, value: Any) -> Optional[int]:
+        # Keyed by type too so True and 1 stay distinct categories
+        try:
+            key = (type(value), value)
+            code = self._lookup.get(key)
+        except TypeError:
+            return None
+        if code is None:
+            code = len(self._values)
+            self._values.append(sys.intern(value) if type(value) is str else value)
+            self._lookup[key] = code
+        return code
+
+    def append(self, value: Any) -> bool:
+        self._codes = _thaw_array(self._codes, "i")
+        code = self._encode(value)
+        self._codes.append(0 if code is None else code)
+        return code is not None
+
+    def set(self, position: int, value: Any) -> bool:
+        self._codes = _thaw_array(self._codes, "i")
+        code = self._encode(value)
+        self._codes[position] = 0 if code is None else code
+        return code is not None
+
+    def get(self, position: int) -> Any:
+        return self._values[self._codes[position]] if self._values else None
+
+    def to_list(self) -> List[Any]:
+        if not self._values:
+            return [None] * len(self._codes)
+        return list(map(self._values.__getitem__, self._codes))
+
+    def clear(self):
+        self.__init__()
+
+    def export(self, writer: SnapshotWriter, name: str):
+        writer.add_array(f"{name}.codes", self._codes, "i")
+        writer.add_object(f"{name}.values", self._values)
+
+    def restore(self, snapshot: Snapshot, name: str):
+        self.__init__()
+        self._codes = snapshot.array(f"{name}.codes")
+        for value in snapshot.object(f"{name}.values"):
+            self._encode(value)
+
+
+class _ReferenceColumn(_Column):
+    """Values held by reference, with strings optionally interned so repeats share one object
+
+    Columns of strings are snapshotted as packed UTF-8; anything else is pickled.
+    """
+
+    def __init__(self, intern: bool = False):
+        self._intern = intern
+        self._data: Union[List[Any], _PackedStrings] = []
+
+    def _encode(self, value: Any) -> Any:
+        return sys.intern(value) if self._intern and type(value) is str else value
+
+    def _thaw(self) -> List[Any]:
+        if isinstance(self._data, _PackedStrings):
+            self._data = [self._encode(value) for value in self._data]
+        return self._data
+
+    def append(self, value: Any) -> bool:
+        self._thaw().append(self._encode(value))
+        return True
+
+    def set(self, position: int, value: Any) -> bool:
+        self._thaw()[position] = self._encode(value)
+        return True
+
+    def get(self, position: int) -> Any:
+        return self._data[position]
+
+    def to_list(self) -> List[Any]:
+        return list(self._data)
+
+    def clear(self):
+        self._data = []
+
+    def export(self, writer: SnapshotWriter, name: str):
+        if all(value is None or type(value) is str for value in self._data):
+            _pack_strings(writer, f"{name}.packed", self._data)
+        else:
+            writer.add_object(name, list(self._data))
+
+    def restore(self, snapshot: Snapshot, name: str):
+        if f"{name}.packed.offsets" in snapshot:
+            self._data = _unpack_strings(snapshot, f"{name}.packed")
+        else:
+            self._data = snapshot.object(name)
+
+
+class _PackedStringLists:
+    """Read-only sequence of string tuples over a row offsets array and packed items"""
+
+    def __init__(self, offsets: Sequence[int], items: _PackedStrings):
+        self._offsets = offsets
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position: int) -> Tuple[str, ...]:
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return tuple(self._items[i] for i in range(start, end)) if end > start else _EMPTY
+
+    def __iter__(self) -> Iterator[Tuple[str, ...]]:
+        for position in range(len(self)):
+            yield self[position]
+
+
+class _StringListColumn(_Column):
+    """Lists of strings stored as tuples of interned strings"""
+
+    def __init__(self):
+        self._data: Union[List[Tuple[str, ...]], _PackedStringLists] = []
+
+    @staticmethod
+    def _encode(value: Any) -> Optional[Tuple[str, ...]]:
+        if type(value) is not list or not all(type(item) is str for item in value):
+            return None
+        return tuple(sys.intern(item) for item in value) if value else _EMPTY
+
+    def _thaw(self) -> List[Tuple[str, ...]]:
+        if isinstance(self._data, _PackedStringLists):
+            self._data = [tuple(sys.intern(item) for item in items) for items in self._data]
+        return self._data
+
+    def append(self, value: Any) -> bool:
+        encoded = self._encode(value)
+        self._thaw().append(_EMPTY if encoded is None else encoded)
+        return encoded is not None
+
+    def set(self, position: int, value: Any) -> bool:
+        encoded = self._encode(value)
+        self._thaw()[position] = _EMPTY if encoded is None else encoded
+        return encoded is not None
+
+    def get(self, position: int) -> List[str]:
+        return list(self._data[position])
+
+    def to_list(self) -> List[List[str]]:
+        return [list(items) for items in self._data]
+
+    def clear(self):
+        self._data = []
+
+    def export(self, writer: SnapshotWriter, name: str):
+        offsets = array("q", [0])
+        for items in self._data:
+            offsets.append(offsets[-1] + len(items))
+        writer.add_array(f"{name}.offsets", offsets, "q")
+        _pack_strings(writer, f"{name}.items", (item for items in self._data for item in items))
+
+    def restore(self, snapshot: Snapshot, name: str):
+        self._data = _PackedStringLists(snapshot.array(f"{name}.offsets"), _unpack_strings(snapshot, f"{name}.items"))
+
+
+_COLUMN_KINDS = {
+    "int": lambda: _TypedColumn("q", int),
+    "float": lambda: _TypedColumn("d", float),
+    "category": _CategoryColumn,
+    "str": _ReferenceColumn,
+    "interned": lambda: _ReferenceColumn(intern=True),
+    "strings": _StringListColumn,
+    "object": _ReferenceColumn
+}
+
+
+class ColumnTable:
+    """Column-oriented record storage that reads like a list of dicts
+
+    Each schema field is stored in its own column (see ``_COLUMN_KINDS``) instead
+    of one dict per row. Indexing or iterating the table materializes fresh dicts
+    with the fields in schema order, so callers own what they get back; changes
+    go through ``append``, ``replace`` and ``set``. Missing fields, values that
+    do not fit a column's encoding and fields outside the schema are kept in a
+    sparse per-row overflow, so every record round-trips unchanged. ``export``
+    and ``restore`` move a table in and out of a snapshot file.
+    """
+
+    def __init__(self, schema: Sequence[Tuple[str, str]]):
+        self.schema = list(schema)
+        self._columns: Dict[str, _Column] = {name: _COLUMN_KINDS[kind]() for name, kind in self.schema}
+        self._items = list(self._columns.items())
+        self._overflow: Dict[int, Dict[str, Any]] = {}
+        self._size = 0
+
+    @classmethod
+    def from_records(cls, schema: Sequence[Tuple[str, str]], records: Iterable[Dict[str, Any]]) -> "ColumnTable":
+        """Build a table holding the given records"""
+        table = cls(schema)
+        for record in records:
+            table.append(record)
+        return table
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for position in range(self._size):
+            yield self._row(position)
+
+    def __getitem__(self, position: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(position, slice):
+            return [self._row(i) for i in range(*position.indices(self._size))]
+        if position < 0:
+            position += self._size
+        if not 0 <= position < self._size:
+            raise IndexError("ColumnTable index out of range")
+        return self._row(position)
+
+    def _row(self, position: int) -> Dict[str, Any]:
+        overflow = self._overflow.get(position)
+        if overflow is None:
+            return {name: column.get(position) for name, column in self._items}
+        row = {}
+        for name, column in self._items:
+            value = overflow.get(name, column)
+            if value is column:
+                row[name] = column.get(position)
+            elif value is not _ABSENT:
+                row[name] = value
+        for name, value in overflow.items():
+            if name not in self._columns:
+                row[name] = value
+        return row
+
+    def get(self, position: int, field: str, default: Any = None) -> Any:
+        """One field of a row without materializing the rest"""
+        overflow = self._overflow.get(position)
+        if overflow is not None and field in overflow:
+            value = overflow[field]
+            return default if value is _ABSENT else value
+        column = self._columns.get(field)
+        return default if column is None else column.get(position)
+
+    def project(self, position: int, fields: Sequence[str]) -> Dict[str, Any]:
+        """Only the given fields of a row, in the given order, reading just their columns"""
+        overflow = self._overflow.get(position)
+        row = {}
+        for field in fields:
+            if overflow is not None and field in overflow:
+                value = overflow[field]
+                if value is not _ABSENT:
+                    row[field] = value
+                continue
+            column = self._columns.get(field)
+            if column is not None:
+                row[field] = column.get(position)
+        return row
+
+    def values(self, field: str) -> Iterator[Any]:
+        """One field of every row, in stored order"""
+        for position in range(self._size):
+            yield self.get(position, field)
+
+    def column(self, field: str) -> List[Any]:
+        """One field of every row as a list, read a whole column at a time"""
+        column = self._columns.get(field)
+        if column is None:
+            values = [None] * self._size
+        else:
+            values = column.to_list()
+        for position, overflow in self._overflow.items():
+            if field in overflow:
+                value = overflow[field]
+                values[position] = None if value is _ABSENT else value
+        return values
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Store a record as a new row, returning its position"""
+        position = self._size
+        overflow = {}
+        present = 0
+        for name, column in self._items:
+            if name not in record:
+                column.append(None)
+                overflow[name] = _ABSENT
+                continue
+            present += 1
+            if not column.append(record[name]):
+                overflow[name] = record[name]
+        if len(record) > present:
+            self._collect_extra(record, overflow)
+        if overflow:
+            self._overflow[position] = overflow
+        self._size += 1
+        return position
+
+    def replace(self, position: int, record: Dict[str, Any]):
+        """Overwrite the row at a position with a new record"""
+        overflow = {}
+        present = 0
+        for name, column in self._items:
+            if name not in record:
+                column.set(position, None)
+                overflow[name] = _ABSENT
+                continue
+            present += 1
+            if not column.set(position, record[name]):
+                overflow[name] = record[name]
+        if len(record) > present:
+            self._collect_extra(record, overflow)
+        if overflow:
+            self._overflow[position] = overflow
+        else:
+            self._overflow.pop(position, None)
+
+    def set(self, position: int, field: str, value: Any):
+        """Overwrite one field of a row, leaving the others untouched"""
+        column = self._columns.get(field)
+        overflow = self._overflow.get(position)
+        if column is not None and column.set(position, value):
+            if overflow is not None and field in overflow:
+                del overflow[field]
+                if not overflow:
+                    del self._overflow[position]
+            return
+        if overflow is None:
+            overflow = self._overflow[position] = {}
+        overflow[field] = value
+
+    def _collect_extra(self, record: Dict[str, Any], overflow: Dict[str, Any]):
+        """Keep fields outside the schema in the row's overflow"""
+        for name, value in record.items():
+            if name not in self._columns:
+                overflow[name] = value
+
+    def clear(self):
+        """Drop every row"""
+        for column in self._columns.values():
+            column.clear()
+        self._overflow = {}
+        self._size = 0
+
+    def export(self, writer: SnapshotWriter, name: str):
+        """Write every column and the overflow as sections prefixed with name"""
+        for field, column in self._items:
+            column.export(writer, f"{name}.{field}")
+        writer.add_object(f"{name}.rows", {"size": self._size, "overflow": self._overflow})
+
+    @classmethod
+    def restore(cls, schema: Sequence[Tuple[str, str]], snapshot: Snapshot, name: str) -> "ColumnTable":
+        """Open a table exported under name, reading its columns from the snapshot in place"""
+        table = cls(schema)
+        for field, column in table._items:
+            column.restore(snapshot, f"{name}.{field}")
+        rows = snapshot.object(f"{name}.rows")
+        table._size = rows["size"]
+        table._overflow = rows["overflow"]
+        return table
@@ -1,49 +1,619 @@
-import json
 import os
-from typing import List, Dict, Any, Optional
-from pathlib import Path
+import time
+from array import array
+from itertools import islice
+from typing import List, Dict, Any, Optional, AbstractSet, Iterable, Iterator, Sequence, Tuple
 
-# Get the base directory
-BASE_DIR = Path(__file__).resolve().parent.parent
-MOCK_DATA_DIR = BASE_DIR / "mock_data"
+from utils.aggregates import OverviewAggregates, CampaignAggregates
+from utils.column_store import ColumnTable
+from utils.filter_index import CategoricalIndex, Selection
+from utils.text_index import TextIndex
+from utils.sort_index import SortedIndex
+from utils.pagination import encode_cursor, decode_cursor
+from utils.metrics import span
+from utils.rollups import CAMPAIGNS, POSTS, ACCOUNTS, TimeRollups, threat_metric, series_window, series_rows
+from utils.snapshot import Snapshot, SnapshotError, SnapshotWriter
+from utils.storage import (
+    BASE_DIR,
+    CAMPAIGN_SORT_FIELDS,
+    Page,
+    StorageBackend,
+    load_json_file,
+    mock_data_fingerprint,
+    stream_mock_data,
+    same_kind
+)
 
+# Column layouts for the high-volume tables, in the field order of the mock data
+POST_COLUMNS = [
+    ("id", "str"),
+    ("campaign_id", "category"),
+    ("account_id", "interned"),
+    ("platform", "category"),
+    ("platform_post_id", "str"),
+    ("content", "str"),
+    ("content_hash", "interned"),
+    ("media_urls", "strings"),
+    ("hashtags", "strings"),
+    ("mentions", "strings"),
+    ("posted_at", "str"),
+    ("engagement_count", "int"),
+    ("sentiment_score", "float"),
+    ("is_flagged", "category"),
+    ("created_at", "str")
+]
+ACCOUNT_COLUMNS = [
+    ("id", "str"),
+    ("platform", "category"),
+    ("platform_user_id", "str"),
+    ("username", "str"),
+    ("account_created_at", "str"),
+    ("follower_count", "int"),
+    ("following_count", "int"),
+    ("post_count", "int"),
+    ("verified", "category"),
+    ("bot_probability", "float"),
+    ("account_type", "category"),
+    ("risk_score", "float"),
+    ("first_seen", "str"),
+    ("last_active", "str"),
+    ("metadata", "object")
+]
 
-class DataLoader:
-    """Loads and manages mock data from JSON files"""
+# Attributes snapshotted column by column; every other attribute is pickled
+_SNAPSHOT_COLUMN_TABLES = {"posts", "accounts"}
+
+# Post fields that counters, rollups and campaign aggregates depend on
+COUNTED_POST_FIELDS = ("posted_at", "campaign_id", "account_id", "hashtags")
+
+# Stands in for a field a record does not have
+_MISSING = object()
+
+
+class DataLoader(StorageBackend):
+    """Loads and manages mock data from JSON files in memory"""
     
-    def __init__(self):
+    def __init__(self, snapshot_path: Optional[str] = None):
+        # Increases on every change to the stored data, for cache invalidation
+        self._data_version = 0
         self.campaigns: List[Dict[str, Any]] = []
-        self.posts: List[Dict[str, Any]] = []
-        self.accounts: List[Dict[str, Any]] = []
+        # Posts and accounts are stored by column; rows are materialized on read
+        self.posts = ColumnTable(POST_COLUMNS)
+        self.accounts = ColumnTable(ACCOUNT_COLUMNS)
         self.threat_scores: List[Dict[str, Any]] = []
         self.reports: List[Dict[str, Any]] = []
-        self.load_all_data()
+        
+        # Primary-key indexes (rebuilt on load, maintained on mutation); posts and
+        # accounts are located through the row positions of their bitmap indexes
+        self._campaigns_by_id: Dict[str, Dict[str, Any]] = {}
+        self._reports_by_id: Dict[str, Dict[str, Any]] = {}
+        self._threat_scores_by_campaign: Dict[str, Dict[str, Any]] = {}
+        
+        # Foreign-key indexes over posts, holding post row positions
+        self._posts_by_campaign: Dict[str, array] = {}
+        self._posts_by_account: Dict[str, array] = {}
+        # account_id -> {campaign_id: post count}, keys double as the account's campaign set
+        self._account_campaigns: Dict[str, Dict[str, int]] = {}
+        # campaign_id -> {platform: post count}
+        self._campaign_platforms: Dict[str, Dict[str, int]] = {}
+        
+        # Bitmap indexes over categorical filter fields
+        self._campaign_filters = CategoricalIndex(["status", "threat_level", "campaign_type"])
+        self._post_filters = CategoricalIndex(["platform", "is_flagged", "campaign_id"])
+        self._account_filters = CategoricalIndex(["account_type"])
+        self._report_filters = CategoricalIndex(["status", "severity", "report_type"])
+        
+        # Full-text index over post content, hashtags and mentions
+        self._post_text = TextIndex()
+        
+        # Presorted indexes backing paginated list endpoints
+        self._campaign_sorts = {
+            field: SortedIndex(field, default) for field, default in CAMPAIGN_SORT_FIELDS.items()
+        }
+        self._posts_by_posted_at = SortedIndex("posted_at", "")
+        self._posts_by_engagement = SortedIndex("engagement_count", 0)
+        self._accounts_by_bot_probability = SortedIndex("bot_probability", 0)
+        self._reports_by_generated_at = SortedIndex("generated_at", "")
+        
+        # Dashboard counters and hourly/daily rollups, adjusted on every insert and replace
+        self._overview = OverviewAggregates()
+        self._rollups = TimeRollups()
+        # campaign_id -> hashtag, account and post time counters for its detail page
+        self._campaign_aggregates: Dict[str, CampaignAggregates] = {}
+        
+        if snapshot_path:
+            self._warm_start(snapshot_path)
+        else:
+            self.load_all_data()
     
     def load_json_file(self, filename: str) -> List[Dict[str, Any]]:
         """Load data from a JSON file"""
-        file_path = MOCK_DATA_DIR / filename
+        return load_json_file(filename)
+    
+    def load_all_data(self):
+        """Stream all mock data files into memory, indexing records as they arrive"""
+        self._data_version += 1
+        self.campaigns = []
+        self.posts = ColumnTable(POST_COLUMNS)
+        self.accounts = ColumnTable(ACCOUNT_COLUMNS)
+        self.threat_scores = []
+        self.reports = []
+        self._reset_indexes()
+        
+        for campaign in stream_mock_data("campaigns"):
+            self.campaigns.append(campaign)
+            self._index_campaign(campaign)
+        for post in stream_mock_data("posts"):
+            self.posts.append(post)
+            self._index_loaded_post(post)
+        for account in stream_mock_data("accounts"):
+            self.accounts.append(account)
+            self._index_account(account)
+        for score in stream_mock_data("threat_scores"):
+            self.threat_scores.append(score)
+            self._threat_scores_by_campaign[score["campaign_id"]] = score
+        for report in stream_mock_data("reports"):
+            self.reports.append(report)
+            self._index_report(report)
+        
+        # Presorted indexes are cheaper to sort once than to insert into row by row
+        self._build_sorted_indexes()
+    
+    # Snapshot methods
+    def save_snapshot(self, path: str):
+        """Write all records and derived indexes to a binary snapshot file"""
+        with SnapshotWriter(path) as writer:
+            writer.add_object("sources", mock_data_fingerprint())
+            self.posts.export(writer, "posts")
+            self.accounts.export(writer, "accounts")
+            writer.add_object("state", {
+                name: value for name, value in vars(self).items()
+                if name not in _SNAPSHOT_COLUMN_TABLES
+            })
+    
+    def load_snapshot(self, path: str, verify: bool = True):
+        """Replace all records and indexes with those in a snapshot file
+        
+        Post and account columns are memory-mapped rather than copied. Raises
+        SnapshotError if the file is unusable or older than the mock data.
+        """
+        snapshot = Snapshot(path, verify)
+        if snapshot.object("sources") != mock_data_fingerprint():
+            raise SnapshotError("Snapshot is out of date with the mock data files")
+        posts = ColumnTable.restore(POST_COLUMNS, snapshot, "posts")
+        accounts = ColumnTable.restore(ACCOUNT_COLUMNS, snapshot, "accounts")
+        state = snapshot.object("state")
+        missing = vars(self).keys() - state.keys() - _SNAPSHOT_COLUMN_TABLES
+        if missing:
+            raise SnapshotError(f"Snapshot lacks {', '.join(sorted(missing))}")
+        self.posts = posts
+        self.accounts = accounts
+        version = self._data_version
+        for name, value in state.items():
+            setattr(self, name, value)
+        # The restored counter may be behind the replaced data's
+        self._data_version = version + 1
+    
+    def _warm_start(self, path: str):
+        """Open the snapshot at path, or load the mock data and write a fresh snapshot there"""
+        start = time.perf_counter()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            self.load_snapshot(path)
+            print(f"⚡ Opened snapshot {path} in {time.perf_counter() - start:.3f}s")
+            return
         except FileNotFoundError:
-            print(f"Warning: {filename} not found at {file_path}")
-            return []
-        except json.JSONDecodeError as e:
-            print(f"Error decoding {filename}: {e}")
-            return []
+            pass
+        except SnapshotError as e:
+            print(f"Ignoring snapshot {path}: {e}")
+        self.load_all_data()
+        try:
+            self.save_snapshot(path)
+            print(f"💾 Wrote snapshot {path}")
+        except OSError as e:
+            print(f"Warning: could not write snapshot {path}: {e}")
     
-    def load_all_data(self):
-        """Load all mock data files"""
-        self.campaigns = self.load_json_file("campaigns.json")
-        self.posts = self.load_json_file("posts.json")
-        self.accounts = self.load_json_file("accounts.json")
-        self.threat_scores = self.load_json_file("threat_scores.json")
-        self.reports = self.load_json_file("reports.json")
-        print(f"✅ Loaded {len(self.campaigns)} campaigns")
-        print(f"✅ Loaded {len(self.posts)} posts")
-        print(f"✅ Loaded {len(self.accounts)} accounts")
-        print(f"✅ Loaded {len(self.threat_scores)} threat scores")
-        print(f"✅ Loaded {len(self.reports)} reports")
+    # Index methods
+    def rebuild_indexes(self):
+        """Rebuild all lookup indexes from the loaded record lists
+        
+        Plain lists assigned to ``posts`` or ``accounts`` are packed into columns first.
+        """
+        self._data_version += 1
+        if not isinstance(self.posts, ColumnTable):
+            self.posts = ColumnTable.from_records(POST_COLUMNS, self.posts)
+        if not isinstance(self.accounts, ColumnTable):
+            self.accounts = ColumnTable.from_records(ACCOUNT_COLUMNS, self.accounts)
+        self._reset_indexes()
+        for campaign in self.campaigns:
+            self._index_campaign(campaign)
+        for post in self.posts:
+            self._index_loaded_post(post)
+        for account in self.accounts:
+            self._index_account(account)
+        for score in self.threat_scores:
+            self._threat_scores_by_campaign[score["campaign_id"]] = score
+        for report in self.reports:
+            self._index_report(report)
+        self._build_sorted_indexes()
+    
+    def _reset_indexes(self):
+        """Empty every index ahead of a full load"""
+        self._campaigns_by_id = {}
+        self._reports_by_id = {}
+        self._threat_scores_by_campaign = {}
+        
+        self._posts_by_campaign = {}
+        self._posts_by_account = {}
+        self._account_campaigns = {}
+        self._campaign_platforms = {}
+        
+        self._campaign_filters.build([])
+        self._post_filters.build([])
+        self._account_filters.build([])
+        self._report_filters.build([])
+        self._post_text.clear()
+        self._overview = OverviewAggregates()
+        self._rollups = TimeRollups()
+        self._campaign_aggregates = {}
+    
+    def _index_campaign(self, campaign: Dict[str, Any]):
+        """Add a campaign appended during a full load to the hash and bitmap indexes"""
+        self._campaigns_by_id[campaign["id"]] = campaign
+        self._campaign_filters.add(campaign)
+        self._count_new_campaign(campaign)
+    
+    def _count_new_campaign(self, campaign: Dict[str, Any]):
+        """Count a new campaign, and the platforms it already has posts on"""
+        self._count_campaign(campaign)
+        self._overview.count_campaign_platforms(self._campaign_platforms.get(campaign["id"], ()))
+    
+    def _count_campaign(self, campaign: Dict[str, Any], delta: int = 1):
+        """Add a campaign to the overview counters and rollups, or take it out with delta=-1"""
+        self._overview.count_campaign(campaign.get("status"), campaign.get("threat_level"), delta)
+        detected_at = campaign.get("detected_at")
+        self._rollups.count(CAMPAIGNS, detected_at, delta=delta)
+        self._rollups.count(threat_metric(campaign.get("threat_level")), detected_at, delta=delta)
+    
+    def _count_post(self, post: Dict[str, Any], delta: int = 1):
+        """Add a post to the overview counters and rollups, or take it out with delta=-1"""
+        self._overview.count_posts(delta)
+        posted_at = post.get("posted_at")
+        self._rollups.count(POSTS, posted_at, delta=delta)
+        campaign_id = post.get("campaign_id")
+        if campaign_id:
+            self._rollups.count(POSTS, posted_at, campaign_id, delta)
+            aggregates = self._campaign_aggregates.get(campaign_id)
+            if aggregates is None:
+                aggregates = self._campaign_aggregates[campaign_id] = CampaignAggregates()
+            aggregates.count_post(post, delta)
+            if not aggregates.posts:
+                del self._campaign_aggregates[campaign_id]
+    
+    def _count_account(self, account: Dict[str, Any], delta: int = 1):
+        """Add an account to the overview counters and rollups, or take it out with delta=-1"""
+        self._overview.count_account(account.get("account_type"), delta)
+        self._rollups.count(ACCOUNTS, account.get("first_seen"), delta=delta)
+    
+    def _index_loaded_post(self, post: Dict[str, Any]):
+        """Add a post appended during a full load to the bitmap, text and foreign-key indexes"""
+        position = self._post_filters.add(post)
+        self._post_text.add(position, _post_texts(post))
+        self._index_post(position, post)
+        self._count_post(post)
+    
+    def _index_account(self, account: Dict[str, Any]):
+        """Add an account appended during a full load to the bitmap index"""
+        self._account_filters.add(account)
+        self._count_account(account)
+    
+    def _index_report(self, report: Dict[str, Any]):
+        """Add a report appended during a full load to the hash and bitmap indexes"""
+        self._reports_by_id[report["id"]] = report
+        self._report_filters.add(report)
+    
+    def _build_sorted_indexes(self):
+        """Sort every presorted index from the current record lists"""
+        for sort in self._campaign_sorts.values():
+            sort.build(self.campaigns)
+        for sort in (self._posts_by_posted_at, self._posts_by_engagement):
+            sort.build_values(self.posts.values(sort.field))
+        self._accounts_by_bot_probability.build_values(self.accounts.values("bot_probability"))
+        self._reports_by_generated_at.build(self.reports)
+    
+    def _index_post(self, position: int, post: Dict[str, Any]):
+        """Add a post's row position to the foreign-key indexes"""
+        account_id = post["account_id"]
+        campaign_id = post.get("campaign_id")
+        self._posts_by_account.setdefault(account_id, array("q")).append(position)
+        if campaign_id:
+            self._posts_by_campaign.setdefault(campaign_id, array("q")).append(position)
+            campaigns = self._account_campaigns.setdefault(account_id, {})
+            campaigns[campaign_id] = campaigns.get(campaign_id, 0) + 1
+            platforms = self._campaign_platforms.setdefault(campaign_id, {})
+            platform = post.get("platform", "other")
+            if platform not in platforms and campaign_id in self._campaigns_by_id:
+                self._overview.count_campaign_platforms([platform])
+            platforms[platform] = platforms.get(platform, 0) + 1
+    
+    def _unindex_post(self, position: int, values: Dict[str, Any]):
+        """Remove a post's row position from the foreign-key indexes using its previous field values"""
+        account_id = values["account_id"]
+        campaign_id = values.get("campaign_id")
+        _remove_position(self._posts_by_account, account_id, position)
+        if campaign_id:
+            _remove_position(self._posts_by_campaign, campaign_id, position)
+            _decrement(self._account_campaigns, account_id, campaign_id)
+            platform = values.get("platform", "other")
+            _decrement(self._campaign_platforms, campaign_id, platform)
+            if platform not in self._campaign_platforms.get(campaign_id, ()) and campaign_id in self._campaigns_by_id:
+                self._overview.count_campaign_platforms([platform], -1)
+    
+    def _upsert(
+        self,
+        records: List[Dict[str, Any]],
+        index: Dict[str, Dict[str, Any]],
+        key: str,
+        record: Dict[str, Any],
+        filters: Optional[CategoricalIndex] = None,
+        sorts: Sequence[SortedIndex] = ()
+    ) -> Optional[Dict[str, Any]]:
+        """Insert or replace a record in a list and its indexes, returning the previous values"""
+        existing = index.get(record[key])
+        if existing is None:
+            records.append(record)
+            index[record[key]] = record
+            if filters is not None:
+                filters.add(record)
+            for sort in sorts:
+                sort.add(record)
+            return None
+        
+        # Replace in place so the list position and any outstanding references stay valid
+        previous = existing.copy()
+        existing.clear()
+        existing.update(record)
+        if filters is not None:
+            filters.update(existing, previous)
+            position = filters.position_of(record[key])
+            for sort in sorts:
+                sort.update(position, existing)
+        return previous
+    
+    def _upsert_row(
+        self,
+        table: ColumnTable,
+        filters: CategoricalIndex,
+        record: Dict[str, Any],
+        sorts: Sequence[SortedIndex] = ()
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Insert or replace a row of a column table and its indexes
+        
+        Returns the row position and the previous values, if any.
+        """
+        position = filters.position_of(record[filters.key])
+        if position is None:
+            position = table.append(record)
+            filters.add(record)
+            for sort in sorts:
+                sort.add(record)
+            return position, None
+        
+        previous = table[position]
+        table.replace(position, record)
+        filters.update(record, previous)
+        for sort in sorts:
+            sort.update(position, record)
+        return position, previous
+    
+    def upsert_campaign(self, campaign: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new campaign or replace the one with the same ID"""
+        self._data_version += 1
+        previous = self._upsert(
+            self.campaigns, self._campaigns_by_id, "id", campaign, self._campaign_filters,
+            tuple(self._campaign_sorts.values())
+        )
+        if previous is None:
+            self._count_new_campaign(campaign)
+        else:
+            self._count_campaign(previous, -1)
+            self._count_campaign(campaign)
+        return self._campaigns_by_id[campaign["id"]]
+    
+    def upsert_post(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new post or replace the one with the same ID"""
+        self._data_version += 1
+        position, previous = self._upsert_row(
+            self.posts, self._post_filters, post,
+            (self._posts_by_posted_at, self._posts_by_engagement)
+        )
+        if previous is None:
+            self._post_text.add(position, _post_texts(post))
+            self._index_post(position, post)
+            self._count_post(post)
+            return self.posts[position]
+        
+        self._post_text.update(position, _post_texts(previous), _post_texts(post))
+        if any(previous.get(k) != post.get(k) for k in COUNTED_POST_FIELDS):
+            self._count_post(previous, -1)
+            self._count_post(post)
+        # Only move the post between buckets when a foreign key actually changed
+        if any(previous.get(k) != post.get(k) for k in ("account_id", "campaign_id", "platform")):
+            self._unindex_post(position, previous)
+            self._index_post(position, post)
+        return self.posts[position]
+    
+    def upsert_account(self, account: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new account or replace the one with the same ID"""
+        self._data_version += 1
+        position, previous = self._upsert_row(
+            self.accounts, self._account_filters, account, (self._accounts_by_bot_probability,)
+        )
+        if previous is not None:
+            self._count_account(previous, -1)
+        self._count_account(account)
+        return self.accounts[position]
+    
+    def upsert_report(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new report or replace the one with the same ID"""
+        self._data_version += 1
+        self._upsert(
+            self.reports, self._reports_by_id, "id", report, self._report_filters,
+            (self._reports_by_generated_at,)
+        )
+        return self._reports_by_id[report["id"]]
+    
+    def upsert_threat_score(self, score: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new threat score or replace the one for the same campaign"""
+        self._data_version += 1
+        self._upsert(self.threat_scores, self._threat_scores_by_campaign, "campaign_id", score)
+        return self._threat_scores_by_campaign[score["campaign_id"]]
+    
+    def upsert_posts(self, posts: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace many posts, returning how many were new
+        
+        New posts are appended and indexed as they arrive; their presorted index
+        entries are merged in once per run of new posts rather than one by one.
+        """
+        self._data_version += 1
+        sorts = (self._posts_by_posted_at, self._posts_by_engagement)
+        appended: List[Dict[str, Any]] = []
+        inserted = 0
+        for post in posts:
+            if self._post_filters.position_of(post["id"]) is not None:
+                # A replaced post may be one appended earlier in this batch
+                for sort in sorts:
+                    sort.add_many(appended)
+                appended = []
+                self.upsert_post(post)
+                continue
+            self.posts.append(post)
+            self._index_loaded_post(post)
+            appended.append(post)
+            inserted += 1
+        for sort in sorts:
+            sort.add_many(appended)
+        return inserted
+    
+    def upsert_accounts(self, accounts: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace many accounts, returning how many were new"""
+        self._data_version += 1
+        sort = self._accounts_by_bot_probability
+        appended: List[Dict[str, Any]] = []
+        inserted = 0
+        for account in accounts:
+            if self._account_filters.position_of(account["id"]) is not None:
+                sort.add_many(appended)
+                appended = []
+                self.upsert_account(account)
+                continue
+            self.accounts.append(account)
+            self._index_account(account)
+            appended.append(account)
+            inserted += 1
+        sort.add_many(appended)
+        return inserted
+    
+    def update_accounts(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Set fields of existing accounts by ID, returning how many accounts changed
+        
+        Only fields whose value actually changes are written, and the indexes
+        are adjusted for just those rows.
+        """
+        self._data_version += 1
+        changed = 0
+        sort_values: Dict[int, Any] = {}
+        sort_field = self._accounts_by_bot_probability.field
+        # Fields that filters, counters or rollups depend on
+        counted_fields = {*self._account_filters.fields, "account_type", "first_seen"}
+        for account_id, fields in updates.items():
+            position = self._account_filters.position_of(account_id)
+            if position is None:
+                continue
+            diff = {
+                field: value for field, value in fields.items()
+                if self.accounts.get(position, field, _MISSING) != value
+            }
+            if not diff:
+                continue
+            previous = self.accounts[position] if diff.keys() & counted_fields else None
+            for field, value in diff.items():
+                self.accounts.set(position, field, value)
+            if previous is not None:
+                account = self.accounts[position]
+                self._account_filters.update(account, previous)
+                self._count_account(previous, -1)
+                self._count_account(account)
+            if sort_field in diff:
+                sort_values[position] = diff[sort_field]
+            changed += 1
+        self._accounts_by_bot_probability.update_many(sort_values)
+        return changed
+    
+    def _page(
+        self,
+        records: Sequence[Dict[str, Any]],
+        filters: CategoricalIndex,
+        selection: Selection,
+        sort: Optional[SortedIndex],
+        sort_by: str,
+        offset: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        descending: bool = True,
+        min_value: Any = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of selected rows, the total match count and the next cursor
+        
+        Rows come from the presorted index when one is given and in stored order
+        otherwise. A cursor replaces the offset and resumes right after the row it
+        was issued for. Raises ValueError for an unusable cursor.
+        """
+        after = self._resolve_cursor(filters, sort, sort_by, cursor)
+        if after is not None:
+            offset = 0
+        
+        # Fetch one extra row to learn whether another page follows
+        with span("sort"):
+            if sort is not None:
+                positions = sort.page(selection, offset, limit + 1, min_value, descending, after)
+                total_items = sort.count(selection, min_value)
+            else:
+                start = after[1] + 1 if after is not None else 0
+                positions = list(islice(selection.positions(start), offset, offset + limit + 1))
+                total_items = selection.count()
+        
+        next_cursor = None
+        if len(positions) > limit:
+            positions = positions[:limit]
+            last = positions[-1]
+            next_cursor = encode_cursor(
+                sort_by,
+                sort.value_at(last) if sort is not None else None,
+                records[last][filters.key]
+            )
+        with span("materialize") as s:
+            rows = _rows(records, positions, fields)
+            s.rows = len(rows)
+        return rows, total_items, next_cursor
+    
+    def _resolve_cursor(
+        self,
+        filters: CategoricalIndex,
+        sort: Optional[SortedIndex],
+        sort_by: str,
+        cursor: Optional[str]
+    ) -> Optional[Tuple[Any, int]]:
+        """Turn an opaque cursor into a (sort value, row position) keyset bound"""
+        if cursor is None:
+            return None
+        value, key = decode_cursor(cursor, sort_by)
+        position = filters.position_of(key)
+        if position is None:
+            raise ValueError(f"Cursor refers to unknown record '{key}'")
+        if sort is not None and not same_kind(value, sort.default):
+            raise ValueError("Cursor value does not match the sort field")
+        return value, position
     
     # Campaign methods
     def get_all_campaigns(self) -> List[Dict[str, Any]]:
@@ -52,10 +622,21 @@ class DataLoader:
     
     def get_campaign_by_id(self, campaign_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific campaign by ID"""
-        for campaign in self.campaigns:
-            if campaign["id"] == campaign_id:
-                return campaign
-        return None
+        return self._campaigns_by_id.get(campaign_id)
+    
+    def select_campaigns(
+        self,
+        status: Optional[str] = None,
+        threat_level: Optional[str] = None,
+        campaign_type: Optional[str] = None
+    ) -> Selection:
+        """Select campaign row positions matching the filters"""
+        with span("filter"):
+            return self._campaign_filters.select(
+                status=_predicate(status),
+                threat_level=_predicate(threat_level),
+                campaign_type=_predicate(campaign_type)
+            )
     
     def filter_campaigns(
         self,
@@ -64,27 +645,81 @@ class DataLoader:
         campaign_type: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Filter campaigns by various criteria"""
-        filtered = self.campaigns.copy()
-        
-        if status and status != "all":
-            filtered = [c for c in filtered if c["status"] == status]
-        
-        if threat_level and threat_level != "all":
-            filtered = [c for c in filtered if c["threat_level"] == threat_level]
-        
-        if campaign_type and campaign_type != "all":
-            filtered = [c for c in filtered if c["campaign_type"] == campaign_type]
+        return self.select_campaigns(status, threat_level, campaign_type).rows(self.campaigns)
+    
+    def page_campaigns(
+        self,
+        offset: int,
+        limit: int,
+        status: Optional[str] = None,
+        threat_level: Optional[str] = None,
+        campaign_type: Optional[str] = None,
+        sort_by: str = "detected_at",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching campaigns, the total and the next cursor
         
-        return filtered
+        Unknown sort fields fall back to stored order.
+        """
+        return self._page(
+            self.campaigns,
+            self._campaign_filters,
+            self.select_campaigns(status, threat_level, campaign_type),
+            self._campaign_sorts.get(sort_by),
+            sort_by,
+            offset,
+            limit,
+            cursor,
+            descending=(order == "desc"),
+            fields=fields
+        )
+    
+    def count_campaigns(
+        self,
+        status: Optional[str] = None,
+        threat_level: Optional[str] = None,
+        campaign_type: Optional[str] = None
+    ) -> int:
+        """Count campaigns matching the filters without materializing them"""
+        return self.select_campaigns(status, threat_level, campaign_type).count()
     
     # Post methods
     def get_all_posts(self) -> List[Dict[str, Any]]:
         """Get all posts"""
-        return self.posts
+        return list(self.posts)
+    
+    def get_post_by_id(self, post_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific post by ID"""
+        position = self._post_filters.position_of(post_id)
+        return None if position is None else self.posts[position]
     
     def get_posts_by_campaign(self, campaign_id: str) -> List[Dict[str, Any]]:
         """Get all posts for a specific campaign"""
-        return [p for p in self.posts if p.get("campaign_id") == campaign_id]
+        return [self.posts[pos] for pos in self._posts_by_campaign.get(campaign_id, ())]
+    
+    def get_posts_by_account(self, account_id: str) -> List[Dict[str, Any]]:
+        """Get all posts made by a specific account"""
+        return [self.posts[pos] for pos in self._posts_by_account.get(account_id, ())]
+    
+    def get_platform_counts_by_campaign(self, campaign_id: str) -> Dict[str, int]:
+        """Get post counts per platform for a specific campaign"""
+        return dict(self._campaign_platforms.get(campaign_id, {}))
+    
+    def select_posts(
+        self,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        campaign_id: Optional[str] = None
+    ) -> Selection:
+        """Select post row positions matching the filters"""
+        with span("filter"):
+            return self._post_filters.select(
+                platform=_predicate(platform),
+                is_flagged=is_flagged,
+                campaign_id=campaign_id
+            )
     
     def filter_posts(
         self,
@@ -92,73 +727,302 @@ class DataLoader:
         is_flagged: Optional[bool] = None
     ) -> List[Dict[str, Any]]:
         """Filter posts by various criteria"""
-        filtered = self.posts.copy()
+        return self.select_posts(platform, is_flagged).rows(self.posts)
+    
+    def search_posts(
+        self,
+        query: str,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        ranked: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over posts, in stored order or by BM25 relevance"""
+        selection = self.select_posts(platform, is_flagged)
+        if ranked:
+            positions = [pos for pos, _ in self._post_text.rank(query)]
+        else:
+            positions = sorted(self._post_text.match(query))
+        return [self.posts[pos] for pos in positions if pos in selection]
+    
+    def page_posts(
+        self,
+        offset: int,
+        limit: int,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        campaign_id: Optional[str] = None,
+        search: Optional[str] = None,
+        sort_by: str = "posted_at",
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching posts, the total match count and the next cursor
+        
+        sort_by is "posted_at" or "engagement_count" (descending), "relevance"
+        (BM25 order, search only) or anything else for stored order.
+        """
+        selection = self.select_posts(platform, is_flagged, campaign_id)
+        sort = {
+            "posted_at": self._posts_by_posted_at,
+            "engagement_count": self._posts_by_engagement
+        }.get(sort_by)
+        
+        if not search:
+            return self._page(
+                self.posts, self._post_filters, selection, sort, sort_by, offset, limit, cursor, fields=fields
+            )
         
-        if platform and platform != "all":
-            filtered = [p for p in filtered if p["platform"] == platform]
+        if sort_by == "relevance":
+            return self._page_ranked(search, selection, offset, limit, cursor, fields)
         
-        if is_flagged is not None:
-            filtered = [p for p in filtered if p["is_flagged"] == is_flagged]
+        after = self._resolve_cursor(self._post_filters, sort, sort_by, cursor)
+        if after is not None:
+            offset = 0
+        with span("search") as s:
+            matches = [pos for pos in self._post_text.match(search) if pos in selection]
+            s.rows = len(matches)
+        if sort is not None:
+            positions = sort.top(matches, offset + limit + 1, after=after)[offset:]
+        else:
+            start = after[1] + 1 if after is not None else 0
+            positions = sorted(pos for pos in matches if pos >= start)[offset:offset + limit + 1]
+        
+        next_cursor = None
+        if len(positions) > limit:
+            positions = positions[:limit]
+            last = positions[-1]
+            next_cursor = encode_cursor(
+                sort_by,
+                sort.value_at(last) if sort is not None else None,
+                self.posts.get(last, "id")
+            )
+        with span("materialize") as s:
+            rows = _rows(self.posts, positions, fields)
+            s.rows = len(rows)
+        return rows, len(matches), next_cursor
+    
+    def _page_ranked(
+        self,
+        search: str,
+        selection: Selection,
+        offset: int,
+        limit: int,
+        cursor: Optional[str],
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Page search results in BM25 order, with the score as the cursor value"""
+        with span("search") as s:
+            ranked = [(pos, score) for pos, score in self._post_text.rank(search) if pos in selection]
+            s.rows = len(ranked)
+        if cursor is not None:
+            score, key = decode_cursor(cursor, "relevance")
+            position = self._post_filters.position_of(key)
+            if position is None or not same_kind(score, 0.0):
+                raise ValueError("Cursor does not refer to a ranked search result")
+            bound = (score, -position)
+            page = [hit for hit in ranked if (hit[1], -hit[0]) < bound][:limit + 1]
+        else:
+            page = ranked[offset:offset + limit + 1]
         
-        return filtered
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            position, score = page[-1]
+            next_cursor = encode_cursor("relevance", score, self.posts.get(position, "id"))
+        return _rows(self.posts, [pos for pos, _ in page], fields), len(ranked), next_cursor
+    
+    def count_posts(
+        self,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        campaign_id: Optional[str] = None
+    ) -> int:
+        """Count posts matching the filters without materializing them"""
+        return self.select_posts(platform, is_flagged, campaign_id).count()
+    
+    def iter_posts(
+        self,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        campaign_id: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching posts in stored order, one row at a time"""
+        # The selection is a snapshot, so posts added meanwhile are not yielded
+        for pos in self.select_posts(platform, is_flagged, campaign_id).positions():
+            yield self.posts[pos] if fields is None else self.posts.project(pos, fields)
     
     # Account methods
     def get_all_accounts(self) -> List[Dict[str, Any]]:
         """Get all accounts"""
-        return self.accounts
+        return list(self.accounts)
     
     def get_account_by_id(self, account_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific account by ID"""
-        for account in self.accounts:
-            if account["id"] == account_id:
-                return account
-        return None
+        position = self._account_filters.position_of(account_id)
+        return None if position is None else self.accounts[position]
     
-    def get_accounts_by_campaign(self, campaign_id: str) -> List[Dict[str, Any]]:
-        """Get all accounts involved in a campaign"""
-        # Get all posts in the campaign
-        campaign_posts = self.get_posts_by_campaign(campaign_id)
-        account_ids = list(set([p["account_id"] for p in campaign_posts]))
+    def get_accounts_by_campaign(
+        self,
+        campaign_id: str,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get all accounts involved in a campaign, reading just the given fields of each"""
+        # Group the campaign's post times by account in a single pass, reading
+        # only the two columns needed
+        times_by_account: Dict[str, List[str]] = {}
+        for pos in self._posts_by_campaign.get(campaign_id, ()):
+            times_by_account.setdefault(self.posts.get(pos, "account_id"), []).append(
+                self.posts.get(pos, "posted_at")
+            )
         
         # Get account details
         accounts = []
-        for acc_id in account_ids:
-            account = self.get_account_by_id(acc_id)
-            if account:
+        for acc_id, posted_at in times_by_account.items():
+            position = self._account_filters.position_of(acc_id)
+            if position is not None:
+                account = self.accounts[position] if fields is None else self.accounts.project(position, fields)
                 # Add campaign-specific info
-                account_posts = [p for p in campaign_posts if p["account_id"] == acc_id]
-                account_copy = account.copy()
-                account_copy["post_count_in_campaign"] = len(account_posts)
-                if account_posts:
-                    account_copy["first_post_at"] = min(p["posted_at"] for p in account_posts)
-                    account_copy["last_post_at"] = max(p["posted_at"] for p in account_posts)
-                accounts.append(account_copy)
+                account["post_count_in_campaign"] = len(posted_at)
+                account["first_post_at"] = min(posted_at)
+                account["last_post_at"] = max(posted_at)
+                accounts.append(account)
         
         return accounts
     
+    def get_campaign_ids_by_account(self, account_id: str) -> AbstractSet[str]:
+        """Get the IDs of all campaigns an account has posted in"""
+        return self._account_campaigns.get(account_id, {}).keys()
+    
+    def select_accounts(self, account_type: Optional[str] = None) -> Selection:
+        """Select account row positions matching the categorical filters"""
+        with span("filter"):
+            return self._account_filters.select(account_type=_predicate(account_type))
+    
     def filter_accounts(
         self,
         account_type: Optional[str] = None,
         min_bot_probability: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """Filter accounts by various criteria"""
-        filtered = self.accounts.copy()
-        
-        if account_type and account_type != "all":
-            filtered = [a for a in filtered if a["account_type"] == account_type]
-        
-        if min_bot_probability is not None:
-            filtered = [a for a in filtered if a["bot_probability"] >= min_bot_probability]
+        rows = self.select_accounts(account_type).iter_rows(self.accounts)
+        if min_bot_probability is None:
+            return list(rows)
+        return [a for a in rows if a["bot_probability"] >= min_bot_probability]
+    
+    def count_accounts(
+        self,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None
+    ) -> int:
+        """Count accounts matching the filters"""
+        return self._accounts_by_bot_probability.count(
+            self.select_accounts(account_type), min_bot_probability
+        )
+    
+    def page_accounts(
+        self,
+        offset: int,
+        limit: int,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching accounts by bot probability (highest first), the total and the next cursor"""
+        return self._page(
+            self.accounts,
+            self._account_filters,
+            self.select_accounts(account_type),
+            self._accounts_by_bot_probability,
+            "bot_probability",
+            offset,
+            limit,
+            cursor,
+            min_value=min_bot_probability,
+            fields=fields
+        )
+    
+    def iter_accounts(
+        self,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching accounts in stored order, one row at a time"""
+        for pos in self.select_accounts(account_type).positions():
+            if min_bot_probability is not None and (self.accounts.get(pos, "bot_probability") or 0) < min_bot_probability:
+                continue
+            yield self.accounts[pos] if fields is None else self.accounts.project(pos, fields)
+    
+    # Column methods
+    def get_post_columns(self, fields: Sequence[str]) -> Dict[str, List[Any]]:
+        """Scalar fields of every post as parallel lists, in stored order"""
+        return {field: self.posts.column(field) for field in fields}
+    
+    def get_account_columns(self, fields: Sequence[str]) -> Dict[str, List[Any]]:
+        """Scalar fields of every account as parallel lists, in stored order"""
+        return {field: self.accounts.column(field) for field in fields}
+    
+    def get_campaign_post_columns(self, campaign_id: str, fields: Sequence[str]) -> Dict[str, List[Any]]:
+        """Fields of a campaign's posts as parallel lists, reading only their columns"""
+        positions = self._posts_by_campaign.get(campaign_id, ())
+        return {field: [self.posts.get(pos, field) for pos in positions] for field in fields}
+    
+    # Aggregate methods
+    def data_version(self) -> int:
+        """Counter that increases whenever the stored data changes"""
+        return self._data_version
+    
+    def get_overview_stats(self, recompute: bool = False) -> Dict[str, Any]:
+        """Dashboard overview counts, read from the materialized counters
         
-        return filtered
+        With recompute, the counters are first rebuilt from a full scan of the
+        stored records.
+        """
+        if recompute:
+            self._overview = self._count_overview()
+        return self._overview.stats()
+    
+    def _count_overview(self) -> OverviewAggregates:
+        """Overview counters computed from scratch"""
+        overview = OverviewAggregates()
+        for campaign in self.campaigns:
+            overview.count_campaign(campaign.get("status"), campaign.get("threat_level"))
+        overview.count_posts(len(self.posts))
+        for account_type in self.accounts.column("account_type"):
+            overview.count_account(account_type)
+        pairs = set(zip(self.posts.column("campaign_id"), self.posts.column("platform")))
+        overview.count_campaign_platforms(
+            platform for campaign_id, platform in pairs if campaign_id in self._campaigns_by_id
+        )
+        return overview
+    
+    def get_campaign_stats(self, campaign_id: str) -> Dict[str, Any]:
+        """A campaign's post statistics, read from its incrementally maintained counters"""
+        aggregates = self._campaign_aggregates.get(campaign_id) or CampaignAggregates()
+        if aggregates.stale:
+            aggregates.set_range(
+                self.posts.get(pos, "posted_at") for pos in self._posts_by_campaign.get(campaign_id, ())
+            )
+        return aggregates.stats(self._campaign_platforms.get(campaign_id, {}))
+    
+    def get_time_series(
+        self,
+        metrics: Sequence[str],
+        period: str,
+        scope: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Bucketed counts of metrics over a period, read from the hourly and daily rollups"""
+        resolution, keys = series_window(period, self._rollups.clock, self._rollups.span(metrics, scope))
+        return series_rows(
+            resolution, keys, {metric: self._rollups.buckets(metric, resolution, scope) for metric in metrics}
+        )
     
     # Threat score methods
     def get_threat_score_by_campaign(self, campaign_id: str) -> Optional[Dict[str, Any]]:
         """Get threat score for a specific campaign"""
-        for score in self.threat_scores:
-            if score["campaign_id"] == campaign_id:
-                return score
-        return None
+        return self._threat_scores_by_campaign.get(campaign_id)
     
     # Report methods
     def get_all_reports(self) -> List[Dict[str, Any]]:
@@ -167,10 +1031,21 @@ class DataLoader:
     
     def get_report_by_id(self, report_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific report by ID"""
-        for report in self.reports:
-            if report["id"] == report_id:
-                return report
-        return None
+        return self._reports_by_id.get(report_id)
+    
+    def select_reports(
+        self,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        report_type: Optional[str] = None
+    ) -> Selection:
+        """Select report row positions matching the filters"""
+        with span("filter"):
+            return self._report_filters.select(
+                status=_predicate(status),
+                severity=_predicate(severity),
+                report_type=_predicate(report_type)
+            )
     
     def filter_reports(
         self,
@@ -179,19 +1054,95 @@ class DataLoader:
         report_type: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Filter reports by various criteria"""
-        filtered = self.reports.copy()
-        
-        if status and status != "all":
-            filtered = [r for r in filtered if r["status"] == status]
-        
-        if severity and severity != "all":
-            filtered = [r for r in filtered if r["severity"] == severity]
-        
-        if report_type and report_type != "all":
-            filtered = [r for r in filtered if r["report_type"] == report_type]
-        
-        return filtered
+        return self.select_reports(status, severity, report_type).rows(self.reports)
+    
+    def count_reports(
+        self,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        report_type: Optional[str] = None
+    ) -> int:
+        """Count reports matching the filters without materializing them"""
+        return self.select_reports(status, severity, report_type).count()
+    
+    def page_reports(
+        self,
+        offset: int,
+        limit: int,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        report_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching reports by generation time (newest first), the total and the next cursor"""
+        return self._page(
+            self.reports,
+            self._report_filters,
+            self.select_reports(status, severity, report_type),
+            self._reports_by_generated_at,
+            "generated_at",
+            offset,
+            limit,
+            cursor,
+            fields=fields
+        )
+
+
+def _rows(records: Sequence[Dict[str, Any]], positions: Iterable[int], fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    """Records at row positions, holding just the given fields when there are any"""
+    if fields is None:
+        return [records[pos] for pos in positions]
+    if isinstance(records, ColumnTable):
+        return [records.project(pos, fields) for pos in positions]
+    return [{field: records[pos][field] for field in fields if field in records[pos]} for pos in positions]
+
+
+def _post_texts(post: Dict[str, Any]) -> List[str]:
+    """Text fields of a post covered by the full-text index"""
+    return [post.get("content", ""), *post.get("hashtags", []), *post.get("mentions", [])]
+
+
+def _predicate(value: Optional[str]) -> Optional[str]:
+    """Treat empty and "all" filter values as no predicate"""
+    if not value or value == "all":
+        return None
+    return value
+
+
+def _remove_position(buckets: Dict[str, array], key: str, position: int):
+    """Remove a row position from an index bucket, dropping the bucket when empty"""
+    bucket = buckets.get(key)
+    if not bucket:
+        return
+    if position in bucket:
+        bucket.remove(position)
+    if not bucket:
+        del buckets[key]
+
+
+def _decrement(counters: Dict[str, Dict[str, int]], key: str, value: str):
+    """Decrement a nested counter, dropping entries that reach zero"""
+    counts = counters.get(key)
+    if not counts or value not in counts:
+        return
+    counts[value] -= 1
+    if counts[value] <= 0:
+        del counts[value]
+    if not counts:
+        del counters[key]
+
+
+def create_data_loader() -> StorageBackend:
+    """Create the storage backend selected by the DEEPTRACE_STORAGE environment variable"""
+    backend = os.environ.get("DEEPTRACE_STORAGE", "json").lower()
+    if backend == "sqlite":
+        from utils.sqlite_store import SQLiteStore
+        return SQLiteStore(os.environ.get("DEEPTRACE_SQLITE_PATH", str(BASE_DIR / "deeptrace.db")))
+    if backend != "json":
+        raise ValueError(f"Unknown DEEPTRACE_STORAGE backend '{backend}' (expected json or sqlite)")
+    return DataLoader(os.environ.get("DEEPTRACE_SNAPSHOT") or None)
 
 
 # Global data loader instance
-data_loader = DataLoader()
+data_loader = create_data_loader()
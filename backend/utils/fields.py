@@ -0,0 +1,41 @@
+from typing import List, Dict, Any, Optional, Sequence, Type
+
+from pydantic import BaseModel
+
+# Sparse fieldsets. List and detail endpoints take a comma-separated `fields`
+# parameter naming the record fields to return; storage backends read just
+# those fields (plus any the endpoint needs to build its response) and the
+# response carries only the ones requested.
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[List[str]]:
+    """Fields named by a `fields` parameter, in the model's field order, or None for all
+
+    Raises ValueError for a field the model does not have.
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        return None
+    unknown = sorted(requested - model.model_fields.keys())
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s) {', '.join(repr(name) for name in unknown)}; "
+            f"expected any of {', '.join(model.model_fields)}"
+        )
+    return [name for name in model.model_fields if name in requested]
+
+
+def stored_fields(fields: Optional[Sequence[str]], required: Sequence[str]) -> Optional[List[str]]:
+    """Fields to read from storage: the requested ones plus those the endpoint itself uses"""
+    if fields is None:
+        return None
+    return list(dict.fromkeys([*required, *fields]))
+
+
+def project(record: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """The requested fields of a record, or the record itself when all were requested"""
+    if fields is None:
+        return record
+    return {name: record[name] for name in fields if name in record}
@@ -0,0 +1,162 @@
+import re
+from typing import List, Dict, Any, Optional, Iterator
+
+# Bit offsets set in each possible byte value, used to expand bitmaps into row positions
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+# Runs of non-zero bytes, so empty stretches of a bitmap are skipped at C speed
+_NONZERO_RUN = re.compile(rb"[^\x00]+")
+
+
+class Selection:
+    """A set of row positions produced by a bitmap query"""
+
+    def __init__(self, bits: Optional[int], size: int):
+        # bits is None when no predicate was applied, i.e. every row matches
+        self._bits = bits
+        self._size = size
+        self._bytes: Optional[bytes] = None
+
+    def _as_bytes(self) -> bytes:
+        if self._bytes is None:
+            self._bytes = self._bits.to_bytes((self._size + 7) // 8, "little")
+        return self._bytes
+
+    @property
+    def is_all(self) -> bool:
+        """Whether no predicate narrowed the selection"""
+        return self._bits is None
+
+    def count(self) -> int:
+        """Number of matching rows, computed without materializing them"""
+        if self._bits is None:
+            return self._size
+        return self._bits.bit_count()
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __contains__(self, position: int) -> bool:
+        if not 0 <= position < self._size:
+            return False
+        if self._bits is None:
+            return True
+        return bool(self._as_bytes()[position >> 3] >> (position & 7) & 1)
+
+    def positions(self, start: int = 0) -> Iterator[int]:
+        """Yield matching row positions in ascending order, from start onwards"""
+        if self._bits is None:
+            yield from range(start, self._size)
+            return
+        data = self._as_bytes()
+        for run in _NONZERO_RUN.finditer(data, start >> 3):
+            for offset, value in enumerate(run.group(), run.start()):
+                base = offset << 3
+                for bit in _BYTE_BITS[value]:
+                    if base + bit >= start:
+                        yield base + bit
+
+    def iter_rows(self, records: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the matching records in their stored order"""
+        if self._bits is None:
+            yield from records[:self._size]
+            return
+        for position in self.positions():
+            yield records[position]
+
+    def rows(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Materialize the matching records into a new list"""
+        return list(self.iter_rows(records))
+
+
+class CategoricalIndex:
+    """Bitmap index over the categorical fields of an append-only record list
+
+    Each distinct value of each indexed field owns a bitmap with one bit per row
+    position. A multi-predicate filter is the AND of the bitmaps of the requested
+    values, so it touches n/8 bytes per predicate instead of every record.
+    """
+
+    def __init__(self, fields: List[str], key: str = "id"):
+        self.fields = list(fields)
+        self.key = key
+        self._bitmaps: Dict[str, Dict[Any, bytearray]] = {field: {} for field in self.fields}
+        self._rows: Dict[Any, int] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def build(self, records: List[Dict[str, Any]]):
+        """Index a full record list from scratch"""
+        self._bitmaps = {field: {} for field in self.fields}
+        self._rows = {}
+        self._size = 0
+        for record in records:
+            self.add(record)
+
+    def _set(self, field: str, value: Any, position: int, on: bool):
+        bitmaps = self._bitmaps[field]
+        bitmap = bitmaps.get(value)
+        if bitmap is None:
+            if not on:
+                return
+            bitmap = bitmaps[value] = bytearray()
+        byte = position >> 3
+        if byte >= len(bitmap):
+            if not on:
+                return
+            bitmap.extend(bytes(byte - len(bitmap) + 1))
+        if on:
+            bitmap[byte] |= 1 << (position & 7)
+        else:
+            bitmap[byte] &= ~(1 << (position & 7)) & 0xFF
+
+    def add(self, record: Dict[str, Any]) -> int:
+        """Index a record appended to the end of the list, returning its position"""
+        position = self._size
+        self._size += 1
+        self._rows[record[self.key]] = position
+        for field in self.fields:
+            value = record.get(field)
+            if value is not None:
+                self._set(field, value, position, True)
+        return position
+
+    def update(self, record: Dict[str, Any], previous: Dict[str, Any]):
+        """Re-index a record replaced in place, given its previous field values"""
+        position = self._rows[record[self.key]]
+        for field in self.fields:
+            old, new = previous.get(field), record.get(field)
+            if old == new:
+                continue
+            if old is not None:
+                self._set(field, old, position, False)
+            if new is not None:
+                self._set(field, new, position, True)
+
+    def position_of(self, key: Any) -> Optional[int]:
+        """Get the row position of a record by its key"""
+        return self._rows.get(key)
+
+    def values(self, field: str) -> List[Any]:
+        """Distinct values seen for a field"""
+        return list(self._bitmaps[field])
+
+    def select(self, **predicates: Any) -> Selection:
+        """Select rows whose fields equal every given value (None means no predicate)"""
+        bits: Optional[int] = None
+        for field, value in predicates.items():
+            if value is None:
+                continue
+            bitmap = self._bitmaps[field].get(value)
+            if bitmap is None:
+                return Selection(0, self._size)
+            value_bits = int.from_bytes(bitmap, "little")
+            bits = value_bits if bits is None else bits & value_bits
+            if not bits:
+                return Selection(0, self._size)
+        return Selection(bits, self._size)
+
+    def count(self, **predicates: Any) -> int:
+        """Count rows matching the predicates without materializing them"""
+        return self.select(**predicates).count()
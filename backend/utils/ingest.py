@@ -0,0 +1,85 @@
+from typing import List, Dict, Any, AsyncIterator, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Bulk NDJSON ingestion. The request body is split into lines as it streams in
+# and handed on in batches, so memory holds one batch plus one partial line
+# however large the upload is. Each batch is validated by pydantic-core in a
+# single pass over the batch as one JSON array.
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10_000
+# Longest accepted line; a body that goes this long without a newline is rejected
+MAX_LINE_BYTES = 1 << 20
+# Rejected lines reported back per request
+MAX_REPORTED_ERRORS = 100
+
+# (line number, raw line) of one NDJSON record
+Line = Tuple[int, bytes]
+
+
+class LineTooLong(ValueError):
+    """An NDJSON line exceeded MAX_LINE_BYTES"""
+
+
+async def ndjson_batches(chunks: AsyncIterator[bytes], batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[List[Line]]:
+    """Group the non-blank lines of a streamed NDJSON body into batches of numbered lines"""
+    batch: List[Line] = []
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        if len(buffer) > MAX_LINE_BYTES:
+            raise LineTooLong(f"Line {number + len(lines) + 1} is longer than {MAX_LINE_BYTES} bytes")
+        for line in lines:
+            number += 1
+            if line.strip():
+                batch.append((number, line))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+    if buffer.strip():
+        batch.append((number + 1, buffer))
+    if batch:
+        yield batch
+
+
+def _describe(error: ValidationError) -> str:
+    """One-line summary of a validation error"""
+    messages = []
+    for detail in error.errors():
+        location = ".".join(str(part) for part in detail["loc"])
+        messages.append(f"{location}: {detail['msg']}" if location else detail["msg"])
+    return "; ".join(messages)
+
+
+class BatchValidator:
+    """Validates batches of NDJSON lines against a schema into plain JSON-ready dicts"""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self._adapter = TypeAdapter(List[model])
+
+    def validate(self, batch: List[Line]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Valid records of a batch, and an error entry for every rejected line
+
+        The whole batch is parsed and validated in one call; only a batch that
+        fails is revisited line by line to tell the good lines from the bad.
+        """
+        try:
+            items = self._adapter.validate_json(b"[" + b",".join(line for _, line in batch) + b"]")
+            # A line holding several comma-separated objects would still parse
+            if len(items) == len(batch):
+                return self._adapter.dump_python(items, mode="json"), []
+        except ValidationError:
+            pass
+
+        items, errors = [], []
+        for number, line in batch:
+            try:
+                items.append(self.model.model_validate_json(line))
+            except ValidationError as e:
+                errors.append({"line": number, "error": _describe(e)})
+        return self._adapter.dump_python(items, mode="json"), errors
@@ -0,0 +1,213 @@
+import asyncio
+import multiprocessing
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Awaitable, Callable, Iterable, Optional
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = {COMPLETED, FAILED, CANCELLED}
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the pending queue is full"""
+
+
+class Job:
+    """State of one background job, observable while it runs"""
+
+    def __init__(self, job_id: str, params: Dict[str, Any]):
+        self.id = job_id
+        self.params = params
+        self.status = QUEUED
+        self.stage = "queued"
+        self.progress = 0.0
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.completed_at: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # Bumped on every state change so observers can tell what they have seen
+        self.version = 0
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def _update(self, **fields: Any):
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.version += 1
+        # Wake everyone waiting on the current event and start a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def report(self, progress: float, stage: Optional[str] = None):
+        """Record progress (0-1) and optionally the stage now running"""
+        self._update(progress=round(min(max(progress, 0.0), 1.0), 4), stage=stage or self.stage)
+
+    async def wait_for_change(self, version: int, timeout: Optional[float] = None) -> bool:
+        """Wait until the job's state moves past version; False if the timeout passed first"""
+        if self.version != version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "params": self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "error": self.error
+        }
+        if include_result:
+            data["results"] = self.result
+        return data
+
+
+class JobManager:
+    """Runs jobs in the background with bounded concurrency and a bounded queue
+
+    Each job is a coroutine run on the event loop that coordinates its work and
+    hands CPU-heavy steps to a shared process pool through ``run``/``map``, so
+    the loop stays free to serve requests. At most ``max_running`` jobs run at
+    once, at most ``max_pending`` wait behind them, and further submissions are
+    rejected with QueueFullError. The newest ``keep_finished`` finished jobs are
+    kept for status queries.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Job, "JobManager"], Awaitable[Dict[str, Any]]],
+        max_workers: Optional[int] = None,
+        max_running: int = 2,
+        max_pending: int = 16,
+        keep_finished: int = 100,
+        prefix: str = "job"
+    ):
+        self.runner = runner
+        # Leave a core for the API process
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.max_running = max_running
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self.prefix = prefix
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers import only the worker functions, never the API's data
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def active_count(self) -> int:
+        """Jobs queued or running"""
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def submit(self, params: Dict[str, Any]) -> Job:
+        """Queue a job and start it as soon as a slot frees up"""
+        active = self.active_count()
+        if active >= self.max_running + self.max_pending:
+            raise QueueFullError(f"{active} jobs are already queued or running; try again later")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_running)
+        job = Job(f"{self.prefix}_{uuid.uuid4().hex[:12]}", params)
+        self._jobs[job.id] = job
+        job._task = asyncio.get_running_loop().create_task(self._execute(job))
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job; finished jobs are left as they are"""
+        job = self._jobs.get(job_id)
+        if job is not None and not job.finished and job._task is not None:
+            job._task.cancel()
+        return job
+
+    async def _execute(self, job: Job):
+        try:
+            async with self._slots:
+                job._update(status=RUNNING, stage="starting", started_at=_now())
+                result = await self.runner(job, self)
+            job._update(status=COMPLETED, stage="done", progress=1.0, result=result, completed_at=_now())
+        except asyncio.CancelledError:
+            job._update(status=CANCELLED, stage="cancelled", completed_at=_now())
+        except Exception as e:
+            job._update(status=FAILED, stage="failed", error=f"{type(e).__name__}: {e}", completed_at=_now())
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Run a picklable function in the process pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+
+    async def map(
+        self,
+        fn: Callable,
+        items: Iterable[Any],
+        on_result: Callable[[Any], None],
+        max_in_flight: Optional[int] = None
+    ):
+        """Run fn over items in the process pool, handing each result to on_result as it arrives
+
+        At most ``max_in_flight`` items (default twice the worker count) are
+        submitted at once, so large inputs are not all pickled up front and
+        concurrent jobs share the pool fairly.
+        """
+        limit = max_in_flight or self.max_workers * 2
+        loop = asyncio.get_running_loop()
+        in_flight = set()
+        try:
+            for item in items:
+                if len(in_flight) >= limit:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        on_result(future.result())
+                in_flight.add(loop.run_in_executor(self._pool(), fn, item))
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    on_result(future.result())
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def shutdown(self):
+        """Cancel unfinished jobs and stop the worker processes"""
+        for job in self._jobs.values():
+            if not job.finished and job._task is not None:
+                job._task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,131 @@
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import Response, StreamingResponse
+
+from utils.fields import project
+from utils.metrics import span
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is used without it
+    orjson = None
+
+# Response bodies encoded straight to bytes. Routers pass their data dict to
+# json_response(), which writes the StandardResponse envelope itself rather
+# than having FastAPI validate the model and walk every record through
+# jsonable_encoder. Records on list pages are encoded once per data version
+# and spliced into the body as ready-made fragments.
+
+DEFAULT_MAX_FRAGMENTS = 10_000
+# Records encoded into each chunk of a streamed NDJSON body
+NDJSON_BATCH_SIZE = 500
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        value, default=jsonable_encoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class Fragment:
+    """An encoded JSON value, spliced into a response body as is"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: bytes):
+        self.value = value
+
+
+class FragmentCache:
+    """Encoded records by field set and ID, valid until the storage data version changes
+
+    ``prepare(record, fields)`` turns a stored record into the one the
+    endpoint returns, so only data the storage backend owns may go into it.
+    Records must carry their ID even when ``fields`` leaves it out.
+    """
+
+    def __init__(
+        self,
+        data_version: Callable[[], int],
+        prepare: Optional[Callable[[Dict[str, Any], Optional[Sequence[str]]], Dict[str, Any]]] = None,
+        max_entries: int = DEFAULT_MAX_FRAGMENTS
+    ):
+        self.data_version = data_version
+        self.prepare = prepare
+        self.max_entries = max_entries
+        self._version: Optional[int] = None
+        self._fragments: Dict[Tuple[Optional[Tuple[str, ...]], str], Fragment] = {}
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def encode(self, records: Iterable[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> List[Fragment]:
+        """Fragments for records holding just fields, encoding only those not seen since the last write"""
+        version = self.data_version()
+        if version != self._version:
+            self._fragments = {}
+            self._version = version
+        field_set = None if fields is None else tuple(fields)
+        fragments = []
+        with span("enrich") as s:
+            for record in records:
+                key = (field_set, record["id"])
+                fragment = self._fragments.get(key)
+                if fragment is None:
+                    value = self.prepare(record, fields) if self.prepare else record
+                    fragment = Fragment(dumps(project(value, fields)))
+                    if len(self._fragments) >= self.max_entries:
+                        del self._fragments[next(iter(self._fragments))]
+                    self._fragments[key] = fragment
+                fragments.append(fragment)
+            s.rows = len(fragments)
+        return fragments
+
+
+def _encode_data(data: Dict[str, Any]) -> bytes:
+    """Encode a response's data dict, splicing in fragments and lists of fragments"""
+    members = []
+    for key, value in data.items():
+        if isinstance(value, Fragment):
+            encoded = value.value
+        elif isinstance(value, list) and value and isinstance(value[0], Fragment):
+            encoded = b"[" + b",".join(fragment.value for fragment in value) + b"]"
+        else:
+            encoded = dumps(value)
+        members.append(dumps(key) + b":" + encoded)
+    return b"{" + b",".join(members) + b"}"
+
+
+def json_response(data: Dict[str, Any], status_code: int = 200) -> Response:
+    """A successful StandardResponse with data, encoded without re-validating it"""
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    with span("serialize"):
+        body = b'{"success":true,"data":' + _encode_data(data) + b',"timestamp":' + dumps(timestamp) + b"}"
+    return Response(body, status_code=status_code, media_type="application/json")
+
+
+def _ndjson_chunks(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """One JSON line per record, in chunks of NDJSON_BATCH_SIZE lines"""
+    lines = []
+    for record in records:
+        lines.append(dumps(record))
+        if len(lines) >= NDJSON_BATCH_SIZE:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def ndjson_response(records: Iterable[Dict[str, Any]], filename: str) -> StreamingResponse:
+    """Stream records as newline-delimited JSON while they are read, without an envelope"""
+    return StreamingResponse(
+        _ndjson_chunks(records),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,93 @@
+import re
+import json
+import codecs
+from pathlib import Path
+from typing import Dict, Any, Iterator, Tuple
+
+# Whitespace and the commas separating array elements
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+class RecordStream:
+    """Iterates records from a JSON array or NDJSON file without loading it whole
+
+    The format is detected from the first non-whitespace character: ``[`` starts
+    a JSON array, anything else is read as one JSON object per line. Only one
+    chunk of the file plus the record being decoded is held in memory, and
+    ``bytes_read`` / ``records`` can be polled for progress while iterating.
+    """
+
+    def __init__(self, path: Path, chunk_size: int = 1 << 20):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self.records = 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.bytes_read = 0
+        self.records = 0
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        with open(self.path, "rb") as f:
+
+            def read() -> Tuple[str, bool]:
+                chunk = f.read(self.chunk_size)
+                self.bytes_read += len(chunk)
+                return decoder.decode(chunk, final=not chunk), not chunk
+
+            buffer, eof = read()
+            while not buffer.strip() and not eof:
+                more, eof = read()
+                buffer += more
+            buffer = buffer.lstrip()
+            if not buffer:
+                return
+            if buffer[0] == "[":
+                records = self._iter_array(buffer[1:], eof, read)
+            else:
+                records = self._iter_lines(buffer, eof, read)
+            for record in records:
+                if not isinstance(record, dict):
+                    raise ValueError(f"Expected a JSON object, got {type(record).__name__}")
+                self.records += 1
+                yield record
+
+    def _iter_array(self, buffer: str, eof: bool, read) -> Iterator[Any]:
+        decoder = json.JSONDecoder()
+        pos = 0
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError("Unexpected end of file inside JSON array")
+                more, eof = read()
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Most likely the record straddles the chunk boundary
+                if eof:
+                    raise
+                more, eof = read()
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield record
+            pos = end
+            if pos > self.chunk_size:
+                buffer, pos = buffer[pos:], 0
+
+    def _iter_lines(self, buffer: str, eof: bool, read) -> Iterator[Any]:
+        while True:
+            lines = buffer.split("\n")
+            buffer = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+            if eof:
+                break
+            more, eof = read()
+            buffer += more
+        if buffer.strip():
+            yield json.loads(buffer)
@@ -0,0 +1,263 @@
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import List, Dict, Any, Callable, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+# Per-request timing. Routers and storage backends wrap their stages in
+# span("name"); while TimingMiddleware is serving a request the spans are
+# recorded against it, reported in a Server-Timing header and folded into
+# Prometheus histograms per route. Outside a timed request span() returns a
+# shared no-op, so instrumented code costs one context variable lookup when
+# metrics are disabled.
+
+# Histogram bucket upper bounds, in seconds
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class RequestTimings:
+    """Stage durations and row counts recorded while serving one request"""
+
+    __slots__ = ("stages",)
+
+    def __init__(self):
+        # stage -> [seconds, rows]; repeated stages accumulate
+        self.stages: Dict[str, List[Any]] = {}
+
+    def add(self, stage: str, seconds: float, rows: Optional[int]):
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [seconds, rows]
+            return
+        entry[0] += seconds
+        if rows is not None:
+            entry[1] = rows if entry[1] is None else entry[1] + rows
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("deeptrace_request_timings", default=None)
+
+
+class _Span:
+    """A timed stage; set ``rows`` to report how many rows it produced"""
+
+    __slots__ = ("timings", "stage", "rows", "start")
+
+    def __init__(self, timings: RequestTimings, stage: str):
+        self.timings = timings
+        self.stage = stage
+        self.rows: Optional[int] = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.stage, time.perf_counter() - self.start, self.rows)
+        return False
+
+
+class _NullSpan:
+    """The span used outside timed requests; records nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __bool__(self) -> bool:
+        return False
+
+    @property
+    def rows(self) -> None:
+        return None
+
+    @rows.setter
+    def rows(self, value: Optional[int]):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(stage: str):
+    """Context manager timing a stage of the current request, if it is being timed
+
+    The span is falsy when nothing is recorded, so counting rows that are
+    not already at hand can be skipped with ``if s: s.rows = ...``.
+    """
+    timings = _current.get()
+    if timings is None:
+        return _NULL_SPAN
+    return _Span(timings, stage)
+
+
+class Histogram:
+    """Prometheus histogram with one series per label set"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            base = _labels(self.label_names, labels)
+            cumulative = 0
+            for bound, bucket_count in zip([*map(_number, self.buckets), "+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{{{base}{',' if base else ''}le=\"{bound}\"}} {cumulative}")
+            lines.append(f"{self.name}_sum{{{base}}} {_number(total)}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+class Counter:
+    """Prometheus counter with one series per label set"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1):
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{{{_labels(self.label_names, labels)}}} {_number(value)}")
+        return lines
+
+
+class Metrics:
+    """Request and stage metrics, plus gauges and counters read from elsewhere when rendered"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.request_duration = Histogram(
+            "deeptrace_http_request_duration_seconds",
+            "Time to serve a request, by route template",
+            ["method", "route", "status"],
+            REQUEST_BUCKETS
+        )
+        self.stage_duration = Histogram(
+            "deeptrace_stage_duration_seconds",
+            "Time spent in an instrumented stage of a request",
+            ["route", "stage"],
+            STAGE_BUCKETS
+        )
+        self.stage_rows = Counter(
+            "deeptrace_stage_rows_total",
+            "Rows produced by instrumented stages",
+            ["route", "stage"]
+        )
+        # name -> (type, help, read function returning a number)
+        self._readings: Dict[str, Tuple[str, str, Callable[[], float]]] = {}
+
+    def add_reading(self, name: str, metric_type: str, help_text: str, read: Callable[[], float]):
+        """Report a value owned by another component, read when metrics are rendered"""
+        self._readings[name] = (metric_type, help_text, read)
+
+    def record(self, method: str, route: str, status: int, seconds: float, timings: RequestTimings):
+        self.request_duration.observe((method, route, str(status)), seconds)
+        for stage, (stage_seconds, rows) in timings.stages.items():
+            self.stage_duration.observe((route, stage), stage_seconds)
+            if rows is not None:
+                self.stage_rows.inc((route, stage), rows)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = [*self.request_duration.render(), *self.stage_duration.render(), *self.stage_rows.render()]
+        for name, (metric_type, help_text, read) in self._readings.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}", f"{name} {_number(read())}"]
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+
+def server_timing(timings: RequestTimings, total_seconds: float) -> str:
+    """A Server-Timing header value listing each stage and the total so far, in milliseconds"""
+    entries = []
+    for stage, (seconds, rows) in timings.stages.items():
+        entry = f"{stage};dur={seconds * 1000:.3f}"
+        if rows is not None:
+            entry += f';desc="rows={rows}"'
+        entries.append(entry)
+    entries.append(f"total;dur={total_seconds * 1000:.3f}")
+    return ", ".join(entries)
+
+
+class TimingMiddleware:
+    """ASGI middleware timing each HTTP request and the spans recorded while serving it
+
+    Adds a Server-Timing header to every response and records the request in
+    ``metrics`` under its route template (e.g. ``/api/campaigns/{campaign_id}``),
+    so IDs in paths do not create a series each.
+    """
+
+    def __init__(self, app, metrics: Metrics, routes: Sequence[Any]):
+        self.app = app
+        self.metrics = metrics
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing(timings, time.perf_counter() - start)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self.metrics.record(scope["method"], self._route(scope), status, time.perf_counter() - start, timings)
+
+    def _route(self, scope) -> str:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                return getattr(route, "path", scope["path"])
+        return "unmatched"
+
+
+def create_metrics() -> Metrics:
+    """Create the metrics registry, enabled by DEEPTRACE_METRICS=1"""
+    return Metrics(enabled=os.environ.get("DEEPTRACE_METRICS", "").lower() in ("1", "true", "yes", "on"))
@@ -0,0 +1,132 @@
+from typing import List, Dict, Any, Sequence, Tuple
+
+import numpy as np
+
+from utils.arrays import sorted_unique
+from utils.minhash import connected_components
+from utils.timing import parse_epochs, INVALID_EPOCH
+
+# Account co-activity graphs. Two accounts are linked once for every piece of
+# content, hashtag, mention or posting time window they share, so edges are
+# built from an inverted index of those features and only accounts that
+# actually share something are ever paired.
+
+# Post fields a co-activity graph is built from
+CO_ACTIVITY_FIELDS = ["account_id", "content_hash", "hashtags", "mentions", "posted_at"]
+# Posts in the same window of this many seconds count as co-activity
+CO_ACTIVITY_WINDOW_SECONDS = 300
+# Features shared by more accounts than this (e.g. a trending hashtag) are too
+# common to signal coordination and would add a quadratic number of edges
+MAX_FEATURE_ACCOUNTS = 1000
+
+
+class CoActivityGraph:
+    """Weighted undirected account graph stored as parallel edge arrays"""
+
+    def __init__(self, account_ids: List[str], sources: np.ndarray, targets: np.ndarray, weights: np.ndarray):
+        self.account_ids = account_ids
+        self.sources = sources
+        self.targets = targets
+        self.weights = weights
+        n = len(account_ids)
+        ends = np.concatenate((sources, targets))
+        self.degree = np.bincount(ends, minlength=n)
+        self.weighted_degree = np.bincount(ends, weights=np.concatenate((weights, weights)), minlength=n).astype(np.int64)
+
+    def density(self) -> float:
+        """Edges present as a fraction of all possible account pairs"""
+        n = len(self.account_ids)
+        return 2 * len(self.weights) / (n * (n - 1)) if n > 1 else 0.0
+
+    def metrics(self) -> Dict[str, Any]:
+        n = len(self.account_ids)
+        labels = connected_components(n, self.sources, self.targets)
+        component_sizes = np.bincount(labels, minlength=n) if n else labels
+        density = self.density()
+        return {
+            "accounts": n,
+            "edges": len(self.weights),
+            "total_weight": int(self.weights.sum()),
+            "density": round(density, 4),
+            "average_degree": round(float(self.degree.mean()), 2) if n else 0,
+            "average_weighted_degree": round(float(self.weighted_degree.mean()), 2) if n else 0,
+            "max_degree": int(self.degree.max()) if n else 0,
+            "isolated_accounts": int((self.degree == 0).sum()),
+            "largest_component": int(component_sizes.max()) if n else 0,
+            "network_density_score": round(100 * density, 1)
+        }
+
+    def top_nodes(self, limit: int) -> np.ndarray:
+        """Node indices of the limit accounts with the highest weighted degree"""
+        ids = np.array(self.account_ids, dtype=object)
+        order = np.lexsort((ids, -self.degree, -self.weighted_degree)) if len(ids) else np.empty(0, dtype=np.int64)
+        return order[:limit]
+
+    def subgraph_edges(self, nodes: np.ndarray, limit: int) -> List[Tuple[str, str, int]]:
+        """The heaviest edges between the given nodes as (source id, target id, weight)"""
+        keep = np.zeros(len(self.account_ids), dtype=bool)
+        keep[nodes] = True
+        inside = np.flatnonzero(keep[self.sources] & keep[self.targets])
+        inside = inside[np.argsort(-self.weights[inside], kind="stable")[:limit]]
+        return [
+            (self.account_ids[self.sources[i]], self.account_ids[self.targets[i]], int(self.weights[i]))
+            for i in inside
+        ]
+
+
+def _pairs_within_groups(members: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Every (i, j) pair of members with i before j inside the same group"""
+    rank = np.arange(len(members)) - np.repeat(starts, sizes)
+    following = np.repeat(sizes, sizes) - rank - 1
+    first = np.repeat(np.arange(len(members)), following)
+    offset = np.arange(following.sum()) - np.repeat(np.cumsum(following) - following, following)
+    return members[first], members[first + offset + 1]
+
+
+def co_activity_graph(
+    columns: Dict[str, Sequence[Any]],
+    window: int = CO_ACTIVITY_WINDOW_SECONDS,
+    max_feature_accounts: int = MAX_FEATURE_ACCOUNTS
+) -> CoActivityGraph:
+    """Build the co-activity graph of the accounts behind posts, given as parallel CO_ACTIVITY_FIELDS columns"""
+    account_codes: Dict[str, int] = {}
+    feature_codes: Dict[Tuple[str, Any], int] = {}
+    feature_of: List[int] = []
+    account_of: List[int] = []
+
+    def add(feature: Tuple[str, Any], account: int):
+        feature_of.append(feature_codes.setdefault(feature, len(feature_codes)))
+        account_of.append(account)
+
+    epochs = parse_epochs([posted_at or "" for posted_at in columns["posted_at"]])
+    for account_id, content_hash, hashtags, mentions, epoch in zip(
+        columns["account_id"], columns["content_hash"], columns["hashtags"], columns["mentions"], epochs.tolist()
+    ):
+        account = account_codes.setdefault(account_id, len(account_codes))
+        if content_hash:
+            add(("content", content_hash), account)
+        for tag in hashtags or ():
+            add(("hashtag", tag.lower()), account)
+        for mention in mentions or ():
+            add(("mention", mention.lower()), account)
+        if epoch != INVALID_EPOCH:
+            add(("window", epoch // window), account)
+
+    n = len(account_codes)
+    empty = np.empty(0, dtype=np.int64)
+    if not feature_of:
+        return CoActivityGraph(list(account_codes), empty, empty, empty)
+
+    # Each account counts once per feature; keys sort by feature, then account
+    keys = sorted_unique(np.array(feature_of, dtype=np.int64) * n + np.array(account_of, dtype=np.int64))
+    features, members = keys // n, keys % n
+    starts = np.flatnonzero(np.concatenate(([True], features[1:] != features[:-1])))
+    sizes = np.diff(np.concatenate((starts, [len(keys)])))
+    shared = (sizes > 1) & (sizes <= max_feature_accounts)
+    keep = np.repeat(shared, sizes)
+    members, sizes = members[keep], sizes[shared]
+    sources, targets = _pairs_within_groups(members, np.cumsum(sizes) - sizes, sizes)
+
+    # Accumulate one unit of weight per shared feature, sparsely by edge key
+    edges, weights = np.unique(sources * n + targets, return_counts=True)
+    return CoActivityGraph(list(account_codes), edges // n, edges % n, weights.astype(np.int64))
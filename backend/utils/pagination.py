@@ -0,0 +1,27 @@
+import base64
+import json
+from typing import Any, Tuple
+
+
+def encode_cursor(sort_by: str, value: Any, key: str) -> str:
+    """Encode the last row of a page as an opaque keyset cursor"""
+    payload = json.dumps([sort_by, value, key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str) -> Tuple[Any, str]:
+    """Decode a cursor into its (sort value, record key) pair
+
+    Raises ValueError if the cursor is malformed or was issued for a different
+    sort order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Malformed cursor: {e}")
+    if cursor_sort != sort_by:
+        raise ValueError(f"Cursor was issued for sort '{cursor_sort}', not '{sort_by}'")
+    if not isinstance(key, str):
+        raise ValueError("Malformed cursor: key must be a string")
+    return value, key
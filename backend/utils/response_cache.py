@@ -0,0 +1,196 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Callable, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.datastructures import Headers
+
+from utils.metrics import span
+
+# Cache of rendered GET responses. Entries are tagged with the storage data
+# version they were rendered at and are only served while it is unchanged, so
+# any write invalidates every entry at once without tracking what it touched.
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 << 20
+DEFAULT_TTL_SECONDS = 300
+
+# Response headers never stored with an entry; they are set per response
+_UNCACHED_HEADERS = {b"content-length", b"etag", b"cache-control"}
+
+
+class CachedResponse:
+    """A rendered 200 response: headers, body and strong ETag"""
+
+    __slots__ = ("headers", "body", "etag", "version", "expires_at")
+
+    def __init__(self, headers: List[Tuple[bytes, bytes]], body: bytes, version: int, expires_at: float):
+        self.headers = headers
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.version = version
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """LRU cache of rendered responses, bounded by entry count, total body size and age"""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, version: int) -> Optional[CachedResponse]:
+        """The entry for key if it was rendered at this data version and has not expired"""
+        entry = self._entries.get(key)
+        if entry is not None and (entry.version != version or entry.expires_at <= time.monotonic()):
+            self._discard(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, version: int, headers: List[Tuple[bytes, bytes]], body: bytes) -> CachedResponse:
+        """Store a rendered response, evicting least recently used entries to stay within bounds"""
+        entry = CachedResponse(headers, body, version, time.monotonic() + self.ttl_seconds)
+        self._discard(key)
+        if len(body) > self.max_bytes:
+            return entry
+        self._entries[key] = entry
+        self._bytes += len(body)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.body)
+
+
+def cache_key(path: str, query_string: bytes) -> str:
+    """Route plus query parameters in a canonical order, without empty values"""
+    params = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=False))
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names etag, compared weakly as RFC 9110 requires"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware serving GET requests under the given path prefixes from a ResponseCache
+
+    Successful JSON responses are cached and sent with an ETag and
+    ``Cache-Control: no-cache``, so clients revalidate every poll and get an
+    empty 304 while the data is unchanged. Other responses pass through.
+    """
+
+    def __init__(self, app, cache: ResponseCache, prefixes: Sequence[str], data_version: Callable[[], int]):
+        self.app = app
+        self.cache = cache
+        self.prefixes = tuple(prefixes)
+        self.data_version = data_version
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(self.prefixes)
+            or not self.cache.enabled
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope["path"], scope["query_string"])
+        version = self.data_version()
+        with span("cache"):
+            entry = self.cache.get(key, version)
+        if entry is None:
+            entry = await self._render(scope, receive, send, key, version)
+            if entry is None:
+                return
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        await _send_entry(entry, send, not_modified=etag_matches(if_none_match, entry.etag))
+
+    async def _render(self, scope, receive, send, key: str, version: int) -> Optional[CachedResponse]:
+        """Run the app and cache its response, or pass it straight through if it is not cacheable"""
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def capture(message):
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                content_type = Headers(raw=message["headers"]).get("content-type", "")
+                if message["status"] != 200 or not content_type.startswith("application/json"):
+                    passthrough = True
+                    await send(message)
+                    return
+                start.update(message)
+            elif passthrough:
+                await send(message)
+            else:
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        if passthrough:
+            return None
+        headers = [(name, value) for name, value in start["headers"] if name.lower() not in _UNCACHED_HEADERS]
+        return self.cache.put(key, version, headers, b"".join(chunks))
+
+
+async def _send_entry(entry: CachedResponse, send, not_modified: bool):
+    headers = [
+        (b"etag", entry.etag.encode("latin-1")),
+        (b"cache-control", b"no-cache")
+    ]
+    if not_modified:
+        await send({"type": "http.response.start", "status": 304, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    headers = entry.headers + headers + [(b"content-length", str(len(entry.body)).encode("latin-1"))]
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+    await send({"type": "http.response.body", "body": entry.body})
+
+
+def create_response_cache() -> ResponseCache:
+    """Create a response cache sized by the DEEPTRACE_CACHE_* environment variables"""
+    return ResponseCache(
+        max_entries=int(os.environ.get("DEEPTRACE_CACHE_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        max_bytes=int(float(os.environ.get("DEEPTRACE_CACHE_MB", DEFAULT_MAX_BYTES >> 20)) * (1 << 20)),
+        ttl_seconds=float(os.environ.get("DEEPTRACE_CACHE_TTL", DEFAULT_TTL_SECONDS))
+    )
@@ -0,0 +1,126 @@
+import re
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+# Time-bucketed counts behind the trend charts. Timestamps are ISO-8601 UTC
+# strings, so a bucket key is simply a prefix: "2026-02-04T11" for the hour
+# and "2026-02-04" for the day. Counters are adjusted as records are written,
+# and chart series are read from them rather than from the records.
+
+HOUR = "hour"
+DAY = "day"
+RESOLUTIONS = {HOUR: 13, DAY: 10}  # resolution -> bucket key length
+_KEY_FORMATS = {HOUR: "%Y-%m-%dT%H", DAY: "%Y-%m-%d"}
+_STEPS = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+# Timestamps counted; anything else has no bucket
+_TIMESTAMP = re.compile(r"\d{4}-[01]\d-[0-3]\dT[0-2]\d")
+# The same test as an SQLite GLOB pattern
+TIMESTAMP_GLOB = "[0-9][0-9][0-9][0-9]-[01][0-9]-[0-3][0-9]T[0-2][0-9]*"
+
+# Charted periods: resolution and bucket count, ending at the latest bucket
+# in the data. "all" covers the whole span of the charted series.
+PERIODS = {"24h": (HOUR, 24), "7d": (DAY, 7), "30d": (DAY, 30), "all": None}
+# "all" is charted by the hour when its series spans at most this many hours
+MAX_HOURLY_SPAN = 7 * 24
+
+# Metrics: new posts (by posted_at), campaigns (by detected_at) and accounts
+# (by first_seen), and campaigns per threat level (by detected_at). Posts are
+# also counted per campaign, with the campaign ID as scope.
+POSTS = "posts"
+CAMPAIGNS = "campaigns"
+ACCOUNTS = "accounts"
+# Metrics that move the data clock; threat levels share campaign timestamps
+CLOCK_METRICS = [POSTS, CAMPAIGNS, ACCOUNTS]
+
+
+def threat_metric(level: Optional[str]) -> str:
+    """Metric counting campaigns detected at a threat level"""
+    return f"threat_level:{level or ''}"
+
+
+def bucket_key(timestamp: Any, resolution: str) -> Optional[str]:
+    """Bucket of an ISO-8601 timestamp, or None if it is missing or malformed"""
+    if not isinstance(timestamp, str) or not _TIMESTAMP.match(timestamp):
+        return None
+    return timestamp[:RESOLUTIONS[resolution]]
+
+
+def _parse_key(key: str, resolution: str) -> datetime:
+    return datetime.strptime(key, _KEY_FORMATS[resolution])
+
+
+def _keys(first: datetime, count: int, resolution: str) -> List[str]:
+    step = _STEPS[resolution]
+    return [(first + i * step).strftime(_KEY_FORMATS[resolution]) for i in range(count)]
+
+
+def series_window(period: str, clock: Optional[str], span: Optional[Tuple[str, str]]) -> Tuple[str, List[str]]:
+    """Resolution and bucket keys charted for a period
+
+    ``clock`` is the latest hour bucket in the data and ``span`` the first and
+    last hour buckets of the series being charted. Raises ValueError for an
+    unknown period.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Invalid period '{period}'; expected one of {', '.join(PERIODS)}")
+    window = PERIODS[period]
+    if window is None:
+        if span is None:
+            return DAY, []
+        first, last = (_parse_key(key, HOUR) for key in span)
+        hours = int((last - first) / _STEPS[HOUR]) + 1
+        if hours <= MAX_HOURLY_SPAN:
+            return HOUR, _keys(first, hours, HOUR)
+        first, last = (_parse_key(key[:RESOLUTIONS[DAY]], DAY) for key in span)
+        return DAY, _keys(first, (last - first).days + 1, DAY)
+    if clock is None:
+        return window[0], []
+    resolution, count = window
+    last = _parse_key(clock[:RESOLUTIONS[resolution]], resolution)
+    return resolution, _keys(last - (count - 1) * _STEPS[resolution], count, resolution)
+
+
+def series_rows(resolution: str, keys: List[str], counts: Dict[str, Dict[str, int]]) -> List[Dict[str, Any]]:
+    """One row per bucket: its "date" label and the count of every metric, zero-filled"""
+    rows = []
+    for key in keys:
+        row = {"date": f"{key}:00:00Z" if resolution == HOUR else key}
+        for metric, buckets in counts.items():
+            row[metric] = buckets.get(key, 0)
+        rows.append(row)
+    return rows
+
+
+class TimeRollups:
+    """Hourly and daily counters per (metric, scope), adjusted record by record"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Dict[Tuple[str, Optional[str]], Dict[str, int]]] = {
+            resolution: {} for resolution in RESOLUTIONS
+        }
+        # Latest hour bucket ever counted
+        self.clock: Optional[str] = None
+
+    def count(self, metric: str, timestamp: Any, scope: Optional[str] = None, delta: int = 1):
+        """Add delta to the hour and day buckets of a timestamp"""
+        key = bucket_key(timestamp, HOUR)
+        if key is None:
+            return
+        for resolution, length in RESOLUTIONS.items():
+            buckets = self._buckets[resolution].setdefault((metric, scope), {})
+            bucket = key[:length]
+            value = buckets.get(bucket, 0) + delta
+            if value:
+                buckets[bucket] = value
+            else:
+                del buckets[bucket]
+        if delta > 0 and metric in CLOCK_METRICS and (self.clock is None or key > self.clock):
+            self.clock = key
+
+    def buckets(self, metric: str, resolution: str, scope: Optional[str] = None) -> Dict[str, int]:
+        return self._buckets[resolution].get((metric, scope), {})
+
+    def span(self, metrics: Sequence[str], scope: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """First and last hour buckets holding any of the metrics"""
+        keys = [key for metric in metrics for key in self.buckets(metric, HOUR, scope)]
+        return (min(keys), max(keys)) if keys else None
@@ -0,0 +1,143 @@
+import os
+import mmap
+import pickle
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Tuple, Union
+
+# File layout: header, 8-byte aligned sections, then a pickled section directory.
+# The CRC32 covers everything after the header.
+MAGIC = b"DTSNAP\r\n"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQ")  # magic, version, crc32, directory offset, directory length
+_ALIGN = 8
+
+# Section kinds
+_RAW = "raw"
+_PICKLE = "pickle"
+
+
+class SnapshotError(Exception):
+    """A snapshot file that cannot be used: wrong format, version, checksum or contents"""
+
+
+class SnapshotWriter:
+    """Writes named sections to a snapshot file, replacing it atomically on close
+
+    Raw sections hold the bytes of typed arrays so readers can map them without
+    copying; object sections are pickled.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(bytes(_HEADER.size))
+        self._offset = _HEADER.size
+        self._crc = 0
+        self._directory: Dict[str, Tuple[str, str, int, int]] = {}
+
+    def _write(self, data) -> None:
+        data = memoryview(data).cast("B")
+        self._file.write(data)
+        self._crc = zlib.crc32(data, self._crc)
+        self._offset += len(data)
+
+    def _begin(self, name: str):
+        if name in self._directory:
+            raise ValueError(f"Duplicate snapshot section '{name}'")
+        padding = -self._offset % _ALIGN
+        if padding:
+            self._write(bytes(padding))
+
+    def add_array(self, name: str, data, typecode: str):
+        """Add a typed array (or any buffer of that item type) as a raw section"""
+        self._begin(name)
+        start = self._offset
+        self._write(data)
+        self._directory[name] = (_RAW, typecode, start, self._offset - start)
+
+    def add_object(self, name: str, obj: Any):
+        """Add a picklable object as a section"""
+        self._begin(name)
+        start = self._offset
+        self._write(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+        self._directory[name] = (_PICKLE, "", start, self._offset - start)
+
+    def close(self):
+        """Write the directory and header, then move the file into place"""
+        directory = pickle.dumps(self._directory, protocol=pickle.HIGHEST_PROTOCOL)
+        directory_offset = self._offset
+        self._write(directory)
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, self._crc, directory_offset, len(directory)))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard a partially written snapshot"""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class Snapshot:
+    """A read-only, memory-mapped snapshot file
+
+    Raw sections are returned as memoryviews straight onto the mapping, so every
+    process that opens the same file shares those pages through the OS page
+    cache. The mapping stays open for as long as any view onto it is alive.
+    Object sections are unpickled: only open snapshots this application wrote.
+    """
+
+    def __init__(self, path: Union[str, Path], verify: bool = True):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SnapshotError("Snapshot file is empty")
+        self._view = memoryview(self._map)
+        if len(self._view) < _HEADER.size:
+            raise SnapshotError("Snapshot file is truncated")
+        magic, version, crc, directory_offset, directory_length = _HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            raise SnapshotError("Not a snapshot file")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Snapshot format version {version}, expected {FORMAT_VERSION}")
+        if directory_offset + directory_length > len(self._view):
+            raise SnapshotError("Snapshot file is truncated")
+        if verify and zlib.crc32(self._view[_HEADER.size:]) != crc:
+            raise SnapshotError("Snapshot checksum mismatch")
+        self._directory = pickle.loads(self._view[directory_offset:directory_offset + directory_length])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._directory
+
+    def _section(self, name: str, kind: str) -> Tuple[str, memoryview]:
+        try:
+            section_kind, typecode, offset, length = self._directory[name]
+        except KeyError:
+            raise SnapshotError(f"Snapshot has no section '{name}'")
+        if section_kind != kind:
+            raise SnapshotError(f"Snapshot section '{name}' is not a {kind} section")
+        return typecode, self._view[offset:offset + length]
+
+    def array(self, name: str) -> memoryview:
+        """A raw section as a read-only memoryview of its item type"""
+        typecode, view = self._section(name, _RAW)
+        return view.cast(typecode)
+
+    def object(self, name: str) -> Any:
+        """An object section, unpickled"""
+        _, view = self._section(name, _PICKLE)
+        return pickle.loads(view)
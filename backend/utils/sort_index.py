@@ -0,0 +1,225 @@
+import heapq
+import math
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+from utils.filter_index import Selection
+
+# Below this fraction of the table a selection is paged with a heap over its own
+# rows rather than by walking the presorted order until enough rows match
+_HEAP_FRACTION = 0.125
+# Batches of more changed rows than this are merged into the index in one pass
+_MERGE_THRESHOLD = 64
+
+
+def _merge_entries(entries: List[Tuple[Any, int]], fresh: List[Tuple[Any, int]]) -> List[Tuple[Any, int]]:
+    """Merge sorted fresh entries into sorted entries
+
+    Each fresh entry is placed by binary search and the runs of existing
+    entries between them are copied as slices, so the cost is one list copy
+    plus a search per fresh entry.
+    """
+    merged: List[Tuple[Any, int]] = []
+    start = 0
+    for entry in fresh:
+        end = bisect_right(entries, entry, start)
+        merged.extend(entries[start:end])
+        merged.append(entry)
+        start = end
+    merged.extend(entries[start:])
+    return merged
+
+
+class SortedIndex:
+    """Presorted index over one field of an append-only record list
+
+    Entries are kept as ``(value, -position)`` in ascending order, so walking the
+    list backwards yields rows by descending value with ties in stored order, the
+    same order a stable ``sort(reverse=True)`` produces.
+    """
+
+    def __init__(self, field: str, default: Any):
+        self.field = field
+        self.default = default
+        self._entries: List[Tuple[Any, int]] = []
+        self._values: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _value(self, record: Dict[str, Any]) -> Any:
+        value = record.get(self.field)
+        return self.default if value is None else value
+
+    def build(self, records: Iterable[Dict[str, Any]]):
+        """Index a full record list from scratch"""
+        self.build_values(record.get(self.field) for record in records)
+
+    def build_values(self, values: Iterable[Any]):
+        """Index a full record list from scratch, given its field values in stored order"""
+        default = self.default
+        self._values = [default if value is None else value for value in values]
+        self._entries = sorted((value, -position) for position, value in enumerate(self._values))
+
+    def add(self, record: Dict[str, Any]) -> int:
+        """Index a record appended to the end of the list, returning its position"""
+        position = len(self._values)
+        value = self._value(record)
+        self._values.append(value)
+        insort(self._entries, (value, -position))
+        return position
+
+    def add_many(self, records: Iterable[Dict[str, Any]]):
+        """Index records appended to the end of the list, in append order
+
+        The batch is sorted on its own and merged into the entries in one pass
+        instead of a shift per record.
+        """
+        start = len(self._values)
+        self._values.extend(self._value(record) for record in records)
+        if len(self._values) > start:
+            fresh = sorted((value, -position) for position, value in enumerate(self._values[start:], start))
+            self._entries = _merge_entries(self._entries, fresh)
+
+    def update(self, position: int, record: Dict[str, Any]):
+        """Re-index a record replaced in place"""
+        old, new = self._values[position], self._value(record)
+        if old == new:
+            return
+        i = bisect_left(self._entries, (old, -position))
+        del self._entries[i]
+        self._values[position] = new
+        insort(self._entries, (new, -position))
+
+    def update_many(self, values: Dict[int, Any]):
+        """Re-index many rows replaced in place, given their new values by position
+
+        A few changes are applied one by one; larger batches are merged into the
+        sorted entries in a single linear pass instead of a shift per row.
+        """
+        default = self.default
+        changed = {}
+        for position, value in values.items():
+            value = default if value is None else value
+            if self._values[position] != value:
+                changed[position] = value
+        if len(changed) <= _MERGE_THRESHOLD:
+            for position, value in changed.items():
+                self.update(position, {self.field: value})
+            return
+        stale = {(self._values[position], -position) for position in changed}
+        for position, value in changed.items():
+            self._values[position] = value
+        fresh = sorted((value, -position) for position, value in changed.items())
+        self._entries = _merge_entries([entry for entry in self._entries if entry not in stale], fresh)
+
+    def value_at(self, position: int) -> Any:
+        """Indexed value of the row at a position"""
+        return self._values[position]
+
+    def _lower_bound(self, min_value: Any) -> int:
+        return 0 if min_value is None else bisect_left(self._entries, (min_value, -math.inf))
+
+    def _run_end(self, value: Any, lo: int = 0) -> int:
+        return bisect_right(self._entries, (value, math.inf), lo)
+
+    def positions_desc(self, min_value: Any = None, after: Optional[Tuple[Any, int]] = None) -> Iterator[int]:
+        """Yield row positions by descending value, stopping below min_value
+
+        ``after`` is a ``(value, position)`` keyset cursor; only rows that come
+        strictly after it in this order are yielded, even if that row has since
+        changed or moved.
+        """
+        entries = self._entries
+        stop = self._lower_bound(min_value)
+        start = len(entries) if after is None else bisect_left(entries, (after[0], -after[1]))
+        for i in range(start - 1, stop - 1, -1):
+            yield -entries[i][1]
+
+    def positions_asc(self, min_value: Any = None, after: Optional[Tuple[Any, int]] = None) -> Iterator[int]:
+        """Yield row positions by ascending value with ties in stored order"""
+        entries = self._entries
+        i = self._lower_bound(min_value)
+        if after is not None:
+            value, position = after
+            # Finish the cursor's own run of equal values first
+            run_start = bisect_left(entries, (value, -math.inf))
+            cursor = bisect_left(entries, (value, -position), run_start)
+            for j in range(cursor - 1, max(run_start, i) - 1, -1):
+                yield -entries[j][1]
+            i = max(i, self._run_end(value, run_start))
+        while i < len(entries):
+            end = self._run_end(entries[i][0], i)
+            for j in range(end - 1, i - 1, -1):
+                yield -entries[j][1]
+            i = end
+
+    def top(
+        self,
+        positions: Iterable[int],
+        k: int,
+        descending: bool = True,
+        after: Optional[Tuple[Any, int]] = None
+    ) -> List[int]:
+        """The first k positions in sort order, using a bounded heap"""
+        values = self._values
+        if descending:
+            key = lambda p: (values[p], -p)
+            if after is not None:
+                bound = (after[0], -after[1])
+                positions = (p for p in positions if key(p) < bound)
+            return heapq.nlargest(k, positions, key=key)
+        key = lambda p: (values[p], p)
+        if after is not None:
+            positions = (p for p in positions if key(p) > tuple(after))
+        return heapq.nsmallest(k, positions, key=key)
+
+    def _is_sparse(self, selection: Optional[Selection]) -> bool:
+        return selection is not None and selection.count() < len(self._values) * _HEAP_FRACTION
+
+    def page(
+        self,
+        selection: Optional[Selection],
+        offset: int,
+        limit: int,
+        min_value: Any = None,
+        descending: bool = True,
+        after: Optional[Tuple[Any, int]] = None
+    ) -> List[int]:
+        """Positions of one page of selected rows in sort order
+
+        Cost is O(offset + limit) index steps for dense selections and a heap of
+        that size over the selection for sparse ones; it never sorts every match.
+        With a keyset cursor the walk starts at the cursor in O(log n).
+        """
+        if selection is not None and selection.is_all:
+            selection = None
+        if self._is_sparse(selection):
+            candidates = selection.positions()
+            if min_value is not None:
+                values = self._values
+                candidates = (p for p in candidates if values[p] >= min_value)
+            return self.top(candidates, offset + limit, descending, after)[offset:]
+
+        if descending:
+            matches = self.positions_desc(min_value, after)
+        else:
+            matches = self.positions_asc(min_value, after)
+        if selection is not None:
+            matches = (p for p in matches if p in selection)
+        return list(islice(matches, offset, offset + limit))
+
+    def count(self, selection: Optional[Selection], min_value: Any = None) -> int:
+        """Count selected rows whose value is at least min_value"""
+        if selection is not None and selection.is_all:
+            selection = None
+        if min_value is None:
+            return len(self._values) if selection is None else selection.count()
+        bounded = len(self._entries) - self._lower_bound(min_value)
+        if selection is None:
+            return bounded
+        if self._is_sparse(selection):
+            values = self._values
+            return sum(1 for p in selection.positions() if values[p] >= min_value)
+        return sum(1 for p in self.positions_desc(min_value) if p in selection)
@@ -0,0 +1,1225 @@
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, AbstractSet, Callable, Iterable, Iterator, Sequence, Tuple
+
+from utils.aggregates import OverviewAggregates, TOP_HASHTAGS, campaign_stats
+from utils.metrics import span
+from utils.pagination import encode_cursor, decode_cursor
+from utils.rollups import (
+    CAMPAIGNS,
+    POSTS,
+    ACCOUNTS,
+    CLOCK_METRICS,
+    HOUR,
+    RESOLUTIONS,
+    TIMESTAMP_GLOB,
+    threat_metric,
+    series_window,
+    series_rows
+)
+from utils.storage import CAMPAIGN_SORT_FIELDS, Page, StorageBackend, stream_mock_data, same_kind
+from utils.text_index import parse_query
+
+# Each table keeps the full record as JSON in `data`, plus the columns that
+# filters, sorts and joins need so they can be answered from indexes
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    status TEXT,
+    threat_level TEXT,
+    campaign_type TEXT,
+    detected_at TEXT NOT NULL DEFAULT '',
+    last_activity TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    total_posts INTEGER NOT NULL DEFAULT 0,
+    total_accounts INTEGER NOT NULL DEFAULT 0,
+    confidence_score REAL NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns (status);
+CREATE INDEX IF NOT EXISTS idx_campaigns_threat_level ON campaigns (threat_level);
+CREATE INDEX IF NOT EXISTS idx_campaigns_detected_at ON campaigns (detected_at);
+
+CREATE TABLE IF NOT EXISTS posts (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    campaign_id TEXT,
+    account_id TEXT NOT NULL,
+    platform TEXT,
+    is_flagged INTEGER,
+    posted_at TEXT NOT NULL DEFAULT '',
+    engagement_count INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_campaign_posted ON posts (campaign_id, posted_at);
+CREATE INDEX IF NOT EXISTS idx_posts_account ON posts (account_id, campaign_id);
+CREATE INDEX IF NOT EXISTS idx_posts_posted_at ON posts (posted_at);
+CREATE INDEX IF NOT EXISTS idx_posts_engagement ON posts (engagement_count);
+CREATE INDEX IF NOT EXISTS idx_posts_platform_flagged ON posts (platform, is_flagged, posted_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5 (
+    body,
+    tokenize = "unicode61 tokenchars '_'"
+);
+
+CREATE TABLE IF NOT EXISTS accounts (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    account_type TEXT,
+    bot_probability REAL NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_accounts_bot_probability ON accounts (bot_probability);
+CREATE INDEX IF NOT EXISTS idx_accounts_type_bot ON accounts (account_type, bot_probability);
+
+CREATE TABLE IF NOT EXISTS reports (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    status TEXT,
+    severity TEXT,
+    report_type TEXT,
+    generated_at TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reports_status_generated ON reports (status, generated_at);
+CREATE INDEX IF NOT EXISTS idx_reports_generated_at ON reports (generated_at);
+
+CREATE TABLE IF NOT EXISTS threat_scores (
+    campaign_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS aggregates (
+    name TEXT NOT NULL,
+    key TEXT NOT NULL DEFAULT '',
+    value INTEGER NOT NULL,
+    PRIMARY KEY (name, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS campaign_platforms (
+    campaign_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    posts INTEGER NOT NULL,
+    PRIMARY KEY (campaign_id, platform)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS campaign_hashtags (
+    campaign_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    posts INTEGER NOT NULL,
+    PRIMARY KEY (campaign_id, tag)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_campaign_hashtags_top ON campaign_hashtags (campaign_id, posts DESC, tag);
+
+CREATE TABLE IF NOT EXISTS campaign_accounts (
+    campaign_id TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    posts INTEGER NOT NULL,
+    PRIMARY KEY (campaign_id, account_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS campaign_stats (
+    campaign_id TEXT PRIMARY KEY,
+    accounts INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value) VALUES ('data_version', 0);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (resolution, scope, metric, bucket)
+) WITHOUT ROWID;
+"""
+
+# Rollup metrics per table as (metric, timestamp, scope, condition) SQL
+# expressions over a row named {row}; scope '' is the global series
+ROLLUP_SOURCES = {
+    "posts": [
+        (f"'{POSTS}'", "{row}.posted_at", "''", "1"),
+        (f"'{POSTS}'", "{row}.posted_at", "{row}.campaign_id", "{row}.campaign_id IS NOT NULL")
+    ],
+    "campaigns": [
+        (f"'{CAMPAIGNS}'", "{row}.detected_at", "''", "1"),
+        ("'" + threat_metric("") + "' || COALESCE({row}.threat_level, '')", "{row}.detected_at", "''", "1")
+    ],
+    "accounts": [
+        (f"'{ACCOUNTS}'", "json_extract({row}.data, '$.first_seen')", "''", "1")
+    ]
+}
+
+
+def _bump(name: str, key: str, delta: int) -> str:
+    """Statement adding delta to an overview counter"""
+    return (
+        f"INSERT INTO aggregates (name, key, value) VALUES ('{name}', COALESCE({key}, ''), {delta}) "
+        f"ON CONFLICT (name, key) DO UPDATE SET value = value + excluded.value;"
+    )
+
+
+def _bump_platform(row: str, delta: int) -> str:
+    """Statement adding delta to the post count of a post's (campaign, platform) pair"""
+    return (
+        f"INSERT INTO campaign_platforms (campaign_id, platform, posts) "
+        f"SELECT {row}.campaign_id, COALESCE({row}.platform, 'other'), {delta} WHERE {row}.campaign_id IS NOT NULL "
+        f"ON CONFLICT (campaign_id, platform) DO UPDATE SET posts = posts + excluded.posts;"
+        f"DELETE FROM campaign_platforms WHERE campaign_id = {row}.campaign_id "
+        f"AND platform = COALESCE({row}.platform, 'other') AND posts <= 0;"
+    )
+
+
+def _bump_rollups(table: str, row: str, delta: int) -> str:
+    """Statements adding delta to the hour and day buckets of a row's rollup metrics"""
+    statements = []
+    for source in ROLLUP_SOURCES[table]:
+        metric, timestamp, scope, condition = (part.format(row=row) for part in source)
+        for resolution, length in RESOLUTIONS.items():
+            bucket = f"substr({timestamp}, 1, {length})"
+            statements.append(
+                f"INSERT INTO rollups (resolution, scope, metric, bucket, value) "
+                f"SELECT '{resolution}', {scope}, {metric}, {bucket}, {delta} "
+                f"WHERE {condition} AND {timestamp} GLOB '{TIMESTAMP_GLOB}' "
+                f"ON CONFLICT (resolution, scope, metric, bucket) DO UPDATE SET value = value + excluded.value;"
+            )
+            if delta < 0:
+                statements.append(
+                    f"DELETE FROM rollups WHERE resolution = '{resolution}' AND scope = {scope} "
+                    f"AND metric = {metric} AND bucket = {bucket} AND value <= 0;"
+                )
+    return "".join(statements)
+
+
+def _bump_campaign_post(row: str, delta: int) -> str:
+    """Statements adding delta to the hashtag and account counts of a post's campaign"""
+    statements = [
+        f"INSERT INTO campaign_hashtags (campaign_id, tag, posts) "
+        f"SELECT {row}.campaign_id, value, {delta} FROM json_each({row}.data, '$.hashtags') "
+        f"WHERE {row}.campaign_id IS NOT NULL AND type = 'text' "
+        f"ON CONFLICT (campaign_id, tag) DO UPDATE SET posts = posts + excluded.posts;",
+        f"INSERT INTO campaign_accounts (campaign_id, account_id, posts) "
+        f"SELECT {row}.campaign_id, {row}.account_id, {delta} WHERE {row}.campaign_id IS NOT NULL "
+        f"ON CONFLICT (campaign_id, account_id) DO UPDATE SET posts = posts + excluded.posts;"
+    ]
+    if delta < 0:
+        statements += [
+            f"DELETE FROM campaign_hashtags WHERE campaign_id = {row}.campaign_id AND posts <= 0 "
+            f"AND tag IN (SELECT value FROM json_each({row}.data, '$.hashtags'));",
+            f"DELETE FROM campaign_accounts WHERE campaign_id = {row}.campaign_id "
+            f"AND account_id = {row}.account_id AND posts <= 0;"
+        ]
+    return "".join(statements)
+
+
+def _campaign_triggers() -> str:
+    """Triggers keeping the per-campaign hashtag and account counts current as posts come, go and change
+
+    Unique accounts are counted as campaign_accounts rows come and go.
+    """
+    changed = (
+        "OLD.campaign_id IS NOT NEW.campaign_id OR OLD.account_id IS NOT NEW.account_id "
+        "OR json_extract(OLD.data, '$.hashtags') IS NOT json_extract(NEW.data, '$.hashtags')"
+    )
+    triggers = [
+        ("posts_campaign_insert", "INSERT ON posts", _bump_campaign_post("NEW", 1)),
+        ("posts_campaign_delete", "DELETE ON posts", _bump_campaign_post("OLD", -1)),
+        (
+            "posts_campaign_update",
+            f"UPDATE OF campaign_id, account_id, data ON posts WHEN {changed}",
+            _bump_campaign_post("OLD", -1) + _bump_campaign_post("NEW", 1)
+        ),
+        (
+            "campaign_accounts_count_insert",
+            "INSERT ON campaign_accounts",
+            "INSERT INTO campaign_stats (campaign_id, accounts) VALUES (NEW.campaign_id, 1) "
+            "ON CONFLICT (campaign_id) DO UPDATE SET accounts = accounts + 1;"
+        ),
+        (
+            "campaign_accounts_count_delete",
+            "DELETE ON campaign_accounts",
+            "UPDATE campaign_stats SET accounts = accounts - 1 WHERE campaign_id = OLD.campaign_id;"
+            "DELETE FROM campaign_stats WHERE campaign_id = OLD.campaign_id AND accounts <= 0;"
+        )
+    ]
+    return "".join(
+        f"DROP TRIGGER IF EXISTS {name};CREATE TRIGGER {name} AFTER {event} BEGIN {body} END;"
+        for name, event, body in triggers
+    )
+
+
+def _counter_triggers(table: str, columns: str, bumps: Callable[[str, int], str]) -> str:
+    """Triggers counting a table's rows, its rollups and bumps(row, delta) as rows come, go and change
+
+    Triggers are recreated on every start so databases pick up changed definitions.
+    """
+    def all_bumps(row: str, delta: int) -> str:
+        return bumps(row, delta) + _bump_rollups(table, row, delta)
+
+    return "".join(
+        f"DROP TRIGGER IF EXISTS {table}_count_{event};"
+        f"CREATE TRIGGER {table}_count_{event} AFTER {event.upper()}{watched} ON {table} BEGIN {body} END;"
+        for event, watched, body in [
+            ("insert", "", _bump(table, "NULL", 1) + all_bumps("NEW", 1)),
+            ("delete", "", _bump(table, "NULL", -1) + all_bumps("OLD", -1)),
+            ("update", f" OF {columns}", all_bumps("OLD", -1) + all_bumps("NEW", 1))
+        ]
+    )
+
+
+def _count_rollups() -> str:
+    """Statements rebuilding every rollup from the rows"""
+    statements = ["DELETE FROM rollups;"]
+    for table, sources in ROLLUP_SOURCES.items():
+        for source in sources:
+            metric, timestamp, scope, condition = (part.format(row=table) for part in source)
+            for resolution, length in RESOLUTIONS.items():
+                statements.append(
+                    f"INSERT INTO rollups (resolution, scope, metric, bucket, value) "
+                    f"SELECT '{resolution}', {scope}, {metric}, substr({timestamp}, 1, {length}), COUNT(*) "
+                    f"FROM {table} WHERE {condition} AND {timestamp} GLOB '{TIMESTAMP_GLOB}' GROUP BY 2, 3, 4;"
+                )
+    return "\n".join(statements)
+
+
+# Overview counters and rollups are maintained by triggers, so every write
+# path, bulk or single, keeps them current without reading rows back
+COUNTER_TRIGGERS = (
+    _counter_triggers("campaigns", "status, threat_level, detected_at", lambda row, delta: (
+        _bump("campaigns_by_status", f"{row}.status", delta)
+        + _bump("campaigns_by_threat_level", f"{row}.threat_level", delta)
+    ))
+    + _counter_triggers("accounts", "account_type, data", lambda row, delta: (
+        _bump("accounts_by_type", f"{row}.account_type", delta)
+    ))
+    + _counter_triggers("posts", "campaign_id, platform, posted_at", _bump_platform)
+    + _campaign_triggers()
+)
+
+# Rebuilds every overview counter and rollup from the rows
+COUNT_AGGREGATES = """
+DELETE FROM aggregates;
+INSERT INTO aggregates (name, key, value) SELECT 'campaigns', '', COUNT(*) FROM campaigns;
+INSERT INTO aggregates (name, key, value) SELECT 'posts', '', COUNT(*) FROM posts;
+INSERT INTO aggregates (name, key, value) SELECT 'accounts', '', COUNT(*) FROM accounts;
+INSERT INTO aggregates (name, key, value)
+    SELECT 'campaigns_by_status', COALESCE(status, ''), COUNT(*) FROM campaigns GROUP BY 2;
+INSERT INTO aggregates (name, key, value)
+    SELECT 'campaigns_by_threat_level', COALESCE(threat_level, ''), COUNT(*) FROM campaigns GROUP BY 2;
+INSERT INTO aggregates (name, key, value)
+    SELECT 'accounts_by_type', COALESCE(account_type, ''), COUNT(*) FROM accounts GROUP BY 2;
+DELETE FROM campaign_platforms;
+INSERT INTO campaign_platforms (campaign_id, platform, posts)
+    SELECT campaign_id, COALESCE(platform, 'other'), COUNT(*) FROM posts WHERE campaign_id IS NOT NULL GROUP BY 1, 2;
+DELETE FROM campaign_hashtags;
+INSERT INTO campaign_hashtags (campaign_id, tag, posts)
+    SELECT p.campaign_id, t.value, COUNT(*) FROM posts p, json_each(p.data, '$.hashtags') t
+    WHERE p.campaign_id IS NOT NULL AND t.type = 'text' GROUP BY 1, 2;
+DELETE FROM campaign_accounts;
+DELETE FROM campaign_stats;
+INSERT INTO campaign_accounts (campaign_id, account_id, posts)
+    SELECT campaign_id, account_id, COUNT(*) FROM posts WHERE campaign_id IS NOT NULL GROUP BY 1, 2;
+""" + _count_rollups()
+
+# Indexed columns per table with the value stored when a record lacks them
+COLUMNS = {
+    "campaigns": {
+        "status": None,
+        "threat_level": None,
+        "campaign_type": None,
+        **CAMPAIGN_SORT_FIELDS
+    },
+    "posts": {
+        "campaign_id": None,
+        "account_id": None,
+        "platform": None,
+        "is_flagged": None,
+        "posted_at": "",
+        "engagement_count": 0
+    },
+    "accounts": {
+        "account_type": None,
+        "bot_probability": 0
+    },
+    "reports": {
+        "status": None,
+        "severity": None,
+        "report_type": None,
+        "generated_at": ""
+    }
+}
+
+# Sort columns for paged queries, with the default that identifies their type
+POST_SORTS = {"posted_at": "", "engagement_count": 0}
+# Rows read per query when streaming a whole table
+EXPORT_BATCH_SIZE = 1000
+
+
+def _upsert_sql(table: str) -> str:
+    columns = list(COLUMNS[table])
+    names = ", ".join(["id", *columns, "data"])
+    placeholders = ", ".join("?" * (len(columns) + 2))
+    updates = ", ".join(f"{c} = excluded.{c}" for c in [*columns, "data"])
+    return (
+        f"INSERT INTO {table} ({names}) VALUES ({placeholders}) "
+        f"ON CONFLICT (id) DO UPDATE SET {updates} RETURNING rowid"
+    )
+
+
+UPSERT_SQL = {table: _upsert_sql(table) for table in COLUMNS}
+
+
+def _column_value(record: Dict[str, Any], column: str, default: Any) -> Any:
+    value = record.get(column)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _fts_body(post: Dict[str, Any]) -> str:
+    return " ".join([post.get("content", ""), *post.get("hashtags", []), *post.get("mentions", [])])
+
+
+def _fts_query(search: str) -> Optional[str]:
+    """Translate a search string into an FTS5 MATCH expression with quoted tokens"""
+    groups = []
+    for group in parse_query(search):
+        terms = [f'"{t[:-1]}"*' if t.endswith("*") else f'"{t}"' for t in group]
+        groups.append("(" + " AND ".join(terms) + ")")
+    return " OR ".join(groups) or None
+
+
+def _predicate(value: Optional[str]) -> Optional[str]:
+    """Treat empty and "all" filter values as no predicate"""
+    if not value or value == "all":
+        return None
+    return value
+
+
+def _where(alias: str = "", **predicates: Any) -> Tuple[List[str], List[Any]]:
+    """Equality clauses for the given column predicates, skipping None"""
+    clauses, params = [], []
+    for column, value in predicates.items():
+        if value is None:
+            continue
+        clauses.append(f"{alias}{column} = ?")
+        params.append(int(value) if isinstance(value, bool) else value)
+    return clauses, params
+
+
+def _data_columns(fields: Optional[Sequence[str]], alias: str = "") -> Tuple[str, List[str]]:
+    """SQL selecting a row's record, or a JSON object of just the given fields, with its parameters"""
+    if fields is None:
+        return f"{alias}data", []
+    return (
+        f"(SELECT json_group_object(key, {alias}data -> fullkey) FROM json_each({alias}data) "
+        f"WHERE key IN ({', '.join('?' * len(fields))}))",
+        list(fields)
+    )
+
+
+def _record(data: str, fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Decode a row selected with _data_columns, with fields in the order given"""
+    record = json.loads(data)
+    if fields is None:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def _sql_where(clauses: List[str]) -> str:
+    return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+class _ConnectionPool:
+    """Small pool of SQLite connections shared across request threads"""
+
+    def __init__(self, database: str, size: int):
+        self.database = database
+        self.size = size
+        self._uri = database.startswith("file:")
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        # In-memory databases vanish with their last connection, so keep one open
+        self._anchor = self._connect() if "mode=memory" in database else None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.database,
+            uri=self._uri,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256
+        )
+        if "mode=memory" not in self.database:
+            conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if self._idle.qsize() < self.size:
+                self._idle.put(conn)
+            else:
+                conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        if self._anchor is not None:
+            self._anchor.close()
+            self._anchor = None
+
+
+class SQLiteStore(StorageBackend):
+    """Stores records in SQLite and pushes filters, sorting and pagination into SQL
+
+    The database runs in WAL mode so reader connections from the pool never
+    block on the single writer. An empty database is seeded from mock_data.
+    """
+
+    def __init__(self, database: str, pool_size: int = 8, seed: bool = True):
+        self._pool = _ConnectionPool(database, pool_size)
+        self._write_lock = threading.Lock()
+        with self._pool.connection() as conn:
+            conn.executescript(SCHEMA + COUNTER_TRIGGERS)
+            empty = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM campaigns)").fetchone()[0]
+            uncounted = conn.execute(
+                "SELECT NOT EXISTS (SELECT 1 FROM aggregates) OR NOT EXISTS (SELECT 1 FROM rollups) "
+                "OR (EXISTS (SELECT 1 FROM posts WHERE campaign_id IS NOT NULL) "
+                "AND NOT EXISTS (SELECT 1 FROM campaign_accounts))"
+            ).fetchone()[0]
+        if seed and empty:
+            self.load_all_data()
+        elif uncounted:
+            # Databases created before the counters existed are counted once
+            with self._transaction() as conn:
+                self._count_aggregates(conn)
+
+    def close(self):
+        """Close every pooled connection"""
+        self._pool.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._write_lock, self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Every write moves the data version, which all processes sharing the database see
+            conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'data_version'")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _rows(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            return [json.loads(row[0]) for row in conn.execute(sql, params)]
+
+    def _row(self, sql: str, params: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _scalar(self, sql: str, params: Tuple[Any, ...] = ()) -> Any:
+        with self._pool.connection() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def load_all_data(self):
+        """Replace every table with the contents of the mock data files, streamed record by record"""
+        writers = {
+            "campaigns": lambda conn, record: self._write(conn, "campaigns", record),
+            "posts": self._write_post,
+            "accounts": lambda conn, record: self._write(conn, "accounts", record),
+            "threat_scores": self._write_threat_score,
+            "reports": lambda conn, record: self._write(conn, "reports", record)
+        }
+        with self._transaction() as conn:
+            for table in ["campaigns", "posts", "posts_fts", "accounts", "reports", "threat_scores"]:
+                conn.execute(f"DELETE FROM {table}")
+            for name, write in writers.items():
+                for record in stream_mock_data(name):
+                    write(conn, record)
+            self._count_aggregates(conn)
+
+    def _count_aggregates(self, conn: sqlite3.Connection):
+        for statement in COUNT_AGGREGATES.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+
+    # Mutation methods
+    def _write(self, conn: sqlite3.Connection, table: str, record: Dict[str, Any]) -> int:
+        params = [record["id"]]
+        params += [_column_value(record, column, default) for column, default in COLUMNS[table].items()]
+        params.append(json.dumps(record))
+        return conn.execute(UPSERT_SQL[table], params).fetchone()[0]
+
+    def _write_post(self, conn: sqlite3.Connection, post: Dict[str, Any]) -> int:
+        rowid = self._write(conn, "posts", post)
+        conn.execute("DELETE FROM posts_fts WHERE rowid = ?", (rowid,))
+        conn.execute("INSERT INTO posts_fts (rowid, body) VALUES (?, ?)", (rowid, _fts_body(post)))
+        return rowid
+
+    def _write_threat_score(self, conn: sqlite3.Connection, score: Dict[str, Any]):
+        conn.execute(
+            "INSERT INTO threat_scores (campaign_id, data) VALUES (?, ?) "
+            "ON CONFLICT (campaign_id) DO UPDATE SET data = excluded.data",
+            (score["campaign_id"], json.dumps(score))
+        )
+
+    def upsert_campaign(self, campaign: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new campaign or replace the one with the same ID"""
+        with self._transaction() as conn:
+            self._write(conn, "campaigns", campaign)
+        return campaign
+
+    def upsert_post(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new post or replace the one with the same ID"""
+        with self._transaction() as conn:
+            self._write_post(conn, post)
+        return post
+
+    def upsert_account(self, account: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new account or replace the one with the same ID"""
+        with self._transaction() as conn:
+            self._write(conn, "accounts", account)
+        return account
+
+    def upsert_report(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new report or replace the one with the same ID"""
+        with self._transaction() as conn:
+            self._write(conn, "reports", report)
+        return report
+
+    def upsert_threat_score(self, score: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new threat score or replace the one for the same campaign"""
+        with self._transaction() as conn:
+            self._write_threat_score(conn, score)
+        return score
+
+    def _upsert_many(self, table: str, records: Iterable[Dict[str, Any]], write) -> int:
+        """Write many records in one transaction, returning how many were new"""
+        inserted = 0
+        with self._transaction() as conn:
+            # New rows are numbered past the largest rowid present beforehand
+            last = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+            for record in records:
+                if write(conn, record) > last:
+                    inserted += 1
+        return inserted
+
+    def upsert_posts(self, posts: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace many posts, returning how many were new"""
+        return self._upsert_many("posts", posts, self._write_post)
+
+    def upsert_accounts(self, accounts: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace many accounts, returning how many were new"""
+        return self._upsert_many("accounts", accounts, lambda conn, record: self._write(conn, "accounts", record))
+
+    def update_accounts(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Set fields of existing accounts by ID, returning how many accounts changed"""
+        changed = 0
+        with self._transaction() as conn:
+            for account_id, fields in updates.items():
+                row = conn.execute("SELECT data FROM accounts WHERE id = ?", (account_id,)).fetchone()
+                if row is None:
+                    continue
+                account = json.loads(row[0])
+                if all(field in account and account[field] == value for field, value in fields.items()):
+                    continue
+                account.update(fields)
+                self._write(conn, "accounts", account)
+                changed += 1
+        return changed
+
+    # Paging helpers
+    def _resolve_cursor(
+        self,
+        table: str,
+        sort_by: str,
+        cursor: Optional[str],
+        default: Any
+    ) -> Optional[Tuple[Any, int]]:
+        """Turn an opaque cursor into a (sort value, rowid) keyset bound"""
+        if cursor is None:
+            return None
+        value, key = decode_cursor(cursor, sort_by)
+        rowid = self._scalar_or_none(f"SELECT rowid FROM {table} WHERE id = ?", (key,))
+        if rowid is None:
+            raise ValueError(f"Cursor refers to unknown record '{key}'")
+        if default is not None and not same_kind(value, default):
+            raise ValueError("Cursor value does not match the sort field")
+        return value, rowid
+
+    def _scalar_or_none(self, sql: str, params: Tuple[Any, ...]) -> Any:
+        with self._pool.connection() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def _page(
+        self,
+        table: str,
+        clauses: List[str],
+        params: List[Any],
+        sort_column: Optional[str],
+        sort_by: str,
+        offset: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        descending: bool = True,
+        sort_default: Any = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Run a keyset- or offset-paginated query with ties broken by insertion order"""
+        with span("count"):
+            total_items = self._scalar(f"SELECT COUNT(*) FROM {table}{_sql_where(clauses)}", tuple(params))
+
+        after = self._resolve_cursor(table, sort_by, cursor, sort_default)
+        page_clauses, page_params = list(clauses), list(params)
+        if after is not None:
+            offset = 0
+            value, rowid = after
+            if sort_column is None:
+                page_clauses.append("rowid > ?")
+                page_params.append(rowid)
+            else:
+                op = "<" if descending else ">"
+                page_clauses.append(f"({sort_column} {op} ? OR ({sort_column} = ? AND rowid > ?))")
+                page_params += [value, value, rowid]
+
+        if sort_column is None:
+            order_by = "rowid"
+        else:
+            order_by = f"{sort_column} {'DESC' if descending else 'ASC'}, rowid"
+        data, data_params = _data_columns(fields)
+        sql = (
+            f"SELECT {sort_column or 'NULL'}, id, {data} FROM {table}{_sql_where(page_clauses)} "
+            f"ORDER BY {order_by} LIMIT ? OFFSET ?"
+        )
+        with span("query") as s, self._pool.connection() as conn:
+            rows = conn.execute(sql, (*data_params, *page_params, limit + 1, offset)).fetchall()
+            s.rows = len(rows)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(sort_by, rows[-1][0], rows[-1][1])
+        return [_record(row[2], fields) for row in rows], total_items, next_cursor
+
+    def _iter(
+        self,
+        table: str,
+        clauses: List[str],
+        params: List[Any],
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching records in rowid order, reading them in batches walked by rowid"""
+        data, data_params = _data_columns(fields)
+        sql = f"SELECT rowid, {data} FROM {table}{_sql_where([*clauses, 'rowid > ?'])} ORDER BY rowid LIMIT ?"
+        last = 0
+        while True:
+            # Each batch is a separate read, so no connection is held while
+            # the caller consumes records
+            with self._pool.connection() as conn:
+                rows = conn.execute(sql, (*data_params, *params, last, EXPORT_BATCH_SIZE)).fetchall()
+            for row in rows:
+                yield _record(row[1], fields)
+            if len(rows) < EXPORT_BATCH_SIZE:
+                return
+            last = rows[-1][0]
+
+    # Campaign methods
+    def get_all_campaigns(self) -> List[Dict[str, Any]]:
+        """Get all campaigns"""
+        return self._rows("SELECT data FROM campaigns ORDER BY rowid")
+
+    def get_campaign_by_id(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific campaign by ID"""
+        return self._row("SELECT data FROM campaigns WHERE id = ?", (campaign_id,))
+
+    def _campaign_where(self, status, threat_level, campaign_type) -> Tuple[List[str], List[Any]]:
+        return _where(
+            status=_predicate(status),
+            threat_level=_predicate(threat_level),
+            campaign_type=_predicate(campaign_type)
+        )
+
+    def filter_campaigns(
+        self,
+        status: Optional[str] = None,
+        threat_level: Optional[str] = None,
+        campaign_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Filter campaigns by various criteria"""
+        clauses, params = self._campaign_where(status, threat_level, campaign_type)
+        return self._rows(f"SELECT data FROM campaigns{_sql_where(clauses)} ORDER BY rowid", tuple(params))
+
+    def count_campaigns(
+        self,
+        status: Optional[str] = None,
+        threat_level: Optional[str] = None,
+        campaign_type: Optional[str] = None
+    ) -> int:
+        """Count campaigns matching the filters"""
+        clauses, params = self._campaign_where(status, threat_level, campaign_type)
+        return self._scalar(f"SELECT COUNT(*) FROM campaigns{_sql_where(clauses)}", tuple(params))
+
+    def page_campaigns(
+        self,
+        offset: int,
+        limit: int,
+        status: Optional[str] = None,
+        threat_level: Optional[str] = None,
+        campaign_type: Optional[str] = None,
+        sort_by: str = "detected_at",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching campaigns; unknown sort fields use stored order"""
+        clauses, params = self._campaign_where(status, threat_level, campaign_type)
+        sort_column = sort_by if sort_by in CAMPAIGN_SORT_FIELDS else None
+        return self._page(
+            "campaigns", clauses, params, sort_column, sort_by, offset, limit, cursor,
+            descending=(order == "desc"),
+            sort_default=CAMPAIGN_SORT_FIELDS.get(sort_by),
+            fields=fields
+        )
+
+    # Post methods
+    def get_all_posts(self) -> List[Dict[str, Any]]:
+        """Get all posts"""
+        return self._rows("SELECT data FROM posts ORDER BY rowid")
+
+    def get_post_by_id(self, post_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific post by ID"""
+        return self._row("SELECT data FROM posts WHERE id = ?", (post_id,))
+
+    def get_posts_by_campaign(self, campaign_id: str) -> List[Dict[str, Any]]:
+        """Get all posts for a specific campaign"""
+        return self._rows("SELECT data FROM posts WHERE campaign_id = ? ORDER BY rowid", (campaign_id,))
+
+    def get_posts_by_account(self, account_id: str) -> List[Dict[str, Any]]:
+        """Get all posts made by a specific account"""
+        return self._rows("SELECT data FROM posts WHERE account_id = ? ORDER BY rowid", (account_id,))
+
+    def get_platform_counts_by_campaign(self, campaign_id: str) -> Dict[str, int]:
+        """Get post counts per platform for a specific campaign"""
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT COALESCE(platform, 'other'), COUNT(*) FROM posts "
+                "WHERE campaign_id = ? GROUP BY 1 ORDER BY MIN(rowid)",
+                (campaign_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def _post_where(self, platform, is_flagged, campaign_id=None, alias: str = "") -> Tuple[List[str], List[Any]]:
+        return _where(alias, platform=_predicate(platform), is_flagged=is_flagged, campaign_id=campaign_id)
+
+    def filter_posts(
+        self,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        """Filter posts by various criteria"""
+        clauses, params = self._post_where(platform, is_flagged)
+        return self._rows(f"SELECT data FROM posts{_sql_where(clauses)} ORDER BY rowid", tuple(params))
+
+    def search_posts(
+        self,
+        query: str,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        ranked: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over posts, in stored order or by BM25 relevance"""
+        match = _fts_query(query)
+        if match is None:
+            return []
+        clauses, params = self._post_where(platform, is_flagged, alias="p.")
+        clauses.insert(0, "posts_fts MATCH ?")
+        order_by = "f.rank, p.rowid" if ranked else "p.rowid"
+        return self._rows(
+            f"SELECT p.data FROM posts_fts f JOIN posts p ON p.rowid = f.rowid"
+            f"{_sql_where(clauses)} ORDER BY {order_by}",
+            (match, *params)
+        )
+
+    def count_posts(
+        self,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        campaign_id: Optional[str] = None
+    ) -> int:
+        """Count posts matching the filters"""
+        clauses, params = self._post_where(platform, is_flagged, campaign_id)
+        return self._scalar(f"SELECT COUNT(*) FROM posts{_sql_where(clauses)}", tuple(params))
+
+    def page_posts(
+        self,
+        offset: int,
+        limit: int,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        campaign_id: Optional[str] = None,
+        search: Optional[str] = None,
+        sort_by: str = "posted_at",
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching posts
+
+        sort_by is "posted_at" or "engagement_count" (descending), "relevance"
+        (BM25 order, search only) or anything else for stored order.
+        """
+        clauses, params = self._post_where(platform, is_flagged, campaign_id)
+        if search:
+            match = _fts_query(search)
+            if match is None:
+                return [], 0, None
+            if sort_by == "relevance":
+                return self._page_ranked(match, clauses, params, offset, limit, cursor, fields)
+            clauses.insert(0, "rowid IN (SELECT rowid FROM posts_fts WHERE posts_fts MATCH ?)")
+            params.insert(0, match)
+        sort_column = sort_by if sort_by in POST_SORTS else None
+        return self._page(
+            "posts", clauses, params, sort_column, sort_by, offset, limit, cursor,
+            sort_default=POST_SORTS.get(sort_by),
+            fields=fields
+        )
+
+    def _page_ranked(
+        self,
+        match: str,
+        clauses: List[str],
+        params: List[Any],
+        offset: int,
+        limit: int,
+        cursor: Optional[str],
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Page search results in BM25 order, with the FTS5 rank as the cursor value"""
+        base = (
+            "FROM posts_fts f JOIN posts p ON p.rowid = f.rowid WHERE posts_fts MATCH ?"
+            + "".join(f" AND p.{clause}" for clause in clauses)
+        )
+        base_params = [match, *params]
+        with span("count"):
+            total_items = self._scalar(f"SELECT COUNT(*) {base}", tuple(base_params))
+
+        keyset, keyset_params = "", []
+        if cursor is not None:
+            rank, key = decode_cursor(cursor, "relevance")
+            rowid = self._scalar_or_none("SELECT rowid FROM posts WHERE id = ?", (key,))
+            if rowid is None or not same_kind(rank, 0.0):
+                raise ValueError("Cursor does not refer to a ranked search result")
+            keyset = " AND (f.rank > ? OR (f.rank = ? AND p.rowid > ?))"
+            keyset_params = [rank, rank, rowid]
+            offset = 0
+        data, data_params = _data_columns(fields, "p.")
+        with span("query") as s, self._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT f.rank, p.id, {data} {base}{keyset} ORDER BY f.rank, p.rowid LIMIT ? OFFSET ?",
+                (*data_params, *base_params, *keyset_params, limit + 1, offset)
+            ).fetchall()
+            s.rows = len(rows)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor("relevance", rows[-1][0], rows[-1][1])
+        return [_record(row[2], fields) for row in rows], total_items, next_cursor
+
+    def iter_posts(
+        self,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        campaign_id: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching posts in stored order"""
+        clauses, params = self._post_where(platform, is_flagged, campaign_id)
+        return self._iter("posts", clauses, params, fields)
+
+    # Account methods
+    def get_all_accounts(self) -> List[Dict[str, Any]]:
+        """Get all accounts"""
+        return self._rows("SELECT data FROM accounts ORDER BY rowid")
+
+    def get_account_by_id(self, account_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific account by ID"""
+        return self._row("SELECT data FROM accounts WHERE id = ?", (account_id,))
+
+    def get_accounts_by_campaign(
+        self,
+        campaign_id: str,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get all accounts involved in a campaign, with per-campaign post stats"""
+        data, data_params = _data_columns(fields, "a.")
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {data}, s.post_count, s.first_post_at, s.last_post_at FROM ("
+                "    SELECT account_id, COUNT(*) AS post_count, MIN(posted_at) AS first_post_at,"
+                "           MAX(posted_at) AS last_post_at, MIN(rowid) AS first_rowid"
+                "    FROM posts WHERE campaign_id = ? GROUP BY account_id"
+                ") s JOIN accounts a ON a.id = s.account_id ORDER BY s.first_rowid",
+                (*data_params, campaign_id)
+            ).fetchall()
+        accounts = []
+        for data, post_count, first_post_at, last_post_at in rows:
+            account = _record(data, fields)
+            account["post_count_in_campaign"] = post_count
+            account["first_post_at"] = first_post_at
+            account["last_post_at"] = last_post_at
+            accounts.append(account)
+        return accounts
+
+    def get_campaign_ids_by_account(self, account_id: str) -> AbstractSet[str]:
+        """Get the IDs of all campaigns an account has posted in"""
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT campaign_id FROM posts "
+                "WHERE account_id = ? AND campaign_id IS NOT NULL AND campaign_id != ''",
+                (account_id,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def _account_where(self, account_type, min_bot_probability) -> Tuple[List[str], List[Any]]:
+        clauses, params = _where(account_type=_predicate(account_type))
+        if min_bot_probability is not None:
+            clauses.append("bot_probability >= ?")
+            params.append(min_bot_probability)
+        return clauses, params
+
+    def filter_accounts(
+        self,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Filter accounts by various criteria"""
+        clauses, params = self._account_where(account_type, min_bot_probability)
+        return self._rows(f"SELECT data FROM accounts{_sql_where(clauses)} ORDER BY rowid", tuple(params))
+
+    def count_accounts(
+        self,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None
+    ) -> int:
+        """Count accounts matching the filters"""
+        clauses, params = self._account_where(account_type, min_bot_probability)
+        return self._scalar(f"SELECT COUNT(*) FROM accounts{_sql_where(clauses)}", tuple(params))
+
+    def page_accounts(
+        self,
+        offset: int,
+        limit: int,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching accounts by bot probability (highest first)"""
+        clauses, params = self._account_where(account_type, min_bot_probability)
+        return self._page(
+            "accounts", clauses, params, "bot_probability", "bot_probability", offset, limit, cursor,
+            sort_default=0,
+            fields=fields
+        )
+
+    def iter_accounts(
+        self,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching accounts in stored order"""
+        clauses, params = self._account_where(account_type, min_bot_probability)
+        return self._iter("accounts", clauses, params, fields)
+
+    # Aggregate methods
+    def data_version(self) -> int:
+        """Counter that increases whenever the stored data changes"""
+        return self._scalar("SELECT value FROM meta WHERE name = 'data_version'")
+
+    def get_overview_stats(self, recompute: bool = False) -> Dict[str, Any]:
+        """Dashboard overview counts, read from the trigger-maintained counters
+
+        With recompute, the counters are first rebuilt from the tables.
+        """
+        if recompute:
+            with self._transaction() as conn:
+                self._count_aggregates(conn)
+        with self._pool.connection() as conn:
+            rows = conn.execute("SELECT name, key, value FROM aggregates").fetchall()
+            rows += conn.execute(
+                "SELECT 'campaigns_by_platform', p.platform, COUNT(*) FROM campaign_platforms p "
+                "JOIN campaigns c ON c.id = p.campaign_id GROUP BY p.platform"
+            ).fetchall()
+        return OverviewAggregates.from_rows(rows).stats()
+
+    def get_campaign_stats(self, campaign_id: str) -> Dict[str, Any]:
+        """A campaign's post statistics, read from the trigger-maintained campaign tables"""
+        with self._pool.connection() as conn:
+            platforms = dict(conn.execute(
+                "SELECT platform, posts FROM campaign_platforms WHERE campaign_id = ?", (campaign_id,)
+            ).fetchall())
+            accounts = conn.execute(
+                "SELECT accounts FROM campaign_stats WHERE campaign_id = ?", (campaign_id,)
+            ).fetchone()
+            # Each MIN/MAX is a single seek in idx_posts_campaign_posted
+            first, last = conn.execute(
+                "SELECT (SELECT MIN(posted_at) FROM posts WHERE campaign_id = ?1 AND posted_at > ''), "
+                "(SELECT MAX(posted_at) FROM posts WHERE campaign_id = ?1 AND posted_at > '')",
+                (campaign_id,)
+            ).fetchone()
+            hashtags = conn.execute(
+                "SELECT tag, posts FROM campaign_hashtags WHERE campaign_id = ? ORDER BY posts DESC, tag LIMIT ?",
+                (campaign_id, TOP_HASHTAGS)
+            ).fetchall()
+        return campaign_stats(sum(platforms.values()), accounts[0] if accounts else 0, first, last, hashtags, platforms)
+
+    def get_time_series(
+        self,
+        metrics: Sequence[str],
+        period: str,
+        scope: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Bucketed counts of metrics over a period, read from the rollups table"""
+        scope = scope or ""
+        edge = "SELECT {}(bucket) FROM rollups WHERE resolution = ? AND scope = ? AND metric = ?"
+        with self._pool.connection() as conn:
+            # Each MIN/MAX is a single seek in the primary key
+            clock = max(
+                (conn.execute(edge.format("MAX"), (HOUR, "", metric)).fetchone()[0] or "" for metric in CLOCK_METRICS),
+                default=""
+            )
+            firsts = [conn.execute(edge.format("MIN"), (HOUR, scope, metric)).fetchone()[0] for metric in metrics]
+            lasts = [conn.execute(edge.format("MAX"), (HOUR, scope, metric)).fetchone()[0] for metric in metrics]
+            firsts, lasts = [k for k in firsts if k], [k for k in lasts if k]
+            span = (min(firsts), max(lasts)) if firsts else None
+            resolution, keys = series_window(period, clock or None, span)
+            counts: Dict[str, Dict[str, int]] = {metric: {} for metric in metrics}
+            if keys:
+                rows = conn.execute(
+                    f"SELECT metric, bucket, value FROM rollups WHERE resolution = ? AND scope = ? "
+                    f"AND metric IN ({', '.join('?' * len(metrics))}) AND bucket BETWEEN ? AND ?",
+                    (resolution, scope, *metrics, keys[0], keys[-1])
+                )
+                for metric, bucket, value in rows:
+                    counts[metric][bucket] = value
+        return series_rows(resolution, keys, counts)
+
+    # Column methods
+    def _columns(self, table: str, fields: Sequence[str]) -> Dict[str, List[Any]]:
+        selects = ", ".join("json_extract(data, ?)" for _ in fields)
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {selects} FROM {table} ORDER BY rowid", [f"$.{field}" for field in fields]
+            ).fetchall()
+        return {field: [row[i] for row in rows] for i, field in enumerate(fields)}
+
+    def get_post_columns(self, fields: Sequence[str]) -> Dict[str, List[Any]]:
+        """Scalar fields of every post as parallel lists, in stored order"""
+        return self._columns("posts", fields)
+
+    def get_account_columns(self, fields: Sequence[str]) -> Dict[str, List[Any]]:
+        """Scalar fields of every account as parallel lists, in stored order
+
+        Booleans come back as 0/1, as SQLite's JSON functions return them.
+        """
+        return self._columns("accounts", fields)
+
+    def get_campaign_post_columns(self, campaign_id: str, fields: Sequence[str]) -> Dict[str, List[Any]]:
+        """Fields of a campaign's posts as parallel lists, extracted from the stored JSON"""
+        selects = ", ".join("data -> ?" for _ in fields)
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {selects} FROM posts WHERE campaign_id = ? ORDER BY rowid",
+                (*(f"$.{field}" for field in fields), campaign_id)
+            ).fetchall()
+        return {
+            field: [None if row[i] is None else json.loads(row[i]) for row in rows]
+            for i, field in enumerate(fields)
+        }
+
+    # Threat score methods
+    def get_threat_score_by_campaign(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        """Get threat score for a specific campaign"""
+        return self._row("SELECT data FROM threat_scores WHERE campaign_id = ?", (campaign_id,))
+
+    # Report methods
+    def get_all_reports(self) -> List[Dict[str, Any]]:
+        """Get all reports"""
+        return self._rows("SELECT data FROM reports ORDER BY rowid")
+
+    def get_report_by_id(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific report by ID"""
+        return self._row("SELECT data FROM reports WHERE id = ?", (report_id,))
+
+    def _report_where(self, status, severity, report_type) -> Tuple[List[str], List[Any]]:
+        return _where(
+            status=_predicate(status),
+            severity=_predicate(severity),
+            report_type=_predicate(report_type)
+        )
+
+    def filter_reports(
+        self,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        report_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Filter reports by various criteria"""
+        clauses, params = self._report_where(status, severity, report_type)
+        return self._rows(f"SELECT data FROM reports{_sql_where(clauses)} ORDER BY rowid", tuple(params))
+
+    def count_reports(
+        self,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        report_type: Optional[str] = None
+    ) -> int:
+        """Count reports matching the filters"""
+        clauses, params = self._report_where(status, severity, report_type)
+        return self._scalar(f"SELECT COUNT(*) FROM reports{_sql_where(clauses)}", tuple(params))
+
+    def page_reports(
+        self,
+        offset: int,
+        limit: int,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        report_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching reports by generation time (newest first)"""
+        clauses, params = self._report_where(status, severity, report_type)
+        return self._page(
+            "reports", clauses, params, "generated_at", "generated_at", offset, limit, cursor,
+            sort_default="",
+            fields=fields
+        )
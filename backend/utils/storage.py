@@ -0,0 +1,430 @@
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, AbstractSet, Iterable, Iterator, Sequence, Tuple
+from pathlib import Path
+
+from utils.json_stream import RecordStream
+
+# Get the base directory
+BASE_DIR = Path(__file__).resolve().parent.parent
+# Directory the collections are loaded from; DEEPTRACE_DATA_DIR points it
+# elsewhere, e.g. at a generated benchmark data set
+MOCK_DATA_DIR = Path(os.environ.get("DEEPTRACE_DATA_DIR") or BASE_DIR / "mock_data")
+
+# Sortable campaign fields and the value used when a record lacks them
+CAMPAIGN_SORT_FIELDS = {
+    "detected_at": "",
+    "last_activity": "",
+    "created_at": "",
+    "updated_at": "",
+    "total_posts": 0,
+    "total_accounts": 0,
+    "confidence_score": 0
+}
+
+# Mock data collections, in load order
+MOCK_DATA_COLLECTIONS = ["campaigns", "posts", "accounts", "threat_scores", "reports"]
+
+# Extensions tried, in order, when resolving a mock data file by name
+DATA_FILE_SUFFIXES = [".json", ".ndjson", ".jsonl"]
+
+# How many records to load between progress reports
+PROGRESS_EVERY = 100_000
+
+# (records, total match count, next cursor) as returned by the page_* methods;
+# given `fields`, they read and return only those fields of each record
+Page = Tuple[List[Dict[str, Any]], int, Optional[str]]
+
+
+def load_json_file(filename: str) -> List[Dict[str, Any]]:
+    """Load data from a JSON file in the mock data directory"""
+    file_path = MOCK_DATA_DIR / filename
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"Warning: {filename} not found at {file_path}")
+        return []
+    except json.JSONDecodeError as e:
+        print(f"Error decoding {filename}: {e}")
+        return []
+
+
+def find_mock_file(name: str) -> Optional[Path]:
+    """Resolve a mock data collection name, e.g. "posts", to its file, if any"""
+    for suffix in DATA_FILE_SUFFIXES:
+        file_path = MOCK_DATA_DIR / f"{name}{suffix}"
+        if file_path.exists():
+            return file_path
+    return None
+
+
+def mock_data_fingerprint() -> List[Tuple[str, int, int]]:
+    """(file name, size, mtime) of every mock data file, to detect stale snapshots"""
+    fingerprint = []
+    for name in MOCK_DATA_COLLECTIONS:
+        file_path = find_mock_file(name)
+        if file_path is not None:
+            stat = file_path.stat()
+            fingerprint.append((file_path.name, stat.st_size, stat.st_mtime_ns))
+    return fingerprint
+
+
+def stream_mock_data(name: str, progress_every: int = PROGRESS_EVERY) -> Iterator[Dict[str, Any]]:
+    """Stream records from a mock data file (JSON array or NDJSON), reporting throughput
+    
+    ``name`` is the file name without extension, e.g. "posts". On a decode error
+    the records read so far are kept and the rest of the file is skipped.
+    """
+    label = name.replace("_", " ")
+    file_path = find_mock_file(name)
+    if file_path is None:
+        print(f"Warning: {name}.json not found in {MOCK_DATA_DIR}")
+        return
+    
+    stream = RecordStream(file_path)
+    start = time.perf_counter()
+    try:
+        for record in stream:
+            yield record
+            if stream.records % progress_every == 0:
+                _report_progress("⏳ Loading", label, stream, start)
+    except (ValueError, UnicodeDecodeError) as e:
+        print(f"Error decoding {file_path.name} after {stream.records} records: {e}")
+    _report_progress("✅ Loaded", label, stream, start)
+
+
+def _report_progress(prefix: str, label: str, stream: RecordStream, start: float):
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    megabytes = stream.bytes_read / (1 << 20)
+    print(
+        f"{prefix} {stream.records} {label} "
+        f"({megabytes:.1f} MB in {elapsed:.2f}s, {stream.records / elapsed:,.0f} records/s)"
+    )
+
+
+def same_kind(value: Any, default: Any) -> bool:
+    """Whether a cursor value can be compared against a sort field with this default"""
+    if isinstance(default, str):
+        return isinstance(value, str)
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class StorageBackend(ABC):
+    """Interface the API routers use to read and write records
+
+    Filter arguments of None or "all" mean no filter. The page_* methods return
+    one page of records, the total match count and a cursor for the next page,
+    and raise ValueError for a cursor they cannot use.
+    """
+
+    @abstractmethod
+    def load_all_data(self):
+        """(Re)load every record from the mock data files"""
+
+    # Mutation methods
+    @abstractmethod
+    def upsert_campaign(self, campaign: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new campaign or replace the one with the same ID"""
+
+    @abstractmethod
+    def upsert_post(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new post or replace the one with the same ID"""
+
+    @abstractmethod
+    def upsert_account(self, account: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new account or replace the one with the same ID"""
+
+    @abstractmethod
+    def upsert_report(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new report or replace the one with the same ID"""
+
+    @abstractmethod
+    def upsert_threat_score(self, score: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new threat score or replace the one for the same campaign"""
+
+    @abstractmethod
+    def upsert_posts(self, posts: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace many posts, returning how many were new"""
+
+    @abstractmethod
+    def upsert_accounts(self, accounts: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace many accounts, returning how many were new"""
+
+    @abstractmethod
+    def update_accounts(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Set fields of existing accounts by ID, returning how many accounts changed"""
+
+    # Column methods
+    @abstractmethod
+    def get_post_columns(self, fields: Sequence[str]) -> Dict[str, List[Any]]:
+        """Scalar fields of every post as parallel lists, in stored order"""
+
+    @abstractmethod
+    def get_account_columns(self, fields: Sequence[str]) -> Dict[str, List[Any]]:
+        """Scalar fields of every account as parallel lists, in stored order"""
+
+    @abstractmethod
+    def get_campaign_post_columns(self, campaign_id: str, fields: Sequence[str]) -> Dict[str, List[Any]]:
+        """Fields of a campaign's posts as parallel lists, without materializing whole posts"""
+
+    # Aggregate methods
+    @abstractmethod
+    def data_version(self) -> int:
+        """Counter that increases whenever the stored data changes"""
+
+    @abstractmethod
+    def get_overview_stats(self, recompute: bool = False) -> Dict[str, Any]:
+        """Dashboard overview counts from materialized counters, optionally rebuilt from scratch first"""
+
+    @abstractmethod
+    def get_campaign_stats(self, campaign_id: str) -> Dict[str, Any]:
+        """A campaign's post statistics from counters maintained as posts are written
+
+        Returns total_posts, unique_accounts, first_post_at, last_post_at,
+        top_hashtags ({"tag", "count"}, most used first) and platforms
+        (post count per platform, largest first).
+        """
+
+    @abstractmethod
+    def get_time_series(
+        self,
+        metrics: Sequence[str],
+        period: str,
+        scope: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Bucketed counts of rollup metrics over a period ("24h", "7d", "30d" or "all")
+
+        Rows carry a "date" label and one count per metric. ``scope`` selects
+        a campaign's own series. Raises ValueError for an unknown period.
+        """
+
+    # Campaign methods
+    @abstractmethod
+    def get_all_campaigns(self) -> List[Dict[str, Any]]:
+        """Get all campaigns"""
+
+    @abstractmethod
+    def get_campaign_by_id(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific campaign by ID"""
+
+    @abstractmethod
+    def filter_campaigns(
+        self,
+        status: Optional[str] = None,
+        threat_level: Optional[str] = None,
+        campaign_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Filter campaigns by various criteria"""
+
+    @abstractmethod
+    def count_campaigns(
+        self,
+        status: Optional[str] = None,
+        threat_level: Optional[str] = None,
+        campaign_type: Optional[str] = None
+    ) -> int:
+        """Count campaigns matching the filters"""
+
+    @abstractmethod
+    def page_campaigns(
+        self,
+        offset: int,
+        limit: int,
+        status: Optional[str] = None,
+        threat_level: Optional[str] = None,
+        campaign_type: Optional[str] = None,
+        sort_by: str = "detected_at",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching campaigns; unknown sort fields use stored order"""
+
+    # Post methods
+    @abstractmethod
+    def get_all_posts(self) -> List[Dict[str, Any]]:
+        """Get all posts"""
+
+    @abstractmethod
+    def get_post_by_id(self, post_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific post by ID"""
+
+    @abstractmethod
+    def get_posts_by_campaign(self, campaign_id: str) -> List[Dict[str, Any]]:
+        """Get all posts for a specific campaign"""
+
+    @abstractmethod
+    def get_posts_by_account(self, account_id: str) -> List[Dict[str, Any]]:
+        """Get all posts made by a specific account"""
+
+    @abstractmethod
+    def get_platform_counts_by_campaign(self, campaign_id: str) -> Dict[str, int]:
+        """Get post counts per platform for a specific campaign"""
+
+    @abstractmethod
+    def filter_posts(
+        self,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        """Filter posts by various criteria"""
+
+    @abstractmethod
+    def search_posts(
+        self,
+        query: str,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        ranked: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over posts, in stored order or by BM25 relevance"""
+
+    @abstractmethod
+    def count_posts(
+        self,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        campaign_id: Optional[str] = None
+    ) -> int:
+        """Count posts matching the filters"""
+
+    @abstractmethod
+    def page_posts(
+        self,
+        offset: int,
+        limit: int,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        campaign_id: Optional[str] = None,
+        search: Optional[str] = None,
+        sort_by: str = "posted_at",
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching posts
+
+        sort_by is "posted_at" or "engagement_count" (descending), "relevance"
+        (BM25 order, search only) or anything else for stored order.
+        """
+
+    @abstractmethod
+    def iter_posts(
+        self,
+        platform: Optional[str] = None,
+        is_flagged: Optional[bool] = None,
+        campaign_id: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching posts in stored order without materializing them all
+
+        Memory use stays constant however many posts match.
+        """
+
+    # Account methods
+    @abstractmethod
+    def get_all_accounts(self) -> List[Dict[str, Any]]:
+        """Get all accounts"""
+
+    @abstractmethod
+    def get_account_by_id(self, account_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific account by ID"""
+
+    @abstractmethod
+    def get_accounts_by_campaign(
+        self,
+        campaign_id: str,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get all accounts involved in a campaign, with per-campaign post stats
+
+        Given `fields`, only those stored fields of each account are read.
+        """
+
+    @abstractmethod
+    def get_campaign_ids_by_account(self, account_id: str) -> AbstractSet[str]:
+        """Get the IDs of all campaigns an account has posted in"""
+
+    @abstractmethod
+    def filter_accounts(
+        self,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Filter accounts by various criteria"""
+
+    @abstractmethod
+    def count_accounts(
+        self,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None
+    ) -> int:
+        """Count accounts matching the filters"""
+
+    @abstractmethod
+    def page_accounts(
+        self,
+        offset: int,
+        limit: int,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching accounts by bot probability (highest first)"""
+
+    @abstractmethod
+    def iter_accounts(
+        self,
+        account_type: Optional[str] = None,
+        min_bot_probability: Optional[float] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching accounts in stored order without materializing them all"""
+
+    # Threat score methods
+    @abstractmethod
+    def get_threat_score_by_campaign(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        """Get threat score for a specific campaign"""
+
+    # Report methods
+    @abstractmethod
+    def get_all_reports(self) -> List[Dict[str, Any]]:
+        """Get all reports"""
+
+    @abstractmethod
+    def get_report_by_id(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific report by ID"""
+
+    @abstractmethod
+    def filter_reports(
+        self,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        report_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Filter reports by various criteria"""
+
+    @abstractmethod
+    def count_reports(
+        self,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        report_type: Optional[str] = None
+    ) -> int:
+        """Count reports matching the filters"""
+
+    @abstractmethod
+    def page_reports(
+        self,
+        offset: int,
+        limit: int,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        report_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """Get one page of matching reports by generation time (newest first)"""
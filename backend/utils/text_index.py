@@ -0,0 +1,163 @@
+import re
+import math
+import heapq
+from bisect import bisect_left
+from typing import List, Dict, Set, Tuple, Optional, Iterable
+
+# Word characters only, so "#VoteNow" and "@candidate_xyz" index as "votenow" and "candidate_xyz"
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return _TOKEN.findall(text.lower())
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """Parse a query into OR-groups of AND-ed tokens; prefix tokens keep a trailing *"""
+    groups: List[List[str]] = [[]]
+    for word in query.split():
+        if word == "OR":
+            groups.append([])
+            continue
+        if word == "AND":
+            continue
+        # Punctuated words ("foo-bar") are an AND of their tokens
+        tokens = tokenize(word)
+        if tokens and word.endswith("*"):
+            tokens[-1] += "*"
+        groups[-1].extend(tokens)
+    return [group for group in groups if group]
+
+
+class TextIndex:
+    """Incremental inverted index with boolean, prefix and BM25-ranked queries
+
+    Documents are identified by their row position in the owning record list.
+    Queries are whitespace-separated terms that must all match; ``OR`` between
+    groups of terms matches either group, and a trailing ``*`` turns a term into
+    a prefix query (``elect*`` matches "election2024").
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._sorted_terms: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def clear(self):
+        """Drop every indexed document"""
+        self._postings = {}
+        self._lengths = {}
+        self._total_length = 0
+        self._sorted_terms = None
+
+    def add(self, position: int, texts: Iterable[str]):
+        """Index a document made of one or more text fields"""
+        counts: Dict[str, int] = {}
+        length = 0
+        for text in texts:
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + 1
+                length += 1
+        for token, tf in counts.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._sorted_terms = None
+            postings[position] = tf
+        self._lengths[position] = length
+        self._total_length += length
+
+    def remove(self, position: int, texts: Iterable[str]):
+        """Remove a document, given the text fields it was indexed with"""
+        if position not in self._lengths:
+            return
+        for token in set(t for text in texts for t in tokenize(text)):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(position, None)
+            if not postings:
+                del self._postings[token]
+                self._sorted_terms = None
+        self._total_length -= self._lengths.pop(position)
+
+    def update(self, position: int, old_texts: Iterable[str], new_texts: Iterable[str]):
+        """Re-index a document whose text fields changed"""
+        self.remove(position, old_texts)
+        self.add(position, new_texts)
+
+    def _expand(self, term: str) -> List[str]:
+        """Resolve a parsed query term to the indexed terms it covers"""
+        if not term.endswith("*"):
+            return [term] if term in self._postings else []
+        prefix = term[:-1]
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = []
+        i = bisect_left(self._sorted_terms, prefix)
+        while i < len(self._sorted_terms) and self._sorted_terms[i].startswith(prefix):
+            terms.append(self._sorted_terms[i])
+            i += 1
+        return terms
+
+    def _postings_for(self, term: str):
+        """Posting container for a term; prefix terms union their expansions"""
+        terms = self._expand(term)
+        if len(terms) == 1:
+            return self._postings[terms[0]]
+        matched: Set[int] = set()
+        for t in terms:
+            matched.update(self._postings[t])
+        return matched
+
+    def _match_group(self, group: List[str]) -> Set[int]:
+        # Start from the rarest term and probe the others, so the cost is bounded by its size
+        postings = sorted((self._postings_for(term) for term in group), key=len)
+        matched = set(postings[0])
+        for other in postings[1:]:
+            if not matched:
+                break
+            matched = {position for position in matched if position in other}
+        return matched
+
+    def match(self, query: str) -> Set[int]:
+        """Positions of documents matching the boolean query"""
+        matched: Set[int] = set()
+        for group in parse_query(query):
+            matched |= self._match_group(group)
+        return matched
+
+    def rank(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Matching positions with BM25 scores, best first"""
+        groups = parse_query(query)
+        matched: Set[int] = set()
+        for group in groups:
+            matched |= self._match_group(group)
+        if not matched:
+            return []
+
+        n = len(self._lengths)
+        avg_length = self._total_length / n if n else 0.0
+        scores: Dict[int, float] = dict.fromkeys(matched, 0.0)
+        terms = {t for group in groups for term in group for t in self._expand(term)}
+        for term in terms:
+            postings = self._postings[term]
+            df = len(postings)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            # Key-view intersection iterates whichever side is smaller
+            for position in postings.keys() & matched:
+                tf = postings[position]
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[position] / avg_length) if avg_length else self.k1
+                scores[position] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        # Ties keep ascending position so results are stable
+        ranked = ((score, -position) for position, score in scores.items())
+        top = heapq.nlargest(limit, ranked) if limit is not None else sorted(ranked, reverse=True)
+        return [(-neg_position, score) for score, neg_position in top]
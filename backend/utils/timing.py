@@ -0,0 +1,142 @@
+from typing import Dict, Any, List, Sequence, Tuple
+
+import numpy as np
+
+from utils.arrays import sorted_unique
+
+# Width of the sliding window, and how many distinct accounts must post the same
+# content inside one window for it to count as a coordinated burst
+BURST_WINDOW_SECONDS = 60
+MIN_BURST_ACCOUNTS = 2
+# Upper bound on posts per detection task; groups are hash-partitioned to fit
+PARTITION_SIZE = 1 << 20
+
+# Epoch value of a timestamp that could not be parsed
+INVALID_EPOCH = np.iinfo(np.int64).min
+
+
+def parse_epochs(timestamps: Sequence[str]) -> np.ndarray:
+    """Parse ISO-8601 UTC timestamps ("2026-02-04T11:23:45Z") into int64 epoch seconds
+
+    Fractional seconds and the zone suffix are ignored; unparseable values
+    become INVALID_EPOCH.
+    """
+    trimmed = [(t or "")[:19] for t in timestamps]
+    try:
+        parsed = np.array(trimmed, dtype="datetime64[s]")
+    except ValueError:
+        parsed = np.array([_parse_one(t) for t in trimmed], dtype="datetime64[s]")
+    epochs = parsed.astype(np.int64)
+    epochs[np.isnat(parsed)] = INVALID_EPOCH
+    return epochs
+
+
+def _parse_one(timestamp: str) -> np.datetime64:
+    try:
+        return np.datetime64(timestamp, "s")
+    except ValueError:
+        return np.datetime64("NaT", "s")
+
+
+def partition(groups: np.ndarray, size: int = PARTITION_SIZE) -> List[np.ndarray]:
+    """Split row indices into partitions of roughly size rows, keeping each group whole"""
+    count = max(1, -(-len(groups) // size))
+    if count == 1:
+        return [np.arange(len(groups))]
+    order = np.argsort(groups % count, kind="stable")
+    bounds = np.searchsorted((groups % count)[order], np.arange(1, count))
+    return [part for part in np.split(order, bounds) if len(part)]
+
+
+def detect_bursts(
+    chunk: Tuple[int, np.ndarray, np.ndarray, np.ndarray],
+    window: int = BURST_WINDOW_SECONDS,
+    min_accounts: int = MIN_BURST_ACCOUNTS
+) -> Tuple[int, np.ndarray, Dict[str, np.ndarray]]:
+    """Find coordinated bursts in one partition of posts
+
+    ``chunk`` is (partition index, epochs, group ids, account ids), one entry
+    per post. Within each group, a post starts a burst when at least
+    min_accounts distinct accounts post in the window seconds from it on; a
+    post is covered when it falls inside any burst window of its group, and
+    overlapping windows merge into one episode.
+
+    Returns the partition index, a covered flag per post, and the episodes as
+    parallel arrays: group, first/last covered epoch, covered posts, distinct
+    accounts and the position of the episode's first post.
+    """
+    index, epochs, groups, accounts = chunk
+    n = len(epochs)
+    covered = np.zeros(n, dtype=bool)
+    empty = np.empty(0, dtype=np.int64)
+    episodes = {"group": empty, "start": empty, "end": empty, "posts": empty, "accounts": empty, "first": empty}
+    valid = np.flatnonzero(epochs != INVALID_EPOCH)
+    if not len(valid):
+        return index, covered, episodes
+
+    t = epochs[valid]
+    g = groups[valid].astype(np.int64)
+    a = accounts[valid].astype(np.int64)
+    # Composite (group, time) key; windows never reach into the next group
+    t = t - t.min()
+    span = np.int64(int(t.max()) + window + 1)
+    keys = g * span + t
+
+    # An account counts once per window: drop posts following the same
+    # account's previous post in the group by less than the window
+    by_account = np.lexsort((t, a, g))
+    same = (g[by_account][1:] == g[by_account][:-1]) & (a[by_account][1:] == a[by_account][:-1])
+    repeat = np.zeros(len(by_account), dtype=bool)
+    repeat[1:] = same & (np.diff(t[by_account]) < window)
+    distinct = np.sort(keys[by_account[~repeat]])
+
+    # Distinct accounts in [t, t + window) for every distinct post, by binary search
+    in_window = np.searchsorted(distinct, distinct + window, side="left") - np.arange(len(distinct))
+    starts = distinct[in_window >= min_accounts]
+    if not len(starts):
+        return index, covered, episodes
+
+    # A post is covered if the latest burst start at or before it still reaches it
+    latest = np.searchsorted(starts, keys, side="right") - 1
+    hit = latest >= 0
+    hit[hit] = keys[hit] < starts[latest[hit]] + window
+    covered[valid[hit]] = True
+
+    # Merge overlapping burst windows into episodes
+    new_episode = np.ones(len(starts), dtype=bool)
+    new_episode[1:] = starts[1:] >= starts[:-1] + window
+    episode_of_start = np.cumsum(new_episode) - 1
+    members = np.flatnonzero(hit)
+    episode = episode_of_start[latest[members]]
+    count = int(episode_of_start[-1]) + 1
+
+    first_key = np.full(count, np.iinfo(np.int64).max)
+    last_key = np.full(count, np.iinfo(np.int64).min)
+    np.minimum.at(first_key, episode, keys[members])
+    np.maximum.at(last_key, episode, keys[members])
+    first_post = np.full(count, n, dtype=np.int64)
+    order = np.lexsort((keys[members], episode))
+    heads = order[np.concatenate(([True], episode[order][1:] != episode[order][:-1]))]
+    first_post[episode[heads]] = valid[members[heads]]
+    account_span = int(a.max()) + 1
+    episode_of_pair = sorted_unique(episode * account_span + a[members]) // account_span
+
+    base = epochs[valid].min()
+    episodes = {
+        "group": first_key // span,
+        "start": first_key % span + base,
+        "end": last_key % span + base,
+        "posts": np.bincount(episode, minlength=count),
+        "accounts": np.bincount(episode_of_pair, minlength=count),
+        "first": first_post
+    }
+    return index, covered, episodes
+
+
+def merge_episodes(parts: Sequence[Tuple[np.ndarray, Dict[str, np.ndarray]]]) -> Dict[str, np.ndarray]:
+    """Concatenate episodes from several partitions, mapping post positions back to global rows"""
+    merged: Dict[str, Any] = {}
+    for rows, episodes in parts:
+        for name, values in episodes.items():
+            merged.setdefault(name, []).append(rows[values] if name == "first" else values)
+    return {name: np.concatenate(values) for name, values in merged.items()}
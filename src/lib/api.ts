@@ -69,6 +69,7 @@ export interface CampaignsResponse {
             items_per_page: number;
             has_next: boolean;
             has_previous: boolean;
+            next_cursor: string | null;
         };
     };
     timestamp: string;
@@ -142,6 +143,7 @@ export interface CampaignPostsResponse {
             items_per_page: number;
             has_next: boolean;
             has_previous: boolean;
+            next_cursor: string | null;
         };
     };
     timestamp: string;
@@ -207,6 +209,7 @@ export interface ReportsResponse {
             items_per_page: number;
             has_next: boolean;
             has_previous: boolean;
+            next_cursor: string | null;
         };
     };
     timestamp: string;